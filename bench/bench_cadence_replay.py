@@ -0,0 +1,130 @@
+# bench/bench_cadence_replay.py
+"""Replay recorded seat history against PollScheduler cadences.
+
+    python -m bench.bench_cadence_replay [--db seat_history.sqlite3] [--term 202531] [--days 14]
+
+Each watched CRN is polled on simulated time at whatever cadence the
+scheduler picks from what its own polls have seen, while seat_history.replay
+moves the real state along; for every (hot, base, cold) setting this reports
+the delay from a section opening to the first poll that saw it, the
+openings no poll saw at all, and the requests per minute it took (before
+any budget stretching). Without --db three synthetic days of churn are
+generated.
+"""
+import argparse
+import heapq
+import random
+
+from poll_scheduler import PollScheduler, HOT_INTERVAL, BASE_INTERVAL, COLD_INTERVAL
+from seat_history import SeatHistory, DAY, replay, SeatRow
+from seat_state import SeatEvent, OPENED, CLOSED, VANISHED
+
+SETTINGS = [
+    (HOT_INTERVAL, BASE_INTERVAL, COLD_INTERVAL),
+    (1, 5, 30),
+    (2, 10, 60),
+    (5, 15, 120),
+    (5, 5, 5),
+]
+
+
+def synthetic(crns=20, days=3, seed=0):
+    """Sections opening a few times a day, mostly during the day, each staying open a few minutes."""
+    rng, events, start = random.Random(seed), [], 1_700_000_000.0
+    for n in range(crns):
+        crn, at = str(10000 + n), start
+        events.append(SeatEvent(CLOSED, "bench", crn, "", False, 0, None, at))
+        while True:
+            at += rng.expovariate(1 / (6 * 3600))
+            if at >= start + days * DAY:
+                break
+            if (at % DAY) / 3600 < 7 and rng.random() < 0.8:
+                continue    # quiet at night
+            events.append(SeatEvent(OPENED, "bench", crn, "", True, 1, 0, at))
+            at += rng.expovariate(1 / 300)
+            events.append(SeatEvent(CLOSED, "bench", crn, "", False, 0, 1, at))
+    return sorted(events, key=lambda e: e.at)
+
+
+class Simulation:
+    """Polls every CRN on simulated time at the scheduler's cadence."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.state     = {}     # (term, crn) → SeatRow or None, the real state
+        self.polling   = []     # heap of (next poll time, (term, crn))
+        self.opened_at = {}     # (term, crn) → when the opening no poll has seen yet happened
+        self.delays    = []
+        self.missed    = 0
+        self.polls     = 0
+        self.began     = None
+        self.now       = None
+
+    def advance(self, at):
+        """Run every poll due before ``at``."""
+        if self.began is None:
+            self.began = at
+        while self.polling and self.polling[0][0] < at:
+            when, key = heapq.heappop(self.polling)
+            self._poll(key, when)
+        self.now = at
+
+    def _poll(self, key, when):
+        section = self.state.get(key)
+        self.scheduler.observe(key[0], key[1], section, now=when)
+        self.polls += 1
+        if section is not None and section.open and key in self.opened_at:
+            self.delays.append(when - self.opened_at.pop(key))
+        heapq.heappush(self.polling, (when + self.scheduler.cadence(key[0], key[1], now=when), key))
+
+    def apply(self, event):
+        key = (event.term, event.crn)
+        if key not in self.state:
+            heapq.heappush(self.polling, (event.at, key))
+        self.state[key] = None if event.kind == VANISHED else SeatRow(event.open, event.seats)
+        if event.kind == OPENED:
+            self.opened_at.setdefault(key, event.at)
+        elif not event.open and key in self.opened_at:
+            del self.opened_at[key]
+            self.missed += 1
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", help="seat history recorded by the watch loop")
+    ap.add_argument("--term")
+    ap.add_argument("--days", type=float, default=14)
+    args = ap.parse_args()
+
+    if args.db:
+        history = SeatHistory(args.db, retention_days=0)
+        events  = history.transitions(args.term, since=history.clock() - args.days * DAY)
+        history.close()
+    else:
+        events = synthetic()
+    if not events:
+        print("no seat history to replay")
+        return
+    crns     = len({(e.term, e.crn) for e in events})
+    openings = sum(e.kind == OPENED for e in events)
+    span     = events[-1].at - events[0].at
+    print(f"{len(events)} transitions, {openings} openings of {crns} CRNs over {span / DAY:.1f} days")
+    print(f"{'hot/base/cold s':>16} {'p50 s':>7} {'p90 s':>7} {'missed':>7} {'req/min':>8}")
+    for hot, base, cold in SETTINGS:
+        sim = Simulation(PollScheduler(base=base, hot=hot, cold=cold, jitter=0))
+        replay(events, subscribers=[sim.apply], on_time=sim.advance)
+        if not sim.delays:
+            p50 = p90 = float("nan")
+        else:
+            p50, p90 = percentile(sim.delays, 50), percentile(sim.delays, 90)
+        rpm = sim.polls / max(1.0, (sim.now - sim.began) / 60)
+        print(f"{f'{hot:g}/{base:g}/{cold:g}':>16} {p50:>7.1f} {p90:>7.1f} {sim.missed:>7} {rpm:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
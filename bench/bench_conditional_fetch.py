@@ -0,0 +1,65 @@
+# bench/bench_conditional_fetch.py
+"""Poll cost with and without the ResponseCache short-circuit.
+
+    python -m bench.bench_conditional_fetch [--sections 6000] [--cycles 20] [--watch 5]
+
+Runs every combination of a fixed or mutating catalog (one seat flips per
+request) and a server with or without ETag support, for a full pull and a
+streamed watched-CRN scan.
+"""
+import argparse
+import time
+
+import requests
+
+from fetch_planner import SectionQuery, run_query
+from response_cache import ResponseCache
+from bench.standin import StandinServer, make_catalog
+
+TERM = "202531"
+
+
+def flip_one(catalogs):
+    sections = catalogs[TERM]
+    flip_one.i = (getattr(flip_one, "i", -1) + 1) % len(sections)
+    s = sections[flip_one.i]
+    s["STUSEAT_OPEN"] = "N" if s["STUSEAT_OPEN"] == "Y" else "Y"
+
+
+def measure(session, server, cycles, crns, cache):
+    server.reset_counters()
+    query = SectionQuery(TERM, None)
+    start = time.perf_counter()
+    for _ in range(cycles):
+        run_query(session, query, server.url, crns=crns, cache=cache)
+    elapsed = time.perf_counter() - start
+    return elapsed / cycles * 1000, server.bytes_sent / cycles / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sections", type=int, default=6000)
+    ap.add_argument("--cycles",   type=int, default=20)
+    ap.add_argument("--watch",    type=int, default=5)
+    args = ap.parse_args()
+
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    print(f"{'payload':>9} {'etag':>5} {'parse':>9} {'cache':>6} {'ms/cycle':>9} {'KiB/cycle':>10} {'short-circuit':>14}")
+    for payload in ("fixed", "mutating"):
+        for conditional in (False, True):
+            catalog = make_catalog(args.sections, TERM)
+            # watch the tail so the streaming scan reads the whole body
+            watched = [s["SWV_CLASS_SEARCH_CRN"] for s in catalog[-args.watch:]]
+            mutate  = flip_one if payload == "mutating" else None
+            with StandinServer({TERM: catalog}, mutate, conditional) as server:
+                for parse, crns in (("full", None), ("stream", watched)):
+                    for cache in (None, ResponseCache()):
+                        ms, kib = measure(session, server, args.cycles, crns, cache)
+                        rate    = f"{cache.hit_rate():.0%}" if cache else "-"
+                        print(f"{payload:>9} {'yes' if conditional else 'no':>5} {parse:>9} "
+                              f"{'on' if cache else 'off':>6} {ms:>9.1f} {kib:>10.1f} {rate:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# bench/bench_end_to_end.py
+"""How fast the bot reacts to a seat opening, end to end against bench/harness.py.
+
+    python -m bench.bench_end_to_end [--sections 6000] [--watch 10] [--interval 1] [--swaps 5] [--payload recorded.json]
+
+Watch: ``--watch`` CRNs are closed, then opened one at a time at random
+moments while monitor_crns polls them; seat open → detection is the time to
+the SeatTracker event, detection → notification the time to the post
+leaving NotificationQueue (through a fake Discord client). CPU and RSS are
+charged per poll cycle of the whole watch set.
+
+Swap: watch_and_swap runs ``--swaps`` times, each SWAP_TO opening a couple
+of intervals in; detection → swap frame is SWAP_LATENCIES, seat open →
+frame received is measured at the fake socket.io server.
+
+The bot's own output goes to /dev/null; only the report is printed.
+"""
+import argparse
+import asyncio
+import contextlib
+import mmap
+import os
+import random
+import re
+import threading
+import time
+
+import scheduler_bot as bot
+from fetch_planner import FetchPlanner
+from notify_queue import NotificationQueue
+from seat_state import OPENED
+from bench.harness import Harness, load_catalog
+from bench.standin import make_catalog
+
+TERM = "202531"
+
+
+class FakeNotifier:
+    """Stands in for DiscordNotifier: a real NotificationQueue whose posts only record when they left."""
+
+    def __init__(self):
+        self.posted = {}    # crn → time.time() of the first post mentioning it
+        self.queue  = NotificationQueue(self._post)
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_until_complete, args=(self.queue.run(),), daemon=True).start()
+
+    def enqueue(self, message, channel_name=None, ping=""):
+        self.queue.put(message, channel_name, ping)
+
+    async def _post(self, channel, text):
+        now = time.time()
+        for crn in re.findall(r"CRN (\d+)", text):
+            self.posted.setdefault(crn, now)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def rss_kib():
+    """Current resident set size, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * mmap.PAGESIZE / 1024
+    except OSError:
+        return None
+
+
+def report(path, label, seconds):
+    if not seconds:
+        print(f"{path:>6} {label:<30} {'-':>9} {'-':>9} {0:>4}")
+        return
+    p50, p99 = percentile(seconds, 50) * 1000, percentile(seconds, 99) * 1000
+    print(f"{path:>6} {label:<30} {p50:>9.1f} {p99:>9.1f} {len(seconds):>4}")
+
+
+def bench_watch(harness, crns, interval, spread):
+    bot.HOWDY_URL      = harness.howdy_url
+    bot.TERM_ID        = TERM
+    bot.CRNS_TO_WATCH  = crns
+    bot.INTERVAL       = interval
+    bot.RATE_BUDGET    = 100_000
+    bot.current_run    = bot.MonitorRun()
+    bot.HISTORY        = False    # keep stand-in openings out of the real seat history
+    bot.notifier       = notifier = FakeNotifier()
+    detected = {}
+
+    def on_event(event):
+        if event.kind == OPENED:
+            detected.setdefault(event.crn, time.time())
+        bot.notify_seat_event(event)
+
+    # the first couple of polls see everything closed and set the baseline
+    rng    = random.Random(0)
+    start  = time.time() + 2 * interval
+    opened = {crn: start + rng.uniform(0, spread) for crn in crns}
+    for crn, when in opened.items():
+        harness.open_at(TERM, crn, when)
+    harness.reset_counters()
+
+    runner = threading.Thread(target=bot.monitor_crns, kwargs={"subscribers": [on_event]}, daemon=True)
+    cpu, rss, began = time.process_time(), rss_kib(), time.time()
+    runner.start()
+    deadline = start + spread + 10 * interval + 5
+    while len(notifier.posted) < len(crns) and time.time() < deadline:
+        time.sleep(0.05)
+    bot.stop_monitoring()
+    runner.join(10)
+    cpu, rss_end, elapsed = time.process_time() - cpu, rss_kib(), time.time() - began
+
+    queries = len(FetchPlanner().plan(TERM, crns))
+    cycles  = max(1, harness.stats()["requests"] // queries)
+    missed  = [crn for crn in crns if crn not in detected]
+    open_to_detect   = [detected[c] - opened[c] for c in crns if c in detected]
+    detect_to_notify = [notifier.posted[c] - detected[c] for c in crns if c in detected and c in notifier.posted]
+    return open_to_detect, detect_to_notify, cycles, cpu, (rss, rss_end), elapsed, missed
+
+
+def bench_swap(harness, crns, interval):
+    bot.HOWDY_URL  = harness.howdy_url
+    bot.TOKEN_URL  = harness.token_url
+    bot.socket_url = harness.socket_url
+    bot.TERM_ID    = TERM
+    bot.COOKIE     = "standin"
+    bot.INTERVAL   = interval
+    bot.notifier   = None
+    bot.SWAP_LATENCIES.clear()
+    frames, times = harness.socketio.frames, harness.socketio.frame_times
+    received = []
+    for crn in crns:
+        bot.SWAP_FROM, bot.SWAP_TO, bot.current_run = "99999", crn, bot.MonitorRun()
+        opened = time.time() + 2 * interval
+        harness.open_at(TERM, crn, opened)
+        seen = len(frames)
+        try:
+            asyncio.run(asyncio.wait_for(bot.watch_and_swap(), 10 * interval + 10))
+        except asyncio.TimeoutError:
+            continue
+        arrivals = [t for f, t in zip(frames[seen:], times[seen:]) if '"registration-request"' in f]
+        if arrivals:
+            received.append(arrivals[0] - opened)
+    return list(bot.SWAP_LATENCIES), received
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--payload", help="recorded /api/course-sections response to replay")
+    ap.add_argument("--sections", type=int,   default=6000)
+    ap.add_argument("--watch",    type=int,   default=10)
+    ap.add_argument("--interval", type=float, default=1.0, help="base poll interval, seconds")
+    ap.add_argument("--spread",   type=float, default=10.0, help="seconds over which the watched CRNs open")
+    ap.add_argument("--swaps",    type=int,   default=5)
+    args = ap.parse_args()
+
+    sections = load_catalog(args.payload) if args.payload else make_catalog(args.sections, TERM)
+    for s in sections:
+        s["SWV_CLASS_SEARCH_TERM"] = TERM
+    step  = max(1, len(sections) // (args.watch + args.swaps))
+    crns  = [str(s["SWV_CLASS_SEARCH_CRN"]) for s in sections[step - 1::step]]
+    watch, swap = crns[:args.watch], crns[args.watch:args.watch + args.swaps]
+
+    with Harness({TERM: sections}) as harness:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            open_to_detect, detect_to_notify, cycles, cpu, rss, elapsed, missed = \
+                bench_watch(harness, watch, args.interval, args.spread)
+            detect_to_frame, open_to_frame = bench_swap(harness, swap, args.interval)
+
+    print(f"{len(sections)} sections, {len(watch)} watched, base interval {args.interval:g}s")
+    print(f"{'path':>6} {'latency':<30} {'p50 ms':>9} {'p99 ms':>9} {'n':>4}")
+    report("watch", "seat open → detection", open_to_detect)
+    report("watch", "detection → notification", detect_to_notify)
+    report("swap", "detection → swap frame sent", detect_to_frame)
+    report("swap", "seat open → frame received", open_to_frame)
+    print(f"watch: {cycles} cycles in {elapsed:.1f}s, CPU {cpu / cycles * 1000:.2f} ms/cycle", end="")
+    if None not in rss:
+        print(f", RSS {rss[0]:.0f} → {rss[1]:.0f} KiB ({(rss[1] - rss[0]) / cycles:+.1f} KiB/cycle)")
+    else:
+        print()
+    if missed:
+        print(f"never detected: {', '.join(missed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# bench/bench_fetch_planner.py
+"""Compare planned watch-mode fetches against full catalog pulls.
+
+    python -m bench.bench_fetch_planner [--sections 6000] [--cycles 5]
+"""
+import argparse
+import time
+
+import requests
+
+from fetch_planner import FetchPlanner, SectionQuery, fetch_planned, run_query
+from bench.standin import StandinServer, make_catalog
+
+TERM = "202531"
+
+
+def measure(server, cycles, fn):
+    server.reset_counters()
+    start = time.perf_counter()
+    for _ in range(cycles):
+        fn()
+    elapsed = time.perf_counter() - start
+    return server.bytes_sent / cycles, elapsed / cycles * 1000, server.requests / cycles
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sections", type=int, default=6000)
+    ap.add_argument("--cycles",   type=int, default=5)
+    args = ap.parse_args()
+
+    catalog = make_catalog(args.sections, TERM)
+    with StandinServer({TERM: catalog}) as server:
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+
+        # one full pull up front so the planner knows the real catalog size
+        planner = FetchPlanner()
+        run_query(session, SectionQuery(TERM, None), server.url, planner=planner)
+
+        print(f"{'watched':>8} {'mode':>8} {'req/cycle':>10} {'KiB/cycle':>12} {'ms/cycle':>10}")
+        for n in (1, 10, 100):
+            crns = [s["SWV_CLASS_SEARCH_CRN"] for s in catalog[:: max(1, len(catalog) // n)][:n]]
+            plan = planner.plan(TERM, crns)
+            mode = "full" if plan[0].crn is None else "narrow"
+
+            full = measure(server, args.cycles,
+                           lambda: run_query(session, SectionQuery(TERM, None), server.url))
+            planned = measure(server, args.cycles,
+                              lambda: fetch_planned(session, planner, TERM, crns, server.url))
+            for label, (nbytes, ms, reqs) in (("full", full), (mode, planned)):
+                print(f"{n:>8} {label:>8} {reqs:>10.0f} {nbytes / 1024:>12.1f} {ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
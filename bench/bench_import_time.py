@@ -0,0 +1,75 @@
+# bench/bench_import_time.py
+"""Cold-start import time of scheduler_bot on the watch-mode path, from ``-X importtime``.
+
+    python -m bench.bench_import_time [--max-ms 250] [--runs 5]
+
+Exits non-zero if the best of ``--runs`` cold imports takes longer than
+``--max-ms`` or if a dependency that only swap mode or Discord needs gets
+imported anyway.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+MODULE = "scheduler_bot"
+# only needed once a code path asks for them
+DEFERRED = ("discord", "selenium", "webdriver_manager", "websockets")
+
+
+def importtime(module, env):
+    """{module: (self_us, cumulative_us)} of one cold interpreter importing ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue    # the header line
+        times[parts[2].strip()] = (self_us, cumulative_us)
+    return times
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-ms", type=float, default=250)
+    ap.add_argument("--runs",   type=int,   default=5)
+    ap.add_argument("--top",    type=int,   default=10)
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("LOCALAPPDATA", tempfile.gettempdir())
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+
+    runs  = [importtime(MODULE, env) for _ in range(args.runs)]
+    best  = min(runs, key=lambda t: t[MODULE][1])
+    total = best[MODULE][1] / 1000
+
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    heaviest = sorted(best.items(), key=lambda kv: kv[1][1], reverse=True)
+    for name, (_, cumulative) in heaviest[:args.top]:
+        print(f"{name:<40} {cumulative / 1000:>14.1f}")
+
+    failed = False
+    leaked = sorted({m.split(".")[0] for m in best} & set(DEFERRED))
+    if leaked:
+        print(f"FAIL: imported on the watch path: {', '.join(leaked)}")
+        failed = True
+    verdict = "FAIL" if total > args.max_ms else "ok"
+    print(f"{verdict}: import {MODULE} took {total:.1f} ms (limit {args.max_ms:.0f} ms, best of {args.runs})")
+    sys.exit(1 if failed or total > args.max_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# bench/bench_json_decode.py
+"""Decode time and tracemalloc peak of each installed JSON backend on a course-sections body.
+
+    python -m bench.bench_json_decode [--payload recorded.json] [--sections 12000] [--watch 5]
+
+``decode`` decodes the whole body, ``catalog`` also fills a SectionCatalog
+from it as a full term pull does, and ``slices`` decodes only the watched
+records cut out by section_parser, as a streamed watch poll does. Without
+--payload a synthetic full-term catalog is generated. Backends that aren't
+installed are skipped.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import json_decode
+from section_catalog import SectionCatalog
+from section_parser import iter_record_slices
+from bench.standin import make_catalog
+
+
+def decode(body, raws):
+    return json_decode.decode_sections(body)
+
+
+def catalog(body, raws):
+    SectionCatalog("bench").refresh(json_decode.decode_sections(body))
+
+
+def slices(body, raws):
+    return [json_decode.decode_record(raw) for raw in raws]
+
+
+def measure(fn, body, raws, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body, raws)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(body, raws)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--payload")
+    ap.add_argument("--sections", type=int, default=12000)
+    ap.add_argument("--watch",    type=int, default=5)
+    ap.add_argument("--repeat",   type=int, default=5)
+    args = ap.parse_args()
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            body = f.read()
+    else:
+        body = json.dumps(make_catalog(args.sections)).encode()
+    records = json_decode.unwrap(json.loads(body))
+    step = max(1, len(records) // args.watch)
+    crns = [str(r["SWV_CLASS_SEARCH_CRN"]) for r in records[step - 1::step]][:args.watch]
+    raws = [raw for _, raw in iter_record_slices([body], crns)]
+    n = len(records)
+    del records
+
+    print(f"payload {len(body) / 1024:.0f} KiB, {n} sections, {len(raws)} watched slices")
+    print(f"{'backend':>8} {'path':>7} {'ms':>9} {'sections/s':>11} {'peak KiB':>10}")
+    for name in json_decode.available():
+        json_decode.use(name)
+        for label, fn, count in (("decode", decode, n), ("catalog", catalog, n), ("slices", slices, len(raws))):
+            ms, peak = measure(fn, body, raws, args.repeat)
+            print(f"{name:>8} {label:>7} {ms:>9.2f} {count / (ms / 1000):>11.0f} {peak:>10.0f}")
+    json_decode.use()
+
+
+if __name__ == "__main__":
+    main()
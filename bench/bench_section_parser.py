@@ -0,0 +1,78 @@
+# bench/bench_section_parser.py
+"""Parse time and tracemalloc peak of the full decode vs. the streaming watched-CRN scan.
+
+    python -m bench.bench_section_parser [--payload recorded.json] [--sections 12000] [--watch 5]
+
+Without --payload a synthetic full-term catalog is generated.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from section_parser import CHUNK_SIZE, iter_watched_sections
+from bench.standin import make_catalog
+
+
+def full_decode(body, crns):
+    # what monitor_crns used to do: resp.json() + a status_map over every record
+    data = json.loads(body)
+    records = data if isinstance(data, list) else data.get("courseSections", [])
+    status_map = {}
+    for r in records:
+        crn = r.get("SWV_CLASS_SEARCH_CRN")
+        if crn is not None:
+            status_map[str(crn)] = {
+                "open":  r.get("STUSEAT_OPEN") == "Y",
+                "title": f"{r.get('SWV_CLASS_SEARCH_SUBJECT')} {r.get('SWV_CLASS_SEARCH_COURSE')} – {r.get('SWV_CLASS_SEARCH_TITLE')}"
+            }
+    return [status_map.get(c) for c in crns]
+
+
+def streaming(body, crns):
+    chunks = (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+    return list(iter_watched_sections(chunks, crns))
+
+
+def measure(fn, body, crns, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(body, crns)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(body, crns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--payload")
+    ap.add_argument("--sections", type=int, default=12000)
+    ap.add_argument("--watch",    type=int, default=5)
+    ap.add_argument("--repeat",   type=int, default=5)
+    args = ap.parse_args()
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            body = f.read()
+    else:
+        body = json.dumps(make_catalog(args.sections)).encode()
+    data = json.loads(body)
+    records = data if isinstance(data, list) else data.get("courseSections", [])
+    step = max(1, len(records) // args.watch)
+    # spread the watched CRNs so the scan can't stop early
+    crns = [str(r["SWV_CLASS_SEARCH_CRN"]) for r in records[step - 1::step]][:args.watch]
+    del data, records
+
+    print(f"payload {len(body) / 1024:.0f} KiB, watching {len(crns)} CRNs")
+    print(f"{'path':>10} {'parse ms':>10} {'peak KiB':>10}")
+    for label, fn in (("json", full_decode), ("streaming", streaming)):
+        ms, peak = measure(fn, body, crns, args.repeat)
+        print(f"{label:>10} {ms:>10.1f} {peak:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
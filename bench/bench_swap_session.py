@@ -0,0 +1,65 @@
+# bench/bench_swap_session.py
+"""Frames and time per swap attempt: the old re-authorize-every-time loop vs. SwapSession.
+
+    python -m bench.bench_swap_session [--attempts 200] [--token-ms 50]
+
+``--token-ms`` is how long the (fake) token fetch blocks, standing in for
+the HTTP round trip to the token endpoint.
+"""
+import argparse
+import asyncio
+import time
+
+import websockets
+
+from swap_session import SwapSession, TokenCache, encode_event
+from bench.fake_socketio import FakeSocketIO
+
+PAYLOAD = {"subdomain": "tamu", "type": "ENROLL_CART", "termCode": "202531",
+           "regNumberRequests": [{"regNumber": "10001", "action": "DW"}, {"regNumber": "10002"}]}
+
+
+async def legacy(url, attempts, fetch):
+    # what send_message used to do: blocking token fetch in the loop, authorize before every attempt
+    async with websockets.connect(url) as ws:
+        token, _ = fetch()
+        for _ in range(attempts):
+            await ws.send(f'420["authorize",{{"token":"{token}"}}]')
+            await ws.send(encode_event("registration-request", PAYLOAD, 1))
+
+
+async def pooled(url, attempts, fetch):
+    session = SwapSession(url, TokenCache(fetch))
+    runner  = asyncio.ensure_future(session.run())
+    await session.wait_ready(10)
+    for _ in range(attempts):
+        await session.emit("registration-request", PAYLOAD)
+    await session.close()
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--attempts", type=int, default=200)
+    ap.add_argument("--token-ms", type=float, default=50)
+    args = ap.parse_args()
+
+    def fetch():
+        time.sleep(args.token_ms / 1000)
+        return "token", 1800
+
+    print(f"{'session':>8} {'frames/attempt':>15} {'ms total':>10}")
+    for label, run in (("legacy", legacy), ("pooled", pooled)):
+        # no acks: the legacy loop never reads, so acks would back up and stall the server
+        with FakeSocketIO(reply=lambda event, data: None) as server:
+            start = time.perf_counter()
+            asyncio.run(run(server.url, args.attempts, fetch))
+            elapsed = (time.perf_counter() - start) * 1000
+            time.sleep(0.2)    # let the server read the last frames
+            frames = sum(1 for f in server.frames if f.startswith("42"))
+            print(f"{label:>8} {frames / args.attempts:>15.2f} {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench/fake_socketio.py
+"""Local stand-in for College Scheduler's socket.io endpoint (Engine.IO v3 over a websocket)."""
+import asyncio
+import json
+import threading
+import time
+
+import websockets
+
+
+class FakeSocketIO:
+    """Speaks just enough socket.io for swap mode and records what clients send.
+
+    ``reply(event, data)`` decides the ack payload for an event sent with an
+    ack id (default ``[{"success": true}]``); ``frames`` keeps every text frame
+    received and ``frame_times`` the ``time.time()`` each arrived at,
+    ``kick()`` drops all connected clients.
+    """
+
+    def __init__(self, ping_interval=25000, ping_timeout=20000, reply=None, answer_pings=True):
+        self.ping_interval = ping_interval
+        self.ping_timeout  = ping_timeout
+        self.reply         = reply or (lambda event, data: [{"success": True}])
+        self.answer_pings  = answer_pings
+        self.frames        = []
+        self.frame_times   = []
+        self.connections   = 0
+        self.url           = None
+        self._clients      = set()
+        self._loop         = None
+        self._server       = None
+        self._started      = threading.Event()
+
+    def count(self, event):
+        return sum(1 for f in self.frames if f.startswith("42") and f'["{event}"' in f)
+
+    async def _handler(self, ws):
+        self.connections += 1
+        self._clients.add(ws)
+        try:
+            await ws.send("0" + json.dumps({
+                "sid": f"fake{self.connections}", "upgrades": [],
+                "pingInterval": self.ping_interval, "pingTimeout": self.ping_timeout
+            }))
+            await ws.send("40")
+            async for frame in ws:
+                self.frame_times.append(time.time())
+                self.frames.append(frame)
+                if frame == "2":
+                    if self.answer_pings:
+                        await ws.send("3")
+                elif frame.startswith("42"):
+                    body = frame[2:]
+                    i = 0
+                    while i < len(body) and body[i].isdigit():
+                        i += 1
+                    if i:
+                        event, data = (json.loads(body[i:]) + [None])[:2]
+                        reply = self.reply(event, data)
+                        if reply is not None:
+                            await ws.send(f"43{body[:i]}" + json.dumps(reply))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._clients.discard(ws)
+
+    def kick(self):
+        for ws in list(self._clients):
+            asyncio.run_coroutine_threadsafe(ws.close(), self._loop)
+
+    def _serve(self):
+        async def main():
+            self._loop   = asyncio.get_running_loop()
+            self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+            port = self._server.sockets[0].getsockname()[1]
+            self.url = f"ws://127.0.0.1:{port}/socket.io/?EIO=3&transport=websocket"
+            self._started.set()
+            await self._server.wait_closed()
+        asyncio.run(main())
+
+    def __enter__(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._server.close)
@@ -0,0 +1,95 @@
+# bench/harness.py
+"""Offline replay harness: howdy, the token endpoint and socket.io, all on localhost.
+
+The howdy stand-in (course sections, all-terms, token) runs in a child
+process so its JSON encoding doesn't show up in the CPU the benchmarks
+charge to the bot; the fake socket.io server is light and stays in this
+process, where its frame arrival times can be read directly.
+
+    with Harness({"202531": make_catalog(6000)}) as h:
+        h.open_at("202531", "10007", time.time() + 5)
+        ... point scheduler_bot at h.howdy_url / h.token_url / h.socket_url ...
+
+Catalogs can be synthetic (``make_catalog``) or a recorded course-sections
+response (``load_catalog``).
+"""
+import json
+import multiprocessing
+
+from bench.fake_socketio import FakeSocketIO
+from bench.standin import TOKEN_PATH, SeatScript, StandinServer
+
+
+def load_catalog(path):
+    """Section dicts of a recorded /api/course-sections response."""
+    with open(path, "rb") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else data.get("courseSections", [])
+
+
+def _serve(catalogs, conn):
+    script = SeatScript()
+    with StandinServer(catalogs, mutate=script) as server:
+        conn.send(server.url)
+        while True:
+            cmd, *args = conn.recv()
+            if cmd == "open":
+                with server._lock:
+                    script.open_at(*args, server.catalogs)
+                conn.send(None)
+            elif cmd == "stats":
+                conn.send({"requests": server.requests, "bytes_sent": server.bytes_sent})
+            elif cmd == "reset":
+                server.reset_counters()
+                conn.send(None)
+            else:
+                return
+
+
+class Harness:
+    """Stand-in howdy in a child process plus a FakeSocketIO, with scripted seat openings."""
+
+    def __init__(self, catalogs, reply=None):
+        self.catalogs  = catalogs
+        self.socketio  = FakeSocketIO(reply=reply)
+        self.howdy_url = None
+        self._conn     = None
+        self._proc     = None
+
+    @property
+    def token_url(self):
+        return self.howdy_url + TOKEN_PATH
+
+    @property
+    def socket_url(self):
+        return self.socketio.url
+
+    def _call(self, *cmd):
+        self._conn.send(cmd)
+        return self._conn.recv()
+
+    def open_at(self, term, crn, when):
+        """Close ``crn`` now and open it once ``time.time()`` reaches ``when``."""
+        self._call("open", term, crn, when)
+
+    def stats(self):
+        return self._call("stats")
+
+    def reset_counters(self):
+        self._call("reset")
+
+    def __enter__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(target=_serve, args=(self.catalogs, child), daemon=True)
+        self._proc.start()
+        self.howdy_url = self._conn.recv()
+        self.socketio.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.socketio.__exit__(*exc)
+        self._conn.send(("stop",))
+        self._proc.join(5)
+        if self._proc.is_alive():
+            self._proc.kill()
@@ -0,0 +1,181 @@
+# bench/standin.py
+"""Local stand-in for the howdy API, used by the benchmarks in this folder."""
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOKEN_PATH = "/api/oauth/student/client-credentials/token"
+
+SUBJECTS = ["ACCT", "BIOL", "CHEM", "CSCE", "ECEN", "ENGL", "HIST", "MATH", "MEEN", "PHYS", "POLS", "STAT"]
+
+
+def make_section(i, term, rng=random):
+    subject = SUBJECTS[i % len(SUBJECTS)]
+    course  = str(100 + (i // len(SUBJECTS)) % 400)
+    return {
+        "SWV_CLASS_SEARCH_CRN":        str(10000 + i),
+        "SWV_CLASS_SEARCH_TERM":       term,
+        "SWV_CLASS_SEARCH_SUBJECT":    subject,
+        "SWV_CLASS_SEARCH_COURSE":     course,
+        "SWV_CLASS_SEARCH_SECTION":    f"{500 + i % 100:03d}",
+        "SWV_CLASS_SEARCH_TITLE":      f"{subject} TOPICS {course}",
+        "SWV_CLASS_SEARCH_SITE":       "College Station",
+        "SWV_CLASS_SEARCH_PTRM":       "1",
+        "SWV_CLASS_SEARCH_HOURS_LOW":  3,
+        "SWV_CLASS_SEARCH_INST_TYPE":  "Traditional Face-to-Face (F2F)",
+        "SWV_CLASS_SEARCH_INSTRCTR_JSON": json.dumps([{"NAME": f"Instructor {i % 700}", "HAS_CV": "Y"}]),
+        "SWV_CLASS_SEARCH_JSON_CLOB":  json.dumps([{
+            "SSRMEET_BEGIN_TIME": "0910", "SSRMEET_END_TIME": "1000",
+            "SSRMEET_MON_DAY": "M", "SSRMEET_WED_DAY": "W", "SSRMEET_FRI_DAY": "F",
+            "SSRMEET_BLDG_CODE": "ZACH", "SSRMEET_ROOM_CODE": str(300 + i % 50)
+        }]),
+        "SWV_CLASS_SEARCH_ATTRIBUTES": "KCOM|Core Communication",
+        "STUSEAT_OPEN":                "Y" if rng.random() < 0.3 else "N",
+    }
+
+
+def make_catalog(n, term="202531", seed=0):
+    rng = random.Random(seed)
+    return [make_section(i, term, rng) for i in range(n)]
+
+
+class SeatScript:
+    """``mutate`` callback opening sections at set wall-clock times.
+
+    ``open_at(term, crn, when)`` closes the section now and opens it on the
+    first course-sections request at or after ``when`` (``time.time()``).
+    """
+
+    def __init__(self):
+        self.pending = []     # (when, term, crn)
+        self._lock   = threading.Lock()
+
+    def open_at(self, term, crn, when, catalogs):
+        for section in catalogs.get(term, []):
+            if section["SWV_CLASS_SEARCH_CRN"] == str(crn):
+                section["STUSEAT_OPEN"] = "N"
+        with self._lock:
+            self.pending.append((when, term, str(crn)))
+
+    def __call__(self, catalogs):
+        now = time.time()
+        with self._lock:
+            due          = [p for p in self.pending if p[0] <= now]
+            self.pending = [p for p in self.pending if p[0] > now]
+        for _, term, crn in due:
+            for section in catalogs.get(term, []):
+                if section["SWV_CLASS_SEARCH_CRN"] == crn:
+                    section["STUSEAT_OPEN"] = "Y"
+
+
+class StandinServer:
+    """Threaded HTTP server answering /api/course-sections from in-memory catalogs.
+
+    ``catalogs`` maps term code → list of section dicts and may be mutated
+    between requests; ``mutate(catalogs)``, if given, is called before every
+    course-sections request. With ``conditional`` the server sends ETag and
+    Last-Modified and answers a matching If-None-Match with 304. GET
+    /api/all-terms lists the catalogs' terms and TOKEN_PATH hands out a token.
+    ``bytes_sent`` / ``requests`` / ``not_modified`` count what went over the wire.
+    """
+
+    def __init__(self, catalogs, mutate=None, conditional=False):
+        self.catalogs     = catalogs
+        self.mutate       = mutate
+        self.conditional  = conditional
+        self.bytes_sent   = 0
+        self.requests     = 0
+        self.not_modified = 0
+        self._lock      = threading.Lock()
+        self._httpd     = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def sections_body(self, payload):
+        sections = self.catalogs.get(payload.get("termCode"), [])
+        crn = payload.get("crn")
+        if crn:
+            sections = [s for s in sections if s["SWV_CLASS_SEARCH_CRN"] == str(crn)]
+        return json.dumps(sections).encode()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # headers and body go out as two writes, don't let Nagle hold the body
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (ConnectionResetError, BrokenPipeError):
+                    pass    # the client hung up, e.g. a streamed full pull stopped once every watched CRN was seen
+
+            def do_GET(self):
+                if self.path == "/api/all-terms":
+                    terms = [{"STVTERM_CODE": code, "STVTERM_DESC": f"Term {code}"} for code in server.catalogs]
+                    self.reply(200, json.dumps(terms).encode())
+                elif self.path == TOKEN_PATH:
+                    self.reply(200, json.dumps({"accessToken": "standin-token", "expiresIn": 1800}).encode())
+                else:
+                    self.reply(404, b"{}")
+
+            def do_POST(self):
+                length  = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/course-sections":
+                    if server.mutate:
+                        with server._lock:
+                            server.mutate(server.catalogs)
+                    body = server.sections_body(payload)
+                    if not server.conditional:
+                        self.reply(200, body)
+                        return
+                    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.reply(304, b"", {"ETag": etag})
+                    else:
+                        self.reply(200, body, {"ETag": etag, "Last-Modified": self.date_time_string()})
+                else:
+                    self.reply(404, b"{}")
+
+            def reply(self, status, body, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.bytes_sent   += len(body)
+                    server.requests     += 1
+                    server.not_modified += status == 304
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def reset_counters(self):
+        with self._lock:
+            self.bytes_sent   = 0
+            self.requests     = 0
+            self.not_modified = 0
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,149 @@
+# config_file.py
+"""Reading, writing and watching config.json.
+
+``save`` writes to a temporary file next to config.json and moves it into
+place with ``os.replace`` (``write_json``, which disk_cache uses too), so the GUI, the monitor and anyone reading the
+file by hand see the old config or the new one, never half of either.
+``update`` merges a few keys into what is on disk under a lock, so the GUI
+saving its fields and the monitor storing a refreshed cookie don't undo
+each other.
+
+``default_dir()`` is where config.json and the caches live: %LOCALAPPDATA%
+on Windows, $XDG_CONFIG_HOME (~/.config) elsewhere, or $CHECKSEATS_HOME
+wherever it is set.
+
+A ConfigWatcher polls the file's size and mtime (no extra dependencies,
+and it works the same on Windows) and calls ``on_change(cfg, changed)``
+with the new config and the set of keys whose values differ from the last
+one it saw.
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+
+from log_pipeline import log, WARNING, ERROR
+
+APP_DIR         = "TAMUClassSwap"
+HOME_ENV        = "CHECKSEATS_HOME"
+WATCH_INTERVAL  = 1.0      # seconds between two looks at the file
+REPLACE_RETRIES = 5        # Windows refuses os.replace while another process has the file open
+REPLACE_BACKOFF = 0.05
+
+_lock = threading.Lock()
+
+
+def default_dir():
+    if os.environ.get(HOME_ENV):
+        return os.environ[HOME_ENV]
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CONFIG_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, APP_DIR)
+
+
+def load(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_json(path, value, prefix=".tmp-", **dump):
+    """Atomically replace ``path`` with ``value`` as JSON: write and fsync a temporary
+    file next to it, then ``os.replace`` it into place (retrying while Windows refuses)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f, **dump)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_BACKOFF * (attempt + 1))
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def save(path, cfg):
+    """Atomically replace ``path`` with ``cfg``."""
+    write_json(path, cfg, prefix=".config-", indent=4)
+
+
+def update(path, changes):
+    """Merge ``changes`` into the config on disk (keys it doesn't mention are kept); returns the result."""
+    with _lock:
+        try:
+            cfg = load(path)
+        except (OSError, ValueError):
+            cfg = {}
+        cfg.update(changes)
+        save(path, cfg)
+        return cfg
+
+
+def diff(old, new):
+    """Keys added, removed or changed between two configs."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+class ConfigWatcher:
+    """Call ``on_change(cfg, changed)`` (a coroutine function) whenever the file at ``path`` changes.
+
+    ``current`` is the config the caller is already running with; the
+    first look at the file is compared against it, so an edit made while
+    the monitor was starting up is not missed.
+    """
+
+    def __init__(self, path, on_change, current=None, interval=WATCH_INTERVAL):
+        self.path      = path
+        self.on_change = on_change
+        self.current   = dict(current or {})
+        self.interval  = interval
+        self.reloads   = 0
+        self._stamp    = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def check(self):
+        """Look at the file once; returns the changed keys (empty if nothing changed)."""
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return set()
+        try:
+            cfg = load(self.path)
+        except (OSError, ValueError) as e:
+            # half-saved by an editor that doesn't write atomically; look again next time
+            log(WARNING, f"[config] {self.path} unreadable, keeping the current settings: {e}")
+            return set()
+        self._stamp = stamp
+        changed = diff(self.current, cfg)
+        if not changed:
+            return changed
+        self.current = cfg
+        self.reloads += 1
+        try:
+            await self.on_change(cfg, changed)
+        except Exception as e:
+            log(ERROR, f"[config] applying {', '.join(sorted(changed))} failed: {e}")
+        return changed
+
+    async def run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
@@ -1,34 +1,135 @@
 # monitor_ui.py
 import os
-import json
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from PIL import Image
 import sys
-import requests
+from concurrent.futures import ThreadPoolExecutor
 import pystray
-import scheduler_bot
+import config_file
+import http_client
+import metrics
+from section_catalog import catalog_for
+from fetch_planner import FetchPlanner, run_query
+from json_decode import decode_sections
+from disk_cache import DiskCache, cached_term_map, load_catalog, save_catalog, TERMS_KEY
+from log_pipeline import LogFile, LogQueue, StreamTap, LEVELS, log, ERROR
 
 # --- CONFIG PATHS & GLOBAL COOKIE ---
-CONFIG_DIR  = os.path.join(os.environ["LOCALAPPDATA"], "TAMUClassSwap")
+CONFIG_DIR  = config_file.default_dir()
 CONFIG_PATH = os.path.join(CONFIG_DIR,    "config.json")
+CACHE_DIR   = os.path.join(CONFIG_DIR,    "cache")
+HOWDY_URL   = "https://howdy.tamu.edu"
 COOKIE      = ""
 
+LOOKUP_BATCH_MS = 150    # wait this long for more CRNs before sending a lookup batch
+LOOKUP_WORKERS  = 8
+
+LOG_DRAIN_MS  = 200     # how often the Monitor tab picks up queued output
+LOG_BATCH     = 2000    # most lines taken per drain
+LOG_MAX_LINES = 2000    # lines kept in the Monitor tab, older ones are cut
+METRICS_MS    = 2000    # refresh of the metrics line, when metrics are on
+
 def save_config(data):
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+    config_file.save(CONFIG_PATH, data)
 
 def load_config():
     if not os.path.exists(CONFIG_PATH):
         save_config({})
-    with open(CONFIG_PATH, "r") as f:
-        return json.load(f)
+    return config_file.load(CONFIG_PATH)
 
 cfg = load_config()
 COOKIE = cfg.get("cookie", "")
 
+# ---------------------------------------------------
+# CRN LOOKUPS, batched and off the Tk thread
+# ---------------------------------------------------
+class CrnLookup:
+    """Course titles for CRNs, looked up without blocking the window.
+
+    CRNs asked for within LOOKUP_BATCH_MS of each other go out as one batch
+    per term, planned by FetchPlanner (per-CRN queries or one streamed term
+    pull), a CRN already in flight isn't asked for twice, and the answers
+    are handed back on the Tk thread through ``after()``.
+    """
+
+    def __init__(self, widget, cookie):
+        self.widget      = widget
+        self.cookie      = cookie        # callable returning the cookie to send
+        self.planner     = FetchPlanner()
+        self._results    = {}            # (term, crn) → title, or None if howdy has no such CRN
+        self._waiting    = {}            # (term, crn) → [callback]
+        self._pending    = {}            # term → [crn] not sent yet
+        self._flush_id   = None
+        self._generation = 0             # bumped by invalidate(); older answers are dropped
+
+    def request(self, term, crn, callback):
+        """Call ``callback(title or None)`` on the Tk thread, now if the answer is known."""
+        catalog = catalog_for(term)
+        section = catalog.get(crn)
+        if section:
+            return callback(section.label)
+        key = (term, crn)
+        if key in self._results:
+            return callback(self._results[key])
+        if catalog.complete:
+            return callback(None)
+        if key in self._waiting:
+            self._waiting[key].append(callback)
+            return
+        self._waiting[key] = [callback]
+        self._pending.setdefault(term, []).append(crn)
+        if self._flush_id is None:
+            self._flush_id = self.widget.after(LOOKUP_BATCH_MS, self._flush)
+
+    def invalidate(self):
+        """Forget every answer and drop lookups still in flight."""
+        self._generation += 1
+        self._results.clear()
+        self._waiting.clear()
+        self._pending.clear()
+        if self._flush_id is not None:
+            self.widget.after_cancel(self._flush_id)
+            self._flush_id = None
+
+    def _flush(self):
+        self._flush_id = None
+        batches, self._pending = self._pending, {}
+        cookie = self.cookie()
+        for term, crns in batches.items():
+            threading.Thread(
+                target=self._lookup, args=(term, crns, cookie, self._generation), daemon=True
+            ).start()
+
+    def _lookup(self, term, crns, cookie, generation):
+        catalog = catalog_for(term)
+        failed  = set()
+        print(f"[ConfigTab] Looking up CRN(s) {', '.join(crns)} for term {term}")
+
+        def run(query):
+            try:
+                catalog.upsert(run_query(session, query, HOWDY_URL, cookie, http_client.TIMEOUT, self.planner, crns))
+            except Exception as e:
+                failed.update([query.crn] if query.crn else crns)
+                log(ERROR, f"[ConfigTab] CRN lookup error for {query.crn or ', '.join(crns)}: {e}")
+
+        session = http_client.shared_session()
+        with ThreadPoolExecutor(LOOKUP_WORKERS) as pool:
+            list(pool.map(run, self.planner.plan(term, crns)))
+        titles = {crn: (catalog.get(crn).label if catalog.get(crn) else None) for crn in crns}
+        self.widget.after(0, self._deliver, term, titles, failed, generation)
+
+    def _deliver(self, term, titles, failed, generation):
+        if generation != self._generation:
+            return
+        for crn, title in titles.items():
+            # a failed lookup isn't an answer, ask again next time
+            if crn not in failed:
+                self._results[(term, crn)] = title
+            for callback in self._waiting.pop((term, crn), ()):
+                callback(title)
+
 # ---------------------------------------------------
 # COURSE GROUP FRAME now with a single CRN entry
 # ---------------------------------------------------
@@ -58,15 +159,15 @@ class CourseGroupFrame(tk.Frame):
             self.course_title_var.set("")
             return
 
-        # show searching state
+        # show searching state; the title is filled in when the lookup answers
         self.course_title_var.set("searching…")
-        self.update_idletasks()
 
-        title = self.fetch_by_crn_cb(crn)
-        if title:
-            self.course_title_var.set(title)
-        else:
-            self.course_title_var.set("n/a")
+        def show(title):
+            # ignore answers for a CRN that has since been edited
+            if self.get_crn() == crn:
+                self.course_title_var.set(title or "n/a")
+
+        self.fetch_by_crn_cb(crn, show)
 
     def remove_self(self):
         if self.remove_cb:
@@ -98,10 +199,15 @@ class ConfigTab(ttk.Frame):
         self.sf_var = tk.StringVar()
         self.st_var = tk.StringVar()
         self.tc_var = tk.StringVar()
+        self.wt_var = tk.StringVar()
 
         # course‑groups
         self.course_groups = []
         self._term_map     = {}
+        self._terms_cookie = None    # cookie the term list was last revalidated with
+        self._disk_cookie  = ""      # cookie as last read from config.json, to tell whether the user edited it
+        self.cache         = DiskCache(CACHE_DIR)
+        self.lookups       = CrnLookup(self, lambda: self.cookie_var.get() or COOKIE)
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
@@ -110,69 +216,91 @@ class ConfigTab(ttk.Frame):
         self.build_ui()
         self.load_config_into_fields()
         self.update_type_fields()
+        # the window is up on cached terms; check them against howdy behind it
+        self.refresh_terms_and_courses()
+
+    def fetch_terms(self, cookie):
+        """{term description: term code} straight from howdy (blocking)."""
+        resp = http_client.get(f"{HOWDY_URL}/api/all-terms", headers={"Cookie": cookie})
+        resp.raise_for_status()
+        return {
+            t["STVTERM_DESC"]: t["STVTERM_CODE"]
+            for t in resp.json()
+            if "STVTERM_DESC" in t and "STVTERM_CODE" in t
+        }
 
-    def fetch_terms(self):
-        cookie = self.cookie_var.get() or COOKIE
-        try:
-            resp = requests.get(
-                "https://howdy.tamu.edu/api/all-terms",
-                headers={"Cookie": cookie},
-                timeout=10
-            )
-            resp.raise_for_status()
-            terms = resp.json()
-            self._term_map = {
-                t["STVTERM_DESC"]: t["STVTERM_CODE"]
-                for t in terms
-                if "STVTERM_DESC" in t and "STVTERM_CODE" in t
-            }
-            return list(self._term_map.keys())
-        except Exception as e:
-            print(f"[ConfigTab] Failed to fetch terms: {e}")
-            return []
-
-    def fetch_by_crn(self, crn):
-        cookie    = self.cookie_var.get() or COOKIE
-        term_desc = self.term_var.get()
-        term_code = self._term_map.get(term_desc)
+    def cached_terms(self):
+        """Term names from the disk cache however old they are, so the window needn't wait."""
+        terms, _ = self.cache.load(TERMS_KEY)
+        self._term_map = terms or {}
+        return list(self._term_map)
+
+    def fetch_by_crn(self, crn, callback):
+        """Look up ``crn`` in the selected term; ``callback(title or None)`` runs on the Tk thread."""
+        term_code = self._term_map.get(self.term_var.get())
         if not term_code:
-            return None
-
-        payload = {
-            "startRow":     0,
-            "endRow":       0,
-            "termCode":     term_code,
-            "publicSearch": "Y",
-            "crn":          crn
-        }
-        try:
-            print(f"[ConfigTab] Looking up CRN {crn} for term {term_desc} ({term_code})")
-            resp = requests.post(
-                "https://howdy.tamu.edu/api/course-sections",
-                json=payload,
-                headers={"Cookie": cookie},
-                timeout=10
-            )
-            resp.raise_for_status()
-            data     = resp.json()
-            sections = data if isinstance(data, list) else data.get("courseSections", [])
-            for s in sections:
-                if str(s.get("SWV_CLASS_SEARCH_CRN","")) == crn:
-                    sub   = s["SWV_CLASS_SEARCH_SUBJECT"]
-                    num   = s["SWV_CLASS_SEARCH_COURSE"]
-                    title = s["SWV_CLASS_SEARCH_TITLE"]
-                    return f"{sub} {num} – {title}"
-        except Exception as e:
-            print(f"[ConfigTab] CRN lookup error for {crn}: {e}")
-        return None
+            return callback(None)
+        self.lookups.request(term_code, crn, callback)
+
+    def load_term_catalog(self, term_code):
+        """Fill the shared catalog for the term in the background, from disk if it is fresh there."""
+        cookie = self.cookie_var.get() or COOKIE
+        if not term_code or catalog_for(term_code).complete:
+            return
+
+        def load():
+            catalog = catalog_for(term_code)
+            if load_catalog(self.cache, catalog):
+                print(f"[ConfigTab] Loaded {len(catalog)} sections for term {term_code} from cache")
+                return
+            try:
+                resp = http_client.post(
+                    f"{HOWDY_URL}/api/course-sections",
+                    json={"startRow": 0, "endRow": 0, "termCode": term_code, "publicSearch": "Y"},
+                    headers={"Cookie": cookie},
+                    timeout=(http_client.TIMEOUT[0], 30)
+                )
+                resp.raise_for_status()
+                sections = decode_sections(resp.content)
+                catalog.refresh(sections)
+                save_catalog(self.cache, catalog)
+                print(f"[ConfigTab] Loaded {len(sections)} sections for term {term_code}")
+            except Exception as e:
+                log(ERROR, f"[ConfigTab] Failed to load sections for term {term_code}: {e}")
+
+        threading.Thread(target=load, daemon=True).start()
 
     def refresh_terms_and_courses(self):
-        terms = self.fetch_terms()
-        self.term_dropdown["values"] = terms
+        """Revalidate the term list in the background; only once per cookie while it works."""
+        cookie = self.cookie_var.get() or COOKIE
+        if cookie == self._terms_cookie:
+            return
+        self._terms_cookie = cookie
+
+        def load():
+            try:
+                terms = cached_term_map(self.cache, lambda: self.fetch_terms(cookie))
+            except Exception as e:
+                log(ERROR, f"[ConfigTab] Failed to fetch terms: {e}")
+                self.after(0, lambda: setattr(self, "_terms_cookie", None))
+                return
+            self.after(0, self.on_terms_loaded, terms)
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def on_terms_loaded(self, terms):
+        before = self._term_map.get(self.term_var.get())
+        self._term_map = terms
+        self.term_dropdown["values"] = list(terms)
+        # the saved term's code may only be known now
+        if self._term_map.get(self.term_var.get()) != before:
+            self.on_term_select(None)
 
     def on_term_select(self, _evt):
+        self.lookups.invalidate()
+        self.load_term_catalog(self._term_map.get(self.term_var.get()))
         for cg in self.course_groups:
-            cg.course_title_var.set("")
+            cg.on_crn_focus_out(None)
 
     def build_ui(self):
         # --- REQUIRED SETTINGS ---
@@ -213,7 +341,7 @@ class ConfigTab(ttk.Frame):
             .grid(row=7, column=0, sticky="e", padx=5, pady=5)
         self.term_dropdown = ttk.Combobox(
             self, textvariable=self.term_var,
-            values=self.fetch_terms(), state="readonly", width=37
+            values=self.cached_terms(), state="readonly", width=37
         )
         self.term_dropdown.grid(row=7, column=1, sticky="w", padx=5, pady=5)
         self.term_dropdown.bind("<<ComboboxSelected>>", self.on_term_select)
@@ -228,6 +356,10 @@ class ConfigTab(ttk.Frame):
                        value="watch", command=self.update_type_fields).pack(side="left")
         tk.Radiobutton(mf, text="Swap",  variable=self.type_var,
                        value="swap",  command=self.update_type_fields).pack(side="left")
+        tk.Radiobutton(mf, text="Swap when open", variable=self.type_var,
+                       value="watch_swap", command=self.update_type_fields).pack(side="left")
+        tk.Radiobutton(mf, text="Swap at time", variable=self.type_var,
+                       value="window", command=self.update_type_fields).pack(side="left")
 
         # --- WATCH: CRN groups ---
         self.course_groups_container = tk.Frame(self)
@@ -243,6 +375,13 @@ class ConfigTab(ttk.Frame):
         tk.Label(self.swap_frame, text="Swap To").grid(row=1, column=0, sticky="e", padx=5, pady=2)
         tk.Entry(self.swap_frame, textvariable=self.st_var, width=40)\
             .grid(row=1, column=1, sticky="w", padx=5, pady=2)
+        tk.Label(self.swap_frame, text="any of these CRNs, comma-separated", fg="gray")\
+            .grid(row=1, column=2, sticky="w", padx=5)
+        tk.Label(self.swap_frame, text="Window Time").grid(row=2, column=0, sticky="e", padx=5, pady=2)
+        tk.Entry(self.swap_frame, textvariable=self.wt_var, width=40)\
+            .grid(row=2, column=1, sticky="w", padx=5, pady=2)
+        tk.Label(self.swap_frame, text="e.g. 2026-11-02T08:00:00-06:00 (Swap at time only)", fg="gray")\
+            .grid(row=3, column=1, sticky="w", padx=5)
         self.swap_frame.grid(row=10, column=0, columnspan=3, sticky="we")
 
         # --- SAVE BUTTON ---
@@ -281,14 +420,16 @@ class ConfigTab(ttk.Frame):
         self.username_var.set(data.get("username",""))
         self.password_var.set(data.get("password",""))
         self.cookie_var.set(data.get("cookie",""))
-        COOKIE = data.get("cookie","")
+        COOKIE = self._disk_cookie = data.get("cookie","")
         self.token_var.set(data.get("discord_token",""))
         self.channel_var.set(data.get("channel_name",""))
         self.id_var.set(data.get("discord_account_id",""))
         self.term_var.set(data.get("term_name",""))
+        self.load_term_catalog(self._term_map.get(self.term_var.get()))
         self.type_var.set(data.get("type","watch"))
         self.sf_var.set(data.get("swap_from",""))
         self.st_var.set(data.get("swap_to",""))
+        self.wt_var.set(data.get("window_time",""))
 
         # clear existing groups
         for cg in self.course_groups:
@@ -308,10 +449,11 @@ class ConfigTab(ttk.Frame):
             self.course_groups.append(cg)
 
     def save_fields_to_config(self):
-        cfg = {
+        # merged into what's on disk: keys set by hand (swap_rules, metrics, …) and the
+        # monitor's own (cookie_refreshed_at) survive, and a running monitor picks up the change
+        fields = {
             "username":            self.username_var.get(),
             "password":            self.password_var.get(),
-            "cookie":              self.cookie_var.get(),
             "discord_token":       self.token_var.get(),
             "channel_name":        self.channel_var.get(),
             "discord_account_id":  self.id_var.get(),
@@ -319,48 +461,85 @@ class ConfigTab(ttk.Frame):
             "type":                self.type_var.get(),
             "swap_from":           self.sf_var.get(),
             "swap_to":             self.st_var.get(),
+            "window_time":         self.wt_var.get(),
             "crns_to_watch":       [cg.get_crn() for cg in self.course_groups]
         }
-        save_config(cfg)
+        # the monitor may have refreshed the cookie since we loaded it; only write the field
+        # back if the user changed it, and then as just obtained
+        if self.cookie_var.get() != self._disk_cookie:
+            fields["cookie"] = self.cookie_var.get()
+            fields["cookie_refreshed_at"] = None
+        cfg = config_file.update(CONFIG_PATH, fields)
         messagebox.showinfo("Saved","Configuration saved!")
         global COOKIE
-        COOKIE = self.cookie_var.get()
+        COOKIE = self._disk_cookie = cfg.get("cookie", "")
+        self.cookie_var.set(COOKIE)
         self.update_type_fields()
 
 # ---------------------------------------------------
-# MonitorTab + main() remain unchanged
+# MonitorTab: stdout → LogQueue → log box, drained on a timer
 # ---------------------------------------------------
 class MonitorTab(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
+        self.log_queue = LogQueue()
+        self.level_var = tk.StringVar(value=cfg.get("log_level", "INFO"))
+        # "log_file": true in config.json also keeps everything in a rotating monitor.log
+        self.log_file  = LogFile(os.path.join(CONFIG_DIR, "monitor.log")) if cfg.get("log_file") else None
+
         self.log_box = tk.Text(self, height=20, wrap="word")
         self.log_box.pack(fill="both", expand=True, padx=10, pady=10)
-        sys.stdout = TextRedirector(self.log_box)
+        sys.stdout = StreamTap(self.log_queue)
         btn_frame = tk.Frame(self)
         btn_frame.pack()
         tk.Button(btn_frame, text="Start Monitor", command=self.start_monitor).pack(side="left", padx=5)
         tk.Button(btn_frame, text="Stop Monitor",  command=self.stop_monitor).pack(side="left", padx=5)
+        tk.Label(btn_frame, text="Show:").pack(side="left", padx=(15, 5))
+        ttk.Combobox(btn_frame, textvariable=self.level_var, values=list(LEVELS),
+                     state="readonly", width=8).pack(side="left")
+        # filled in once monitoring starts with "metrics" or "metrics_port" in config.json
+        self.metrics_var = tk.StringVar()
+        tk.Label(self, textvariable=self.metrics_var, fg="gray", anchor="w", justify="left", wraplength=760)\
+            .pack(fill="x", padx=10, pady=(0, 5))
+        self.after(LOG_DRAIN_MS, self.drain_log)
+        self.after(METRICS_MS, self.show_metrics)
+
+    def drain_log(self):
+        lines = self.log_queue.drain(LOG_BATCH)
+        if lines:
+            if self.log_file:
+                self.log_file.write(lines)
+            level = LEVELS.get(self.level_var.get(), 0)
+            text  = "".join(line.text + "\n" for line in lines if line.level >= level)
+            if text:
+                self.log_box.insert(tk.END, text)
+                # the text ends in a newline, so the last "line" is the empty one after it
+                excess = int(self.log_box.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+                if excess > 0:
+                    self.log_box.delete("1.0", f"{excess + 1}.0")
+                self.log_box.see(tk.END)
+        # come back sooner when there is a backlog
+        self.after(1 if len(self.log_queue) else LOG_DRAIN_MS, self.drain_log)
+
+    def show_metrics(self):
+        if metrics.enabled():
+            self.metrics_var.set(metrics.summary())
+        self.after(METRICS_MS, self.show_metrics)
 
     def start_monitor(self):
+        # imported here so the window doesn't wait on the bot's dependencies
+        import scheduler_bot
         threading.Thread(target=scheduler_bot.start_monitoring, daemon=True).start()
         self.log("Monitoring started.")
 
     def stop_monitor(self):
+        import scheduler_bot
         scheduler_bot.stop_monitoring()
         self.log("Monitoring stop requested.")
 
     def log(self, msg):
-        self.log_box.insert(tk.END, msg + "\n")
-        self.log_box.see(tk.END)
-
-class TextRedirector:
-    def __init__(self, widget):
-        self.widget = widget
-    def write(self, msg):
-        self.widget.insert(tk.END, msg)
-        self.widget.see(tk.END)
-    def flush(self):
-        pass
+        # through the queue like everything else, so it stays in order
+        print(msg)
 
 def main():
     root = tk.Tk()
@@ -0,0 +1 @@
+# conftest.py: lets the tests import the flat modules at the repo root
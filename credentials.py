@@ -0,0 +1,191 @@
+# credentials.py
+"""College Scheduler cookie lifecycle, kept off the poll and swap loops.
+
+CredentialManager holds the current cookie and when it was obtained. A
+background thread refreshes it once it is REFRESH_AT of the way through its
+assumed lifetime, and callers that find it rejected can ask for a refresh
+too; either way only one browser login runs at a time and everyone else
+keeps using the old cookie until the new one is swapped in.
+
+The browser step is any callable returning a cookie string, so tests can
+plug in a fake. ChromeLogin is the real one: it starts headless Chrome on
+first use, keeps that one process warm for later refreshes and remembers
+where webdriver_manager put chromedriver, so later starts skip the network.
+"""
+import os
+import threading
+import time
+
+import metrics
+from log_pipeline import log, ERROR
+
+COOKIE_TTL = 6 * 3600    # seconds a cookie is assumed to last
+REFRESH_AT = 0.8         # refresh once this fraction of COOKIE_TTL has passed
+RETRY_WAIT = 60          # seconds before retrying a failed background refresh
+
+ENTRY_URL     = "https://tamu.collegescheduler.com/entry"
+DASHBOARD_URL = "https://tamu.collegescheduler.com/dashboard"
+
+
+class ChromeLogin:
+    """Log in with a reused headless Chrome and return the session cookie string."""
+
+    def __init__(self, username="", password="", cache_dir=None):
+        self.username  = username
+        self.password  = password
+        self.cache_dir = cache_dir
+        self.driver    = None
+        self._lock     = threading.Lock()
+
+    def driver_path(self):
+        """chromedriver's path, resolved through webdriver_manager once and cached on disk."""
+        cache = os.path.join(self.cache_dir, "chromedriver_path.txt") if self.cache_dir else None
+        if cache and os.path.exists(cache):
+            with open(cache, "r") as f:
+                path = f.read().strip()
+            if os.path.exists(path):
+                return path
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+        if cache:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache, "w") as f:
+                f.write(path)
+        return path
+
+    def start(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        opts = webdriver.ChromeOptions()
+        opts.add_argument("--headless")
+        opts.add_argument("--disable-gpu")
+        opts.add_argument("--window-size=1920,1080")
+        opts.add_argument("user-agent=Mozilla/5.0")
+        self.driver = webdriver.Chrome(service=Service(self.driver_path()), options=opts)
+
+    def __call__(self):
+        with self._lock:
+            if self.driver is None:
+                self.start()
+            try:
+                return self._login()
+            except Exception:
+                # a crashed or wedged browser: start a fresh one next time
+                self.close()
+                raise
+
+    def _login(self):
+        self.driver.get(ENTRY_URL)
+        # … login flow as before …
+        self.driver.get(DASHBOARD_URL)
+        time.sleep(3)
+        cookies = self.driver.get_cookies()
+        return "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+class CredentialManager:
+    """The current cookie, its age, and single-flight refreshes through ``login()``."""
+
+    def __init__(self, login, cookie="", obtained_at=None, on_change=None,
+                 ttl=COOKIE_TTL, refresh_at=REFRESH_AT, clock=time.time):
+        self.login         = login
+        self.on_change     = on_change      # on_change(cookie, obtained_at), after each refresh
+        self.ttl           = ttl
+        self.refresh_at    = refresh_at
+        self.clock         = clock
+        self.refreshes     = 0
+        self.failures      = 0
+        self.last_duration = None
+        self._cookie       = (cookie, obtained_at if obtained_at is not None else (clock() if cookie else 0.0))
+        self._lock         = threading.Lock()
+        self._inflight     = None           # Event set when the running refresh finishes
+        self._stop         = threading.Event()
+        self._thread       = None
+
+    @property
+    def cookie(self):
+        return self._cookie[0]
+
+    @property
+    def age(self):
+        return self.clock() - self._cookie[1]
+
+    def due_in(self):
+        """Seconds until the background refresh is due (0 if it already is)."""
+        if not self.cookie:
+            return 0.0
+        return max(0.0, self.ttl * self.refresh_at - self.age)
+
+    def use(self, cookie, obtained_at=None):
+        """Switch to a cookie obtained elsewhere (pasted into config.json, say)."""
+        self._cookie = (cookie, obtained_at if obtained_at is not None else self.clock())
+
+    def refresh(self, stale=None):
+        """Log in again and return the new cookie; blocks, and joins a refresh already running.
+
+        With ``stale`` (the cookie a caller saw rejected), nothing happens if it has
+        already been replaced in the meantime.
+        """
+        with self._lock:
+            if stale is not None and stale != self.cookie:
+                return self.cookie
+            waiting = self._inflight
+            if waiting is None:
+                waiting = self._inflight = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            waiting.wait()
+            return self.cookie
+        start = self.clock()
+        try:
+            print("Refreshing cookie via browser login…")
+            cookie = self.login()
+            now = self.clock()
+            self._cookie = (cookie, now)    # one assignment, readers see old or new, never a mix
+            self.refreshes += 1
+            self.last_duration = now - start
+            metrics.observe("cookie_refresh_seconds", self.last_duration)
+            metrics.inc("cookie_refreshes_total", result="ok")
+            print(f"Cookie refreshed in {self.last_duration:.1f}s")
+            if self.on_change:
+                self.on_change(cookie, now)
+            return cookie
+        except Exception:
+            self.failures += 1
+            metrics.inc("cookie_refreshes_total", result="failed")
+            raise
+        finally:
+            with self._lock:
+                self._inflight = None
+            waiting.set()
+
+    # ───── background refresh ─────
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cookie-refresh", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.due_in()):
+            try:
+                self.refresh()
+            except Exception as e:
+                log(ERROR, f"[CredentialManager] background refresh failed: {e}")
+                if self._stop.wait(RETRY_WAIT):
+                    return
+
+    def close(self):
+        self._stop.set()
+        close = getattr(self.login, "close", None)
+        if close:
+            close()
@@ -0,0 +1,148 @@
+# daemon.py
+"""Watch many profiles headless, from one process or a pool of them.
+
+    python daemon.py PROFILE [PROFILE ...] [--workers N] [--metrics-port 9464]
+
+Each PROFILE is a config.json written by the config GUI, or a folder of
+them. Watched CRNs are merged per term into one deduplicated poll set, so
+upstream traffic grows with the distinct terms and CRNs rather than with the
+number of people; every seat event is then posted to the Discord channel of
+each profile that watches that CRN, pinging its ``discord_account_id`` when
+the section opened.
+
+With ``--workers N`` the poll set is split over N worker processes (see
+worker_pool.py) so decoding isn't bound to one interpreter; Discord stays in
+this process. Nothing here imports Tk, pystray or PIL, and SIGTERM stops it
+cleanly, so it runs as a service on a Linux box.
+"""
+import argparse
+import glob
+import json
+import os
+import signal
+from collections import namedtuple
+
+import metrics
+from log_pipeline import log, WARNING
+import scheduler_bot
+from scheduler_bot import format_seat_event, monitor_crns, notify_discord
+from seat_state import OPENED
+
+Profile = namedtuple("Profile", ["name", "term_name", "crns", "cookie", "discord_token", "channel_name", "ping"])
+
+
+def load_profiles(paths):
+    """Profiles from config files and folders of config files; swap profiles are skipped."""
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path])
+    profiles = []
+    for path in files:
+        with open(path, "r") as f:
+            cfg = json.load(f)
+        name = os.path.splitext(os.path.basename(path))[0]
+        if cfg.get("type", "watch") != "watch":
+            log(WARNING, f"[daemon] Skipping {name}: only watch profiles are supported")
+            continue
+        acc_id = cfg.get("discord_account_id", "")
+        profiles.append(Profile(
+            name,
+            cfg.get("term_name", ""),
+            [str(c) for c in cfg.get("crns_to_watch", []) if str(c).strip()],
+            cfg.get("cookie", ""),
+            cfg.get("discord_token", ""),
+            cfg.get("channel_name", ""),
+            f"<@{acc_id}>" if acc_id else ""
+        ))
+    return profiles
+
+
+def merge_watch_map(profiles, term_map):
+    """{term_code: [crn]} covering every profile once, and {(term_code, crn): [profile]}."""
+    watch_map   = {}
+    subscribers = {}
+    for p in profiles:
+        term = term_map.get(p.term_name)
+        if not term:
+            log(WARNING, f"[daemon] {p.name}: could not find term code for '{p.term_name}'")
+            continue
+        crns = watch_map.setdefault(term, [])
+        for crn in p.crns:
+            if crn not in crns:
+                crns.append(crn)
+            subscribers.setdefault((term, crn), []).append(p)
+    return watch_map, subscribers
+
+
+class ProfileFanout:
+    """SeatTracker subscriber posting each event to every profile watching its CRN."""
+
+    def __init__(self, subscribers, clients):
+        self.subscribers = subscribers    # (term, crn) → [Profile]
+        self.clients     = clients        # discord token → DiscordNotifier
+
+    def __call__(self, event):
+        message = format_seat_event(event)
+        for p in self.subscribers.get((event.term, event.crn), ()):
+            client = self.clients.get(p.discord_token)
+            if client:
+                # like notify_seat_event: only an opening is worth an @-mention
+                notify_discord(message, client, p.channel_name, p.ping if event.kind == OPENED else "")
+
+
+def start_clients(profiles):
+    """One logged-in DiscordNotifier per distinct bot token."""
+    clients = {}
+    if any(p.discord_token for p in profiles):
+        from discord_notifier import DiscordNotifier
+    for p in profiles:
+        if p.discord_token and p.discord_token not in clients:
+            client = clients[p.discord_token] = DiscordNotifier(p.channel_name)
+            client.start_bot(p.discord_token)
+    metrics.gauge("discord_queue_depth", lambda: sum(c.queue.depth for c in clients.values()))
+    return clients
+
+
+def run_daemon(paths, workers=1):
+    profiles = load_profiles(paths)
+    if not profiles:
+        print("[daemon] No watch profiles found.")
+        return
+    # howdy's public search doesn't care whose cookie it gets
+    cookie = next((p.cookie for p in profiles if p.cookie), "")
+    scheduler_bot.COOKIE = cookie
+    watch_map, subscribers = merge_watch_map(profiles, scheduler_bot.term_map(cookie))
+    n_subs = sum(len(v) for v in subscribers.values())
+    print(f"[daemon] {len(profiles)} profiles, {n_subs} watches → "
+          f"{sum(len(c) for c in watch_map.values())} distinct CRNs in {len(watch_map)} terms")
+    fanout = ProfileFanout(subscribers, start_clients(profiles))
+    if workers <= 1:
+        signal.signal(signal.SIGTERM, lambda *_: scheduler_bot.stop_monitoring())
+        monitor_crns(watch_map, subscribers=[fanout])
+        return
+    from worker_pool import SETTINGS, WorkerPool
+    pool = WorkerPool(watch_map, workers, fanout, {name: getattr(scheduler_bot, name) for name in SETTINGS},
+                      history_path=scheduler_bot.HISTORY_PATH)
+    signal.signal(signal.SIGTERM, lambda *_: pool.stop())
+    try:
+        pool.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Watch many CheckSeats profiles headless.")
+    ap.add_argument("profiles", nargs="+", help="config.json files or folders of them")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="worker processes to split the watched CRNs over (default: poll in this process)")
+    ap.add_argument("--metrics-port", type=int, help="serve /metrics and /metrics.json on localhost")
+    args = ap.parse_args()
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    run_daemon(args.profiles, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# discord_notifier.py
+import asyncio
+from threading import Thread
+
+import discord
+
+from notify_queue import NotificationQueue
+
+
+class DiscordNotifier(discord.Client):
+    """Discord client posting through a NotificationQueue, with channels looked up once and cached."""
+
+    def __init__(self, channel_name):
+        super().__init__(intents=discord.Intents.default())
+        self.channel_name = channel_name
+        self.queue        = NotificationQueue(self._post)
+        self._channels    = {}    # name → TextChannel (or None if no guild has it)
+        self._drainer     = None
+
+    async def on_ready(self):
+        print(f"Discord bot logged in as {self.user}")
+        self._channels.clear()
+        if self._drainer is None:
+            self._drainer = asyncio.get_running_loop().create_task(self.queue.run())
+
+    # a renamed, created or deleted channel can change what a name resolves to
+    async def on_guild_channel_create(self, channel):
+        self._channels.clear()
+
+    async def on_guild_channel_delete(self, channel):
+        self._channels.clear()
+
+    async def on_guild_channel_update(self, before, after):
+        self._channels.clear()
+
+    async def on_guild_join(self, guild):
+        self._channels.clear()
+
+    async def on_guild_remove(self, guild):
+        self._channels.clear()
+
+    def channel(self, name):
+        name = name or self.channel_name
+        if name not in self._channels:
+            self._channels[name] = next(
+                (chan for guild in self.guilds
+                 for chan in [discord.utils.get(guild.text_channels, name=name)] if chan),
+                None
+            )
+        return self._channels[name]
+
+    async def _post(self, channel_name, text):
+        chan = self.channel(channel_name)
+        if chan is None:
+            raise LookupError(f"no text channel named {channel_name or self.channel_name!r}")
+        await chan.send(text)
+
+    def enqueue(self, message, channel_name=None, ping=""):
+        """Queue a message from any thread; it is posted with whatever else arrives in the same cycle."""
+        self.queue.put(message, channel_name, ping)
+
+    async def send_message(self, message, channel_name=None):
+        self.enqueue(message, channel_name)
+
+    def start_bot(self, token):
+        Thread(target=lambda: asyncio.run(self.start(token)), daemon=True).start()
@@ -0,0 +1,93 @@
+# disk_cache.py
+"""Small on-disk cache of howdy lookups, shared by the config GUI and the bot.
+
+Each key is its own JSON file under the cache folder holding the value and
+the time it was last validated against howdy. Writes go through
+config_file.write_json (a temporary file in the same folder, moved into
+place with ``os.replace``), so another thread or process reading the key
+sees the old file or the new one, never half of either. Readers decide what "fresh" means by passing a TTL; stale
+entries are still handed out when howdy can't be reached.
+"""
+import json
+import os
+import re
+import time
+
+import config_file
+from log_pipeline import log, WARNING
+
+TERMS_TTL   = 24 * 3600    # the term list changes a few times a year
+CATALOG_TTL = 6 * 3600     # titles and sections; seat counts are polled separately anyway
+
+TERMS_KEY = "terms"
+
+
+def catalog_key(term):
+    return f"catalog-{term}"
+
+
+class DiskCache:
+    """JSON values by key in ``directory``, each stamped with when it was validated."""
+
+    def __init__(self, directory, clock=time.time):
+        self.directory = directory
+        self.clock     = clock
+
+    def path(self, key):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", key) + ".json")
+
+    def load(self, key):
+        """(value, validated_at), or (None, None) if the key is missing or unreadable."""
+        try:
+            with open(self.path(key), "r") as f:
+                entry = json.load(f)
+            return entry["value"], float(entry["validated_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, None
+
+    def fresh(self, key, ttl):
+        """The value if it was validated less than ``ttl`` seconds ago, else None."""
+        value, validated_at = self.load(key)
+        if validated_at is None or self.clock() - validated_at >= ttl:
+            return None
+        return value
+
+    def store(self, key, value, validated_at=None):
+        entry = {"validated_at": self.clock() if validated_at is None else validated_at, "value": value}
+        config_file.write_json(self.path(key), entry, separators=(",", ":"))
+
+
+def cached_term_map(cache, fetch, ttl=TERMS_TTL):
+    """{term description: code}: fresh from disk, else ``fetch()`` and store it.
+
+    If the fetch fails, a stale copy is returned rather than nothing; if
+    only storing it fails, the fetched map is still returned.
+    """
+    terms = cache.fresh(TERMS_KEY, ttl)
+    if terms is not None:
+        return terms
+    try:
+        terms = fetch()
+    except Exception:
+        stale, _ = cache.load(TERMS_KEY)
+        if stale is None:
+            raise
+        return stale
+    try:
+        cache.store(TERMS_KEY, terms)
+    except OSError as e:
+        log(WARNING, f"[DiskCache] could not save the term list: {e}")
+    return terms
+
+
+def save_catalog(cache, catalog):
+    cache.store(catalog_key(catalog.term), catalog.rows(), catalog.updated_at)
+
+
+def load_catalog(cache, catalog, ttl=CATALOG_TTL):
+    """Fill an empty ``catalog`` from disk if its copy there is fresh; True if it was."""
+    value, validated_at = cache.load(catalog_key(catalog.term))
+    if value is None or cache.clock() - validated_at >= ttl:
+        return False
+    catalog.restore(value, validated_at)
+    return True
@@ -0,0 +1,152 @@
+# fetch_planner.py
+import time
+from collections import namedtuple
+from functools import partial
+
+import metrics
+from json_decode import decode_record, decode_sections
+from response_cache import content_hash
+from section_parser import CHUNK_SIZE, iter_record_slices
+
+# ───── COST MODEL DEFAULTS ─────
+# Everything is measured in "bytes on the wire"; a request's fixed cost
+# (headers, TLS record, round trip) is folded in as REQUEST_OVERHEAD.
+FULL_CATALOG_BYTES = 8_000_000   # first guess for a full term, replaced after one full pull
+SECTION_BYTES      = 2_000       # first guess for one section record
+REQUEST_OVERHEAD   = 16_000      # bytes-equivalent of one extra round trip
+MAX_NARROW_QUERIES = 40          # never fan out more than this per cycle
+
+# crn=None means "the whole term catalog"
+SectionQuery = namedtuple("SectionQuery", ["term", "crn"])
+
+
+class FetchPlanner:
+    """Decide, per term, whether to poll watched CRNs one by one or pull the full catalog."""
+
+    def __init__(self, max_narrow=MAX_NARROW_QUERIES):
+        self.max_narrow    = max_narrow
+        self.full_bytes    = {}    # term → last observed size of a full pull
+        self.section_bytes = SECTION_BYTES
+
+    def narrow_cost(self, n_crns):
+        return n_crns * (REQUEST_OVERHEAD + self.section_bytes)
+
+    def full_cost(self, term):
+        return REQUEST_OVERHEAD + self.full_bytes.get(term, FULL_CATALOG_BYTES)
+
+    def plan(self, term, crns):
+        crns = sorted({str(c) for c in crns if str(c).strip()})
+        if not crns:
+            return []
+        if len(crns) <= self.max_narrow and self.narrow_cost(len(crns)) < self.full_cost(term):
+            return [SectionQuery(term, crn) for crn in crns]
+        return [SectionQuery(term, None)]
+
+    def observe(self, query, nbytes, nrows):
+        """Feed back the size of a response so later plans use real numbers."""
+        if query.crn is None:
+            self.full_bytes[query.term] = nbytes
+        elif nrows:
+            # smooth, a single odd section shouldn't flip the plan
+            self.section_bytes = int(0.8 * self.section_bytes + 0.2 * (nbytes / nrows))
+
+
+def query_payload(query):
+    payload = {
+        "startRow":     0,
+        "endRow":       0,
+        "termCode":     query.term,
+        "publicSearch": "Y"
+    }
+    if query.crn is not None:
+        payload["crn"] = query.crn
+    return payload
+
+
+def cache_key(query, crns=None):
+    """ResponseCache key of a query run for ``crns`` (the same CRNs give the same decoded bytes)."""
+    if query.crn is not None:
+        crns = [query.crn]
+    return query, tuple(sorted(crns)) if crns is not None else None
+
+
+def run_query(session, query, base_url, cookie="", timeout=10, planner=None, crns=None, cache=None, hedger=None):
+    """POST one planned query to /api/course-sections and return its section records.
+
+    For a full pull with ``crns`` given, the body is streamed and only those
+    CRNs are decoded; the download stops once all of them have been seen.
+    With a ResponseCache, conditional headers are sent and a 304 or content
+    that hashes the same as last time returns the previous records undecoded.
+    A Hedger races a second copy of the request if the first is slow to answer.
+    """
+    if query.crn is not None:
+        crns = [query.crn]    # the filter is a hint upstream, keep only the row we asked for
+    key     = cache_key(query, crns)
+    started = time.perf_counter()
+    headers = {"Cookie": cookie}
+    if cache is not None:
+        headers.update(cache.conditional_headers(key))
+    send = partial(
+        session.post,
+        f"{base_url}/api/course-sections",
+        json=query_payload(query),
+        headers=headers,
+        timeout=timeout,
+        stream=True
+    )
+    with (hedger(send) if hedger else send()) as resp:
+        if cache is not None and resp.status_code == 304:
+            metrics.observe("fetch_seconds", time.perf_counter() - started, result="not_modified")
+            return cache.not_modified(key)
+        resp.raise_for_status()
+        if crns is None:
+            body = resp.content
+            raws = [body]
+            nbytes, complete = len(body), True
+        else:
+            counted = _CountingChunks(resp.iter_content(CHUNK_SIZE))
+            raws    = [raw for _, raw in iter_record_slices(counted, crns)]
+            # a narrow body is a single record, reading up to it is reading all of it
+            nbytes, complete = counted.nbytes, counted.exhausted or query.crn is not None
+        fetched = time.perf_counter()
+        metrics.observe("fetch_seconds", fetched - started, result="body")
+
+        records = None
+        if cache is not None:
+            digest = content_hash()
+            for raw in raws:
+                digest.update(raw)
+            digest  = digest.digest()
+            records = cache.lookup(key, resp.headers, digest)
+        if records is None:
+            if crns is None:
+                records = decode_sections(body)
+            else:
+                records = [decode_record(raw) for raw in raws]
+            metrics.observe("decode_seconds", time.perf_counter() - fetched)
+            if cache is not None:
+                cache.store(key, resp.headers, digest, records)
+    if planner and complete:
+        planner.observe(query, nbytes, len(records))
+    return records
+
+
+class _CountingChunks:
+    def __init__(self, chunks):
+        self.chunks    = chunks
+        self.nbytes    = 0
+        self.exhausted = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.nbytes += len(chunk)
+            yield chunk
+        self.exhausted = True
+
+
+def fetch_planned(session, planner, term, crns, base_url, cookie="", timeout=10, cache=None):
+    """Run the current plan for one term and return the combined records."""
+    records = []
+    for query in planner.plan(term, crns):
+        records.extend(run_query(session, query, base_url, cookie, timeout, planner, crns, cache))
+    return records
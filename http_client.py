@@ -0,0 +1,152 @@
+# http_client.py
+"""One pooled HTTP client for howdy and College Scheduler, shared by the bot and the GUI.
+
+``shared_session()`` is a process-wide ``requests.Session`` that keeps
+keep-alive connections per host, asks for whatever compression urllib3 can
+decode (gzip/deflate, plus brotli or zstd when those packages are
+installed), and retries connection failures and 5xx answers a couple of
+times with backoff. ``get``/``post``/``head`` go through it with the
+default TIMEOUT unless one is given. 429s are left to the caller, which
+knows its budget (see PollScheduler).
+
+A Hedger sends a second copy of a request whose response headers haven't
+arrived within the p95 of recent ones and keeps whichever answers first;
+run_query uses it for polls when ``hedge_requests`` is on.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+
+import metrics
+from watch_engine import MAX_CONNECTIONS
+
+TIMEOUT       = (3.05, 10)   # connect, read (seconds)
+RETRIES       = 2            # for connection errors and 5xx, with backoff
+RETRY_BACKOFF = 0.25
+POOL_HOSTS    = 4            # howdy.tamu.edu, tamu.collegescheduler.com, and room to spare
+POOL_SIZE     = 2 * MAX_CONNECTIONS    # connections kept per host, with room for hedged copies
+
+HEDGE_PERCENTILE  = 95
+HEDGE_MIN_SAMPLES = 20       # don't hedge before we know what "slow" is
+HEDGE_MIN_DELAY   = 0.05     # seconds; never hedge sooner than this
+HEDGE_WORKERS     = POOL_SIZE
+
+_session = None
+_lock    = threading.Lock()
+
+
+def make_session(pool_size=POOL_SIZE):
+    """A configured Session; ``pool_size`` connections are kept per host."""
+    session = requests.Session()
+    retry = Retry(
+        total=RETRIES, connect=RETRIES, read=1, status=RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=None,            # course-sections POSTs are searches, safe to repeat
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json", "Accept-Encoding": ACCEPT_ENCODING})
+    return session
+
+
+def shared_session():
+    global _session
+    with _lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def request(method, url, **kwargs):
+    kwargs.setdefault("timeout", TIMEOUT)
+    return shared_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+
+class Hedger:
+    """Race a backup copy of a request that is slower than the recent p95."""
+
+    def __init__(self, percentile=HEDGE_PERCENTILE, min_samples=HEDGE_MIN_SAMPLES, min_delay=HEDGE_MIN_DELAY):
+        self.percentile  = percentile
+        self.min_samples = min_samples
+        self.min_delay   = min_delay
+        self.hedged      = 0
+        self.wins        = 0          # times the backup answered first
+        self.latencies   = deque(maxlen=200)
+        self._pool       = ThreadPoolExecutor(HEDGE_WORKERS, thread_name_prefix="hedge")
+
+    def delay(self):
+        """Seconds to wait before hedging, None until enough latencies have been seen."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return max(self.min_delay, ordered[min(len(ordered) - 1, int(self.percentile / 100 * len(ordered)))])
+
+    def _timed(self, send):
+        start = time.perf_counter()
+        resp  = send()
+        return resp, time.perf_counter() - start
+
+    def __call__(self, send):
+        """Blocking: ``send()`` once, and again if it's slow; returns the first Response back.
+
+        ``send`` must be safe to run twice at once (e.g. a ``stream=True``
+        request); the loser is closed when it arrives.
+        """
+        delay = self.delay()
+        if delay is None:
+            resp, took = self._timed(send)
+            self.latencies.append(took)
+            return resp
+        first = self._pool.submit(self._timed, send)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            resp, took = first.result()
+            self.latencies.append(took)
+            return resp
+
+        self.hedged += 1
+        metrics.inc("hedged_requests_total")
+        backup  = self._pool.submit(self._timed, send)
+        pending = {first, backup}
+        error   = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((fut for fut in done if fut.exception() is None), None)
+            if winner is None:
+                error = error or next(iter(done)).exception()
+                continue
+            for loser in ({first, backup} - {winner}):
+                loser.add_done_callback(_close_response)
+            resp, took = winner.result()
+            self.latencies.append(took)
+            if winner is backup:
+                self.wins += 1
+                metrics.inc("hedge_wins_total")
+            return resp
+        raise error
+
+
+def _close_response(fut):
+    if fut.exception() is None:
+        fut.result()[0].close()
@@ -0,0 +1,133 @@
+# json_decode.py
+"""Decode course-sections payloads with the fastest JSON parser installed.
+
+Backends, best first:
+
+    msgspec   typed decode into SectionRecord structs holding only the
+              SECTION_FIELDS we read; everything else (the instructor and
+              meeting-time JSON strings are most of a record) is skipped
+              without being built
+    orjson    full decode into dicts, several times faster than json
+    json      the stdlib, always there
+
+Records from every backend answer ``record.get(field)``, so SectionCatalog
+and the rest don't care which one ran. ``use(name)`` switches backends
+(the ``json_backend`` config key ends up there); by default the first
+importable one is picked on first use.
+"""
+import importlib.util
+import json
+
+BACKENDS = ("msgspec", "orjson", "json")
+
+# what record_fields() and the CRN filters read, nothing more
+SECTION_FIELDS = (
+    "SWV_CLASS_SEARCH_CRN",
+    "SWV_CLASS_SEARCH_TERM",
+    "SWV_CLASS_SEARCH_SUBJECT",
+    "SWV_CLASS_SEARCH_COURSE",
+    "SWV_CLASS_SEARCH_SECTION",
+    "SWV_CLASS_SEARCH_TITLE",
+    "STUSEAT_OPEN",
+    "STUSEAT_SEATS_AVAIL",
+)
+
+_backend = None
+
+
+def unwrap(data):
+    """The section list of a body that is either a list or ``{"courseSections": [...]}``."""
+    return data if isinstance(data, list) else data.get("courseSections", [])
+
+
+class _Stdlib:
+    name = "json"
+
+    def __init__(self):
+        self.loads = json.loads
+
+    def sections(self, body):
+        return unwrap(self.loads(body))
+
+    def record(self, raw):
+        return self.loads(raw)
+
+
+class _Orjson(_Stdlib):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.loads = orjson.loads
+
+
+def _struct_get(self, field, default=None):
+    value = getattr(self, field, None)
+    return default if value is None else value
+
+
+class _Msgspec(_Stdlib):
+    name = "msgspec"
+
+    def __init__(self):
+        from typing import Any, List, Union
+
+        import msgspec
+        record = msgspec.defstruct(
+            "SectionRecord", [(f, Any, None) for f in SECTION_FIELDS],
+            namespace={"get": _struct_get}, module=__name__
+        )
+        envelope = msgspec.defstruct("SectionsEnvelope", [("courseSections", List[record], [])], module=__name__)
+        self.loads     = msgspec.json.decode
+        self._sections = msgspec.json.Decoder(Union[List[record], envelope])
+        self._record   = msgspec.json.Decoder(record)
+
+    def sections(self, body):
+        data = self._sections.decode(body)
+        return data if isinstance(data, list) else data.courseSections
+
+    def record(self, raw):
+        return self._record.decode(raw)
+
+
+_BUILDERS = {"msgspec": _Msgspec, "orjson": _Orjson, "json": _Stdlib}
+
+
+def available():
+    """Names of the backends that can be used here, best first."""
+    return [name for name in BACKENDS if name == "json" or importlib.util.find_spec(name) is not None]
+
+
+def use(name=None):
+    """Switch to backend ``name`` (None: the best installed); returns the backend in use.
+
+    An unknown or missing backend falls back to the best available one.
+    """
+    global _backend
+    names = available()
+    if name not in names:
+        if name:
+            print(f"[json_decode] {name} is not available, using {names[0]}")
+        name = names[0]
+    _backend = _BUILDERS[name]()
+    return _backend
+
+
+def backend():
+    return _backend or use()
+
+
+# ───── decoding ─────
+def loads(data):
+    """Any JSON document, as plain Python objects."""
+    return backend().loads(data)
+
+
+def decode_sections(body):
+    """A whole course-sections body as a list of records."""
+    return backend().sections(body)
+
+
+def decode_record(raw):
+    """One section object cut out of a body (see section_parser)."""
+    return backend().record(raw)
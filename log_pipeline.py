@@ -0,0 +1,118 @@
+# log_pipeline.py
+"""Bounded, thread-safe path from ``print`` to the Monitor tab and an optional log file.
+
+StreamTap stands in for ``sys.stdout``: it cuts what each thread writes into
+lines and queues them as LogLines. Plain ``print`` output is INFO; code
+that means something else says so with ``log(level, ...)``, which hands the
+tap a LogLine at that level (or just prints when nothing is tapping
+stdout, as in the headless bot). The LogQueue is a ``deque`` with a
+``maxlen``, so any thread can append without a lock and a UI that stops
+draining (say, hidden in the tray) loses the oldest lines instead of
+growing. The Tk side drains it in batches on a timer.
+"""
+import logging
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+DEBUG, INFO, WARNING, ERROR = logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+MAX_QUEUED     = 10_000       # lines held between drains before the oldest are dropped
+LOG_FILE_BYTES = 1_000_000
+LOG_FILE_COUNT = 3
+LOG_FORMAT     = "%(asctime)s %(levelname)-7s [%(threadName)s] %(message)s"
+
+LogLine = namedtuple("LogLine", ["at", "level", "thread", "text"])
+
+
+def log(level, *values):
+    """``print(*values)`` at ``level`` (DEBUG, INFO, WARNING or ERROR)."""
+    out = sys.stdout
+    if isinstance(out, StreamTap):
+        out.emit(level, " ".join(str(v) for v in values))
+    else:
+        print(*values)
+
+
+class LogQueue:
+    """Lines waiting for the UI; the oldest go once ``maxlen`` are waiting."""
+
+    def __init__(self, maxlen=MAX_QUEUED):
+        self.maxlen  = maxlen
+        self.dropped = 0              # approximate, counted without a lock
+        self._lines  = deque(maxlen=maxlen)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def put(self, line):
+        if len(self._lines) >= self.maxlen:
+            self.dropped += 1
+        self._lines.append(line)
+
+    def drain(self, limit=None):
+        """Up to ``limit`` of the oldest queued lines, removed from the queue."""
+        lines = []
+        pop   = self._lines.popleft
+        try:
+            while limit is None or len(lines) < limit:
+                lines.append(pop())
+        except IndexError:
+            pass
+        return lines
+
+
+class StreamTap:
+    """File-like object turning writes into LogLines; partial lines are kept per thread."""
+
+    def __init__(self, queue):
+        self.queue  = queue
+        self._local = threading.local()
+
+    def write(self, text):
+        *lines, rest = (getattr(self._local, "partial", "") + text).split("\n")
+        self._local.partial = rest
+        if lines:
+            self._put(INFO, lines)
+        return len(text)
+
+    def emit(self, level, text):
+        """Queue ``text`` as whole lines at ``level``."""
+        self._put(level, text.split("\n"))
+
+    def _put(self, level, lines):
+        now, name = time.time(), threading.current_thread().name
+        for line in lines:
+            self.queue.put(LogLine(now, level, name, line))
+
+    def flush(self):
+        pass
+
+
+class LogFile:
+    """Rotating file sink for drained lines, written from whichever thread drains."""
+
+    def __init__(self, path, level=DEBUG, max_bytes=LOG_FILE_BYTES, backups=LOG_FILE_COUNT):
+        from logging.handlers import RotatingFileHandler    # only with "log_file", see config_gui
+        self.level   = level
+        self.handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                           encoding="utf-8", delay=True)
+        self.handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    def write(self, lines):
+        for line in lines:
+            if line.level >= self.level:
+                self.handler.emit(logging.makeLogRecord({
+                    "msg":        line.text,
+                    "levelno":    line.level,
+                    "levelname":  logging.getLevelName(line.level),
+                    "created":    line.at,
+                    "msecs":      (line.at % 1) * 1000,
+                    "threadName": line.thread,
+                }))
+        self.handler.flush()
+
+    def close(self):
+        self.handler.close()
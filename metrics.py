@@ -0,0 +1,245 @@
+# metrics.py
+"""Counters, gauges and timing histograms for the hot paths; off unless enabled.
+
+While disabled (the default) every helper returns at once, so instrumented
+code pays a global lookup and a branch. ``enable()`` starts collecting in
+this process and ``serve(port)`` also exposes it on localhost:
+
+    GET /metrics          Prometheus text format
+    GET /metrics.json     JSON snapshot
+
+Names are given without the ``checkseats_`` prefix; histograms are in
+seconds and end in ``_seconds``, counters end in ``_total``.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+
+PREFIX  = "checkseats_"
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = None
+_server   = None
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)    # the last one is +Inf
+        self.sum    = 0.0
+        self.count  = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum   += value
+        self.count += 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (None if empty or past the last bucket)."""
+        if not self.count:
+            return None
+        rank, seen = p / 100 * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+
+class Registry:
+    def __init__(self):
+        self.counters   = {}     # (name, labels) → value
+        self.histograms = {}     # (name, labels) → _Histogram
+        self.gauges     = {}     # name → callable returning a number
+        self._lock      = threading.Lock()
+
+    def inc(self, name, value, labels):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels):
+        key = (name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = _Histogram()
+            hist.observe(value)
+
+
+# ───── instrumentation helpers ─────
+def enabled():
+    return _registry is not None
+
+
+def enable():
+    global _registry
+    if _registry is None:
+        _registry = Registry()
+    return _registry
+
+
+def inc(name, value=1, **labels):
+    if _registry is not None:
+        _registry.inc(name, value, tuple(sorted(labels.items())))
+
+
+def observe(name, seconds, **labels):
+    if _registry is not None:
+        _registry.observe(name, seconds, tuple(sorted(labels.items())))
+
+
+def gauge(name, read):
+    """Report ``read()`` as ``name`` at scrape time."""
+    if _registry is not None:
+        _registry.gauges[name] = read
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name   = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(name, **labels):
+    """``with timed("diff_seconds"):`` observes the block's duration."""
+    return _Timer(name, labels) if _registry is not None else _NO_TIMER
+
+
+# ───── export ─────
+def _series(name, labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return PREFIX + name
+    return PREFIX + name + "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _read_gauges(registry):
+    values = {}
+    for name, read in list(registry.gauges.items()):
+        try:
+            values[name] = float(read())
+        except Exception:
+            continue
+    return values
+
+
+def prometheus_text():
+    registry = _registry
+    if registry is None:
+        return ""
+    lines = []
+    with registry._lock:
+        counters   = sorted(registry.counters.items())
+        histograms = sorted((k, (list(h.counts), h.sum, h.count)) for k, h in registry.histograms.items())
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+        lines.append(f"{_series(name, labels)} {value:g}")
+    for (name, labels), (counts, total, count) in histograms:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), counts):
+            cumulative += n
+            lines.append(f"{_series(name + '_bucket', labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{_series(name + '_sum', labels)} {total:g}")
+        lines.append(f"{_series(name + '_count', labels)} {count}")
+    for name, value in sorted(_read_gauges(registry).items()):
+        lines.append(f"# TYPE {PREFIX}{name} gauge")
+        lines.append(f"{PREFIX}{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    """Everything collected so far as plain JSON-able dicts (empty while disabled)."""
+    registry = _registry
+    if registry is None:
+        return {}
+    with registry._lock:
+        counters = {_series(name, labels): value for (name, labels), value in registry.counters.items()}
+        histograms = {
+            _series(name, labels): {
+                "count": h.count,
+                "sum":   h.sum,
+                "p50":   h.percentile(50),
+                "p99":   h.percentile(99),
+            }
+            for (name, labels), h in registry.histograms.items()
+        }
+    gauges = {PREFIX + name: value for name, value in _read_gauges(registry).items()}
+    return {"at": time.time(), "counters": counters, "histograms": histograms, "gauges": gauges}
+
+
+def summary():
+    """One line for the Monitor tab: p50 of each histogram and every counter and gauge."""
+    snap = snapshot()
+    if not snap:
+        return ""
+    parts = []
+    for name, h in sorted(snap["histograms"].items()):
+        p50 = h["p50"]
+        parts.append(f"{name[len(PREFIX):]} p50 {'>30 s' if p50 is None else f'≤{p50 * 1000:g} ms'}")
+    for name, value in sorted({**snap["counters"], **snap["gauges"]}.items()):
+        parts.append(f"{name[len(PREFIX):]} {value:g}")
+    return " · ".join(parts)
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics and /metrics.json on a daemon thread (once per process); enables metrics."""
+    global _server
+    enable()
+    if _server is not None:
+        return _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, kind = prometheus_text().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, kind = json.dumps(snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    print(f"[metrics] serving http://{host}:{port}/metrics and /metrics.json")
+    return _server
@@ -0,0 +1,166 @@
+# notify_queue.py
+"""Outbound notification queue: coalesce, split and pace posts to a chat channel.
+
+``put`` may be called from any thread. The ``run`` task waits COALESCE_WINDOW
+after the first queued message so everything produced in the same poll
+cycle goes out as one post per channel, split on line boundaries at the
+2000 character limit. Posts per channel are paced by a token bucket sized to
+Discord's per-channel limit, and a 429 (or anything carrying ``retry_after``)
+pauses that channel for as long as the server asks before the unsent rest
+of the batch is retried.
+"""
+import asyncio
+import threading
+import time
+from collections import deque, namedtuple
+
+import metrics
+from log_pipeline import log, ERROR
+
+MESSAGE_LIMIT   = 2000
+COALESCE_WINDOW = 0.5          # seconds to wait for the rest of a cycle's messages
+CHANNEL_RATE    = (5, 5.0)     # posts per seconds, per channel
+MAX_RETRIES     = 5
+
+_Message = namedtuple("_Message", ["text", "channel", "ping", "queued_at"])
+
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """Chunks of at most ``limit`` characters, cut at newlines where possible."""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def retry_after(error):
+    """Seconds a rate-limited post asks us to wait, None if ``error`` isn't a rate limit."""
+    wait = getattr(error, "retry_after", None)
+    if wait is not None:
+        return float(wait)
+    if getattr(error, "status", None) != 429:
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name in ("Retry-After", "X-RateLimit-Reset-After"):
+        try:
+            return float(headers[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return 1.0
+
+
+class NotificationQueue:
+    """Queue messages for ``post(channel, text)`` (a coroutine function) and send them in batches."""
+
+    def __init__(self, post, window=COALESCE_WINDOW, limit=MESSAGE_LIMIT, rate=CHANNEL_RATE, clock=time.monotonic):
+        self.post         = post
+        self.window       = window
+        self.limit        = limit
+        self.rate         = rate
+        self.clock        = clock
+        self.sent         = 0           # messages delivered
+        self.posts        = 0           # API calls made for them
+        self.rate_limited = 0
+        self.dropped      = 0
+        self.latencies    = deque(maxlen=500)    # seconds from put() to the post carrying it
+        self._pending     = deque()
+        self._lock        = threading.Lock()
+        self._loop        = None
+        self._wake        = None
+        self._buckets     = {}          # channel → [tokens, last refill]
+        self._paused      = {}          # channel → clock() until which it may not post
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def put(self, text, channel=None, ping=""):
+        with self._lock:
+            self._pending.append(_Message(text, channel, ping, self.clock()))
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def latency(self, p):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        p50, p99 = self.latency(50), self.latency(99)
+        lat = f", latency p50 {p50:.2f}s p99 {p99:.2f}s" if p50 is not None else ""
+        return f"queue {self.depth}, sent {self.sent} in {self.posts} posts, rate limited {self.rate_limited}{lat}"
+
+    # ───── sending ─────
+    async def run(self):
+        """Drain the queue forever. Runs on the loop that owns ``post``."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            if not self._pending:
+                self._wake.clear()
+                await self._wake.wait()
+            await asyncio.sleep(self.window)
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+            by_channel = {}
+            for msg in batch:
+                by_channel.setdefault(msg.channel, []).append(msg)
+            for channel, msgs in by_channel.items():
+                await self._send(channel, msgs)
+
+    async def _send(self, channel, msgs):
+        pings = []
+        for m in msgs:
+            if m.ping and m.ping not in pings:
+                pings.append(m.ping)
+        text = "\n".join(m.text for m in msgs)
+        if pings:
+            text = " ".join(pings) + "\n" + text
+        for attempt in range(MAX_RETRIES):
+            try:
+                for chunk in split_message(text, self.limit):
+                    await self._take(channel)
+                    await self.post(channel, chunk)
+                    self.posts += 1
+                    metrics.inc("notify_posts_total")
+                    # whatever went out doesn't get re-sent on a retry
+                    text = text[len(chunk):].lstrip("\n")
+            except Exception as e:
+                wait = retry_after(e)
+                if wait is None:
+                    log(ERROR, f"[NotificationQueue] post to {channel or 'default channel'} failed: {e}")
+                    break
+                self.rate_limited += 1
+                metrics.inc("notify_retries_total")
+                self._paused[channel] = self.clock() + wait
+                continue
+            now = self.clock()
+            self.sent += len(msgs)
+            for m in msgs:
+                self.latencies.append(now - m.queued_at)
+                metrics.observe("notify_seconds", now - m.queued_at)
+            return
+        self.dropped += len(msgs)
+        metrics.inc("notify_dropped_total", len(msgs))
+
+    async def _take(self, channel):
+        """Wait for this channel's pause to end and for a token in its bucket."""
+        capacity, per = self.rate
+        while True:
+            now    = self.clock()
+            bucket = self._buckets.setdefault(channel, [float(capacity), now])
+            bucket[0] = min(float(capacity), bucket[0] + (now - bucket[1]) * capacity / per)
+            bucket[1] = now
+            wait = self._paused.get(channel, 0) - now
+            if wait <= 0 and bucket[0] >= 1:
+                bucket[0] -= 1
+                return
+            await asyncio.sleep(max(wait, (1 - bucket[0]) * per / capacity))
@@ -0,0 +1,155 @@
+# poll_scheduler.py
+"""Per-CRN polling cadence under a global request budget.
+
+A CRN is *hot* (polled every HOT_INTERVAL) while it changed recently or is
+open with only a few seats left, *cold* (every COLD_INTERVAL) once it has
+been full for COLD_AFTER, and polled at the base interval otherwise. A job
+covering several CRNs runs at the pace of its hottest one.
+
+All jobs share a token bucket of ``rpm`` requests per minute; when the
+combined cadence asks for more than that, every interval is stretched by the
+same factor so hot CRNs keep their lead. Delays get ±``jitter`` so jobs
+don't line up, and failing jobs back off exponentially. A 429 pauses the
+whole bucket for its Retry-After.
+"""
+import asyncio
+import random
+import time
+
+BASE_INTERVAL       = 5       # seconds, for CRNs with nothing special going on
+HOT_INTERVAL        = 2
+COLD_INTERVAL       = 30
+HOT_WINDOW          = 600     # a CRN that changed within this many seconds is hot
+COLD_AFTER          = 7200    # a CRN full for this long is cold
+NEAR_FULL_SEATS     = 3       # open with this many seats or fewer is hot
+REQUESTS_PER_MINUTE = 60
+BURST               = 5       # requests the bucket may bank
+JITTER              = 0.1     # ± fraction applied to every delay
+MAX_BACKOFF         = 300
+
+
+def retry_after(error):
+    """Seconds from a 429's Retry-After (or 0 if ``error`` isn't a 429), None if not an HTTP 429."""
+    resp = getattr(error, "response", None)
+    if resp is None or getattr(resp, "status_code", None) != 429:
+        return None
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After", 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _CrnState:
+    __slots__ = ("open", "seats", "since", "churned_at")
+
+    def __init__(self, open, seats, now):
+        self.open       = open
+        self.seats      = seats
+        self.since      = now             # last time open/seats changed (or first seen)
+        self.churned_at = float("-inf")   # last *observed* change
+
+
+class PollScheduler:
+    """Decide when each WatchEngine job polls next and hand out request tokens.
+
+    ``targets(key)`` returns the (term, crn) pairs a job covers; without it
+    jobs just run at their own PollJob.interval (still budgeted and backed off).
+    """
+
+    def __init__(self, targets=None, base=BASE_INTERVAL, hot=HOT_INTERVAL, cold=COLD_INTERVAL,
+                 rpm=REQUESTS_PER_MINUTE, jitter=JITTER, clock=time.monotonic, rng=None):
+        self.targets  = targets
+        self.base     = base
+        self.hot      = hot
+        self.cold     = cold
+        self.rpm      = rpm
+        self.jitter   = jitter
+        self.clock    = clock
+        self.rng      = rng or random.Random()
+        self._crns     = {}                 # (term, crn) → _CrnState
+        self._interval = {}                 # job key → last unstretched interval
+        self._failures = {}                 # job key → consecutive errors
+        self._tokens   = float(BURST)
+        self._filled   = clock()
+        self._paused   = float("-inf")      # no tokens before this time (429)
+
+    # ───── activity ─────
+    def observe(self, term, crn, section, now=None):
+        """Record one poll result for a CRN (``section`` is a catalog row or None)."""
+        now   = self.clock() if now is None else now
+        key   = (term, str(crn))
+        state = self._crns.get(key)
+        if section is None:
+            self._crns.pop(key, None)
+            return
+        if state is None:
+            self._crns[key] = _CrnState(section.open, section.seats, now)
+        elif (section.open, section.seats) != (state.open, state.seats):
+            state.open, state.seats = section.open, section.seats
+            state.since = state.churned_at = now
+
+    def cadence(self, term, crn, now=None):
+        now   = self.clock() if now is None else now
+        state = self._crns.get((term, str(crn)))
+        if state is None:
+            return self.base
+        if now - state.churned_at < HOT_WINDOW:
+            return self.hot
+        if state.open and state.seats is not None and state.seats <= NEAR_FULL_SEATS:
+            return self.hot
+        if not state.open and now - state.since > COLD_AFTER:
+            return self.cold
+        return self.base
+
+    def forget(self, key):
+        self._interval.pop(key, None)
+        self._failures.pop(key, None)
+
+    # ───── timing ─────
+    def interval(self, job):
+        """Unjittered seconds between polls of ``job``, before any backoff."""
+        if self.targets is None:
+            raw = job.interval
+        else:
+            raw = min((self.cadence(term, crn) for term, crn in self.targets(job.key)), default=self.base)
+        self._interval[job.key] = raw
+        demand = sum(60.0 / i for i in self._interval.values() if i > 0)
+        return raw * max(1.0, demand / self.rpm)
+
+    def next_delay(self, job, error=None):
+        """Seconds from this poll's start (from now, after an error) until the next one."""
+        delay = self.interval(job)
+        if error is None:
+            self._failures.pop(job.key, None)
+        else:
+            n = self._failures[job.key] = self._failures.get(job.key, 0) + 1
+            delay = min(MAX_BACKOFF, delay * 2 ** n)
+            wait = retry_after(error)
+            if wait is not None:
+                self._paused = max(self._paused, self.clock() + wait)
+                delay = max(delay, wait)
+        return delay * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    # ───── budget ─────
+    def _refill(self, now):
+        self._tokens = min(float(BURST), self._tokens + (now - self._filled) * self.rpm / 60.0)
+        self._filled = now
+
+    def try_acquire(self, now=None):
+        """Take one request token; returns 0 on success, else the seconds to wait first."""
+        now = self.clock() if now is None else now
+        self._refill(now)
+        if now < self._paused:
+            return self._paused - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) * 60.0 / self.rpm
+
+    async def acquire(self):
+        """Wait for a request token. Event loop thread only."""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
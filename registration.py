@@ -0,0 +1,133 @@
+# registration.py
+"""Classify College Scheduler's replies to ``registration-request`` frames.
+
+Replies come back as socket.io acks matched to the request by ack id (see
+SwapSession.emit). The payload shape isn't documented, so an explicit
+``success`` flag wins, then an HTTP-style status code in a ``status`` or
+``code`` field, and otherwise the reply's message text is matched against
+the phrases Banner uses for each failure. CRNs and other identifiers in
+the reply are never matched, so a CRN like 14290 isn't read as a 429.
+"""
+import asyncio
+import time
+from collections import namedtuple
+
+import metrics
+
+SUCCESS   = "success"
+FULL      = "full"          # no seats (or waitlist only), worth retrying
+CONFLICT  = "conflict"      # time conflict / already registered, retrying won't help
+INVALID   = "invalid"       # bad CRN or term, retrying won't help
+AUTH      = "auth"          # token rejected, re-authorize
+THROTTLED = "throttled"     # slow down
+TIMEOUT   = "timeout"       # no ack in time
+UNKNOWN   = "unknown"
+
+OUTCOMES = (SUCCESS, FULL, CONFLICT, INVALID, AUTH, THROTTLED, TIMEOUT, UNKNOWN)
+FINAL    = frozenset((SUCCESS, CONFLICT, INVALID))    # stop attempting after these
+
+ACK_TIMEOUT = 10.0
+
+# checked in this order against the lower-cased message text of the reply
+PHRASES = (
+    (THROTTLED, ("too many requests", "rate limit", "throttl", "try again later")),
+    (AUTH,      ("unauthorized", "not authorized", "token expired", "invalid token", "expired token", "forbidden")),
+    (INVALID,   ("invalid crn", "crn not found", "invalid term", "not found", "not available for registration")),
+    (CONFLICT,  ("time conflict", "conflict with", "duplicate", "already registered", "linked course")),
+    (FULL,      ("closed section", "class is closed", "section full", "no seats", "waitlist", "capacity")),
+)
+
+STATUS_FIELDS  = ("status", "code", "statusCode")
+STATUS_CODES   = {429: THROTTLED, 401: AUTH, 403: AUTH}
+# fields whose text is read for PHRASES; identifiers (crn, regNumber, ...) are left out
+MESSAGE_FIELDS = ("message", "messages", "msg", "text", "error", "errors", "detail", "details", "reason", "description")
+
+# sent_at is time.monotonic() once the frame was handed to the socket
+Attempt = namedtuple("Attempt", ["outcome", "rtt", "reply", "sent_at"])
+
+
+def classify(reply):
+    """Outcome of one ack payload (a list of ack arguments, or whatever the server sent)."""
+    items = reply if isinstance(reply, list) else [reply]
+    for item in items:
+        if isinstance(item, dict) and item.get("success") is True and not item.get("errors") and not item.get("error"):
+            return SUCCESS
+    for item in items:
+        if isinstance(item, dict):
+            for field in STATUS_FIELDS:
+                outcome = STATUS_CODES.get(_status_code(item.get(field)))
+                if outcome:
+                    return outcome
+    text = " ".join(_message_text(reply)).lower()
+    for outcome, phrases in PHRASES:
+        if any(p in text for p in phrases):
+            return outcome
+    for item in items:
+        if isinstance(item, dict) and str(item.get("status", "")).lower() in ("success", "registered", "ok"):
+            return SUCCESS
+    return UNKNOWN
+
+
+def _status_code(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _message_text(value, in_message=True):
+    """Every string of ``value`` that sits under a MESSAGE_FIELDS key (or is bare text)."""
+    if isinstance(value, str):
+        if in_message:
+            yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _message_text(item, key in MESSAGE_FIELDS)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _message_text(item, in_message)
+
+
+class OutcomeStats:
+    """Per-outcome counters and round-trip times of registration attempts."""
+
+    def __init__(self, keep=1000):
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self.keep   = keep
+        self.rtts   = []    # seconds, most recent ``keep`` acked attempts
+
+    def record(self, attempt):
+        self.counts[attempt.outcome] += 1
+        metrics.inc("swap_outcomes_total", outcome=attempt.outcome)
+        if attempt.rtt is not None:
+            metrics.observe("swap_ack_seconds", attempt.rtt)
+            self.rtts.append(attempt.rtt)
+            if len(self.rtts) > self.keep:
+                del self.rtts[:len(self.rtts) - self.keep]
+
+    def percentile(self, p):
+        if not self.rtts:
+            return None
+        ordered = sorted(self.rtts)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        counts = ", ".join(f"{k} {v}" for k, v in self.counts.items() if v)
+        if not self.rtts:
+            return counts or "no attempts"
+        return f"{counts}; rtt p50 {self.percentile(50) * 1000:.0f} ms, p99 {self.percentile(99) * 1000:.0f} ms"
+
+
+async def attempt(session, request, timeout=ACK_TIMEOUT):
+    """Send one registration-request and wait for its ack; returns an Attempt."""
+    fut     = await session.emit("registration-request", request, ack=True)
+    sent_at = time.monotonic()
+    try:
+        reply = await asyncio.wait_for(fut, timeout)
+    except asyncio.TimeoutError:
+        session.drop_ack(fut)
+        return Attempt(TIMEOUT, None, None, sent_at)
+    return Attempt(classify(reply), time.monotonic() - sent_at, reply, sent_at)
@@ -0,0 +1,84 @@
+# registration_window.py
+"""Send prepared frames at a wall-clock instant measured on the *server's* clock.
+
+``estimate_offset`` brackets the server clock from HTTP ``Date`` headers.
+A Date only has whole seconds, but a response stamped S that was requested
+at t0 and answered at t1 (local time) says the offset lies in
+[S - t1, S + 1 - t0]. Samples are spread across a second so the bounds of
+the intersection end up one round trip apart instead of one second.
+
+``send_at`` sleeps on the loop until just before the corrected instant, then
+spins for the last few milliseconds so the frame goes out on time.
+"""
+import asyncio
+import time
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+
+OFFSET_SAMPLES = 8
+SPIN           = 0.02     # seconds before the target to stop sleeping and start spinning
+
+# offset: server time - local time, in seconds; error: ± half the bracket
+ClockOffset = namedtuple("ClockOffset", ["offset", "error", "samples"])
+
+
+def date_header_seconds(value):
+    return parsedate_to_datetime(value).timestamp()
+
+
+def estimate_offset(fetch_date, samples=OFFSET_SAMPLES, clock=time.time, sleep=time.sleep):
+    """Blocking. ``fetch_date()`` makes one request and returns its Date header (or None)."""
+    low, high = float("-inf"), float("inf")
+    used = 0
+    for i in range(samples):
+        t0 = clock()
+        value = fetch_date()
+        t1 = clock()
+        if not value:
+            continue
+        server = date_header_seconds(value)
+        low, high = max(low, server - t1), min(high, server + 1 - t0)
+        used += 1
+        # land the next request at a different fraction of a second
+        sleep(((i + 1) / samples - clock() % 1) % 1)
+    if not used:
+        return ClockOffset(0.0, float("inf"), 0)
+    if low > high:
+        # bounds crossed (server clocks behind a load balancer disagree); use the midpoint anyway
+        low, high = high, low
+    return ClockOffset((low + high) / 2, (high - low) / 2, used)
+
+
+def local_time(target, offset):
+    """Local clock reading when the server clock (local + ``offset``) reads ``target``."""
+    return target - offset
+
+
+def token_expires_first(expires_at, target, offset, margin):
+    """True if a token expiring at local ``expires_at`` won't last ``margin`` seconds past
+    the window at server time ``target``."""
+    return expires_at - margin < local_time(target, offset)
+
+
+async def send_at(target, send, offset=0.0, clock=time.time):
+    """Call ``await send()`` when the server clock reads ``target`` (epoch seconds).
+
+    Returns the send error in seconds (positive = late), on the server's clock.
+    """
+    local_target = local_time(target, offset)
+    delay = local_target - clock() - SPIN
+    if delay > 0:
+        await asyncio.sleep(delay)
+    while clock() < local_target:
+        pass
+    sent = clock()
+    await send()
+    return sent - local_target
+
+
+async def send_burst(target, frames, send_frame, offset=0.0, stagger=0.0, clock=time.time):
+    """Send ``frames`` at ``target``, ``target + stagger``, ...; returns the send error of each."""
+    errors = []
+    for i, frame in enumerate(frames):
+        errors.append(await send_at(target + i * stagger, lambda f=frame: send_frame(f), offset, clock))
+    return errors
@@ -0,0 +1,91 @@
+# response_cache.py
+"""Remember what each poll returned so unchanged responses cost next to nothing.
+
+Per query the cache keeps the server's validators (``ETag`` /
+``Last-Modified``), sent back as conditional request headers, and a blake2b
+digest of the bytes that would be decoded. A 304 or a matching digest hands
+back the previous records without touching ``json``; ``changed(key)`` tells
+the caller whether it has anything new to diff.
+"""
+import hashlib
+
+NOT_MODIFIED = "not_modified"    # server answered 304
+UNCHANGED    = "unchanged"       # 200, but the decoded bytes hashed the same
+DECODED      = "decoded"         # new content, decoded
+
+
+def content_hash():
+    return hashlib.blake2b(digest_size=16)
+
+
+class _Entry:
+    __slots__ = ("etag", "last_modified", "digest", "records", "outcome")
+
+    def __init__(self):
+        self.etag          = None
+        self.last_modified = None
+        self.digest        = None
+        self.records       = None
+        self.outcome       = None
+
+
+class ResponseCache:
+    """Validators, body digest and last records per query key."""
+
+    def __init__(self):
+        self._entries = {}
+        self.stats    = {NOT_MODIFIED: 0, UNCHANGED: 0, DECODED: 0}
+
+    def conditional_headers(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry.records is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def not_modified(self, key):
+        """Records to return for a 304."""
+        entry = self._entries[key]
+        return self._count(entry, NOT_MODIFIED)
+
+    def lookup(self, key, headers, digest):
+        """The cached records if ``digest`` matches the last decoded content, else None."""
+        entry = self._entries.get(key)
+        if entry is None or entry.records is None or entry.digest != digest:
+            return None
+        self._validators(entry, headers)
+        return self._count(entry, UNCHANGED)
+
+    def store(self, key, headers, digest, records):
+        """Remember freshly decoded ``records`` for ``key``."""
+        entry = self._entries.setdefault(key, _Entry())
+        self._validators(entry, headers)
+        entry.digest  = digest
+        entry.records = records
+        return self._count(entry, DECODED)
+
+    def _validators(self, entry, headers):
+        entry.etag          = headers.get("ETag")
+        entry.last_modified = headers.get("Last-Modified")
+
+    def changed(self, key):
+        """Whether the last response for ``key`` carried new content."""
+        entry = self._entries.get(key)
+        return entry is None or entry.outcome == DECODED
+
+    def _count(self, entry, outcome):
+        entry.outcome = outcome
+        self.stats[outcome] += 1
+        return entry.records
+
+    def hit_rate(self):
+        total = sum(self.stats.values())
+        return (self.stats[NOT_MODIFIED] + self.stats[UNCHANGED]) / total if total else 0.0
+
+    def summary(self):
+        return (f"304 {self.stats[NOT_MODIFIED]}, unchanged {self.stats[UNCHANGED]}, "
+                f"decoded {self.stats[DECODED]} ({self.hit_rate():.0%} short-circuited)")
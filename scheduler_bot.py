@@ -1,286 +1,856 @@
 # scheduler_bot.py
 import os
-import json
 import time
-import requests
 import asyncio
-import websockets
-from threading import Thread
-import discord
-
-# ───── Selenium imports for cookie‑refresh in swap only ─────
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+import threading
+from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED
+from functools import partial
+
+import config_file
+import http_client
+import json_decode
+import metrics
+from log_pipeline import log, DEBUG, WARNING, ERROR
+from fetch_planner import FetchPlanner, cache_key, run_query
+from response_cache import ResponseCache
+from watch_engine import WatchEngine, PollJob
+from poll_scheduler import PollScheduler, REQUESTS_PER_MINUTE, retry_after
+from swap_rules import SwapPlan, parse_rules
+from swap_session import SwapSession, TokenCache
+from registration import Attempt, OutcomeStats, attempt, classify, ACK_TIMEOUT, AUTH, FINAL, SUCCESS, THROTTLED, TIMEOUT
+from registration_window import estimate_offset, send_burst, token_expires_first
+from credentials import ChromeLogin, CredentialManager
+from disk_cache import DiskCache, cached_term_map, load_catalog
+from seat_history import SeatHistory
+from section_catalog import catalog_for
+from seat_state import SeatTracker, DEBOUNCE, OPENED, CLOSED, SEATS_CHANGED, VANISHED
 
 # ───── GLOBAL CONFIG ─────
-CONFIG_DIR    = os.path.join(os.environ["LOCALAPPDATA"], "TAMUClassSwap")
+CONFIG_DIR    = config_file.default_dir()
 CONFIG_PATH   = os.path.join(CONFIG_DIR, "config.json")
+CACHE_DIR     = os.path.join(CONFIG_DIR, "cache")    # shared with the config GUI, see disk_cache.py
+HISTORY_PATH  = os.path.join(CONFIG_DIR, "seat_history.sqlite3")    # see seat_history.py
 socket_url    = "wss://api.collegescheduler.com/socket.io/?EIO=3&transport=websocket"
+HOWDY_URL     = "https://howdy.tamu.edu"
 
 # THESE ARE USED FOR “watch” MODE:
 CRNS_TO_WATCH = []     # will be loaded from config
-INTERVAL      = 5      # seconds between checks
+INTERVAL      = 5      # base seconds between checks; hot CRNs go faster, cold ones slower
+RATE_BUDGET   = REQUESTS_PER_MINUTE    # upstream requests per minute across all CRNs
+DEBOUNCE_SECS = DEBOUNCE    # a CRN that just changed isn't reported again for this long
+HEDGE         = False       # race a second copy of polls slower than the recent p95
+HISTORY       = True        # record every seat transition to HISTORY_PATH
 
 # THESE ARE LOADED FOR “swap” MODE:
 SWAP_FROM      = ""
 SWAP_TO        = ""
+SWAP_RULES     = []       # "swap_rules" from config, see swap_rules.py; SWAP_FROM → SWAP_TO when empty
 COOKIE         = ""
 USERNAME       = ""
 PASSWORD       = ""
 TERM           = ""
 TERM_ID        = ""
 token          = ""
-TYPE           = ""       # "watch" or "swap"
+TYPE           = ""       # "watch", "swap", "watch_swap" or "window"
+WINDOW_TIME    = ""       # ISO timestamp of the registration window, for "window"
 DISCORD_TOKEN  = ""
 CHANNEL_NAME   = ""
 ACC_ID         = ""
 DC_PING_NAME   = ""
 notifier       = None
-driver         = None
-MONITOR_ACTIVE = True
+credentials    = None     # CredentialManager, see get_credentials()
+
+
+class MonitorRun:
+    """One start of the monitor: its stop flag and the hooks a config reload calls.
+
+    Every coroutine of a run holds on to its own MonitorRun, so stopping and
+    starting again quickly can't leave the old run's tasks going or let its
+    cleanup undo the new run's hooks.
+    """
+
+    def __init__(self):
+        self.stopped           = threading.Event()
+        self.watch_engine      = None
+        self.seats             = None    # undebounced SeatTracker of watch_crns: every CRN's latest state
+        self.watch_reconfigure = None    # set while watch_crns runs: re-reads the pacing globals, optionally takes a new watch map
+        self.swap_reconfigure  = None    # set while swap rules are being sent: re-reads the rule globals
+        self._wakeups          = []      # (loop, asyncio.Event) set by stop()
+
+    @property
+    def active(self):
+        return not self.stopped.is_set()
+
+    def stop(self):
+        """Stop this run; safe from any thread."""
+        self.stopped.set()
+        if self.watch_engine:
+            self.watch_engine.stop()
+        for loop, event in self._wakeups:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event.set)
+
+    async def wait(self):
+        """Return once stop() has been called."""
+        event = asyncio.Event()
+        self._wakeups.append((asyncio.get_running_loop(), event))
+        try:
+            if self.active:
+                await event.wait()
+        finally:
+            self._wakeups.remove((asyncio.get_running_loop(), event))
+
+
+current_run = MonitorRun()    # replaced by every start_monitoring
 
 
 def load_config():
     if not os.path.exists(CONFIG_PATH):
         raise FileNotFoundError(f"Config file missing: {CONFIG_PATH}")
-    with open(CONFIG_PATH, "r") as f:
-        return json.load(f)
+    return config_file.load(CONFIG_PATH)
 
 
 def save_config(cfg):
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(cfg, f, indent=4)
+    """Replace config.json atomically (see config_file.save)."""
+    config_file.save(CONFIG_PATH, cfg)
 
 
 # ───── WATCH MODE FUNCTIONS ─────
-def fetch_all_sections(session):
-    url = "https://howdy.tamu.edu/api/course-sections"
-    payload = {
-        "startRow":     0,
-        "endRow":       0,    # fetch everything
-        "termCode":    TERM_ID,
-        "publicSearch": "Y"
-    }
-    resp = session.post(url, json=payload, headers={"Cookie": COOKIE}, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
-    return data if isinstance(data, list) else data.get("courseSections", [])
-
-
-def monitor_crns():
-    """Lightweight loop: hit howdy API every INTERVAL seconds, print status of CRNS_TO_WATCH."""
-    session = requests.Session()
-    session.headers.update({"Content-Type": "application/json"})
+def monitor_crns(watch_map=None, subscribers=None, history=None):
+    """Poll howdy for every watched CRN (``{term_code: [crns]}``, defaults to TERM_ID/CRNS_TO_WATCH)
+    on one asyncio loop until stop_monitoring() is called.
+
+    Seat events go to ``subscribers`` (callables taking a SeatEvent), by default
+    to Discord through notify_seat_event."""
+    asyncio.run(watch_crns(watch_map, subscribers, history=history))
+
+
+async def watch_crns(watch_map=None, subscribers=None, run=None, on_open=None, history=None):
+    """monitor_crns on the running loop; subscribers are called on the loop thread.
+
+    ``on_open(event)`` is called for every opening as soon as a poll sees it,
+    without the debounce that keeps notifications down, so a seat that
+    opens, fills and opens again within the debounce window is still seen
+    opening twice.
+
+    Every poll also goes to ``history`` (anything with SeatHistory's
+    observe/forget); by default a SeatHistory on HISTORY_PATH when HISTORY
+    is set, opened and closed here.
+    """
+    run          = run or current_run
+    if watch_map is None:
+        watch_map = {TERM_ID: CRNS_TO_WATCH}
+    watch_map    = {term: [str(c) for c in crns] for term, crns in watch_map.items()}
+    session      = http_client.shared_session()
+    hedger       = http_client.Hedger() if HEDGE else None
+    planner      = FetchPlanner()
+    cache        = ResponseCache()
+    seat_tracker = SeatTracker(DEBOUNCE_SECS)
+    latest       = run.seats = SeatTracker(debounce=0)
+    own_history  = history is None and HISTORY
+    history      = SeatHistory(HISTORY_PATH) if own_history else history
+    scheduler    = PollScheduler(
+        targets=lambda q: [(q.term, c) for c in ([q.crn] if q.crn else watch_map.get(q.term, []))],
+        base=INTERVAL,
+        rpm=RATE_BUDGET
+    )
+    for callback in (subscribers if subscribers is not None else [notify_seat_event]):
+        seat_tracker.subscribe(callback, kinds=(OPENED, CLOSED, SEATS_CHANGED, VANISHED))
+    if on_open:
+        latest.subscribe(on_open, kinds=(OPENED,))
+
+    def poll(query, crns):
+        # COOKIE is read per request so a background cookie refresh takes effect at once
+        return run_query(session, query, HOWDY_URL, COOKIE, http_client.TIMEOUT, planner, crns, cache, hedger)
+
+    def plan_jobs():
+        return [
+            PollJob(query, INTERVAL, partial(poll, query, crns))
+            for term, crns in watch_map.items()
+            for query in planner.plan(term, crns)
+        ]
+
+    def on_result(job, records):
+        now   = time.strftime("%Y-%m-%d %H:%M:%S")
+        query = job.key
+        log(DEBUG, f"[{now}] DEBUG: fetched {len(records)} sections ({cache.summary()})")
+        started = time.perf_counter()
+
+        # records only holds the watched CRNs; the shared catalog rewrites just the rows that changed
+        catalog  = catalog_for(query.term)
+        returned = {str(r.get("SWV_CLASS_SEARCH_CRN")) for r in records}
+        watched  = watch_map.get(query.term, [])
+        if cache.changed(cache_key(query, watched)):
+            catalog.upsert(records)
+
+        # feed each watched CRN this job covers to the trackers; they notify on transitions only
+        for crn in ([query.crn] if query.crn else watched):
+            section = catalog.get(crn) if crn in returned else None
+            latest.update(query.term, crn, section)
+            seat_tracker.update(query.term, crn, section)
+            scheduler.observe(query.term, crn, section)
+            if history:
+                history.observe(query.term, crn, section)
+            if section:
+                print(f"[{now}] CRN {crn} ({section.label}): {'🔓 OPEN' if section.open else '🔒 Full'}")
+            else:
+                if not catalog.complete:
+                    # a full term pull knows better than one narrow reply, which may be a blip
+                    catalog.discard(crn)
+                print(f"[{now}] CRN {crn}: ❓ not found")
+        metrics.observe("diff_seconds", time.perf_counter() - started)
+        metrics.inc("polls_total")
 
-    watch_crns = [str(c) for c in CRNS_TO_WATCH]
-    print(f"Starting WATCH mode: checking CRNs {watch_crns} every {INTERVAL}s\n")
+        # the planner learns sizes as responses come in; follow the plan if it changes
+        jobs = plan_jobs()
+        if {j.key for j in jobs} != {j.key for j in watch_engine.jobs}:
+            running = {j.key: j for j in watch_engine.jobs}
+            watch_engine.set_jobs([running.get(j.key, j) for j in jobs])
 
-    while True:
+    def on_error(job, e):
         now = time.strftime("%Y-%m-%d %H:%M:%S")
-        try:
-            records = fetch_all_sections(session)
-        except Exception as e:
-            print(f"[{now}] ERROR fetching sections:", e)
-            time.sleep(INTERVAL)
-            continue
+        log(ERROR, f"[{now}] ERROR fetching sections:", e)
+        metrics.inc("poll_errors_total", error=type(e).__name__)
+        if retry_after(e) is not None:
+            metrics.inc("poll_rate_limited_total")
+
+    def reconfigure(new_map=None):
+        """Apply changed pacing globals and, with ``new_map``, a new watch map. Loop thread only."""
+        if new_map is not None:
+            new_map = {term: [str(c) for c in crns] for term, crns in new_map.items()}
+            for term, crns in list(watch_map.items()):
+                for crn in set(crns) - set(new_map.get(term, [])):
+                    seat_tracker.forget(term, crn)
+                    latest.forget(term, crn)
+                    if history:
+                        history.forget(term, crn)
+                if term in new_map:
+                    crns[:] = new_map[term]    # in place: running jobs hold on to this list
+                else:
+                    del watch_map[term]
+            for term, crns in new_map.items():
+                watch_map.setdefault(term, crns)
+            print(f"[config] Now watching {watch_map}")
+        scheduler.base, scheduler.rpm = INTERVAL, RATE_BUDGET
+        seat_tracker.debounce = DEBOUNCE_SECS
+        running = {job.key: job for job in watch_engine.jobs}
+        watch_engine.set_jobs([running.get(job.key, job) for job in plan_jobs()])
+
+    print(f"Starting WATCH mode: checking CRNs {watch_map} every ~{INTERVAL}s (≤{RATE_BUDGET} requests/min)\n")
+    for term, crns in unknown_crns(watch_map).items():
+        log(WARNING, f"[watch] Warning: term {term} has no CRN {', '.join(crns)}; still watching in case it is added")
+    watch_engine = run.watch_engine = WatchEngine(on_result, on_error, scheduler=scheduler)
+    if not run.active:
+        watch_engine.stop()
+    run.watch_reconfigure = reconfigure
+    try:
+        await watch_engine.run(plan_jobs())
+    finally:
+        run.watch_reconfigure = None
+    if own_history:
+        history.close()
+        print(f"Recorded {history.written} seat transitions to {HISTORY_PATH}")
+    if hedger:
+        print(f"Hedged {hedger.hedged} slow polls, the backup won {hedger.wins}")
+    print("Watch monitor ended.")
+
+
+def format_seat_event(event):
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    if event.kind == OPENED:
+        status = "🔓 OPEN"
+    elif event.kind == CLOSED:
+        status = "🔒 Full"
+    elif event.kind == SEATS_CHANGED:
+        status = f"{'🔓 OPEN' if event.open else '🔒 Full'}, seats {event.prev_seats} → {event.seats}"
+    else:
+        status = "❓ no longer listed"
+    return f"[{now}] CRN {event.crn} ({event.title}): {status}"
 
-        # DEBUG: how many records did we get? what keys do they carry?
-        print(f"[{now}] DEBUG: fetched {len(records)} sections")
-
-        # build a map CRN→info
-        status_map = {}
-        for r in records:
-            crn_val = r.get("SWV_CLASS_SEARCH_CRN")
-            crn     = str(crn_val) if crn_val is not None else None
-            is_open = (r.get("STUSEAT_OPEN") == "Y")
-            title   = f"{r.get('SWV_CLASS_SEARCH_SUBJECT')} {r.get('SWV_CLASS_SEARCH_COURSE')} – {r.get('SWV_CLASS_SEARCH_TITLE')}"
-            if crn:
-                status_map[crn] = {"open": is_open, "title": title}
-
-        # now report on each watched CRN
-        for crn in watch_crns:
-            info = status_map.get(crn)
-            if info:
-                status = "🔓 OPEN" if info["open"] else "🔒 Full"
-                print(f"[{now}] CRN {crn} ({info['title']}): {status}")
-                if info["open"]:
-                    notify_discord(f"[{now}] CRN {crn} ({info['title']}): {status}")
-            else:
-                print(f"[{now}] CRN {crn}: ❓ not found")
 
-        time.sleep(INTERVAL)
+def notify_seat_event(event):
+    # only an opening is worth a ping, the rest is informational
+    notify_discord(format_seat_event(event), ping=DC_PING_NAME if event.kind == OPENED else "")
 
 
 # ───── SWAP MODE FUNCTIONS ─────
-def refresh_cookie():
-    global driver, COOKIE
-    print("Refreshing cookie via Selenium…")
-    opts = webdriver.ChromeOptions()
-    opts.add_argument("--headless")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--window-size=1920,1080")
-    opts.add_argument("user-agent=Mozilla/5.0")
-
-    if not driver:
-        driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
-            options=opts
+def get_credentials():
+    """The process-wide CredentialManager, created on first use from the loaded config."""
+    global credentials
+    if credentials is None:
+        try:
+            obtained_at = load_config().get("cookie_refreshed_at")
+        except (OSError, ValueError):
+            obtained_at = None
+        credentials = CredentialManager(
+            ChromeLogin(USERNAME, PASSWORD, cache_dir=CONFIG_DIR),
+            COOKIE, obtained_at, on_change=_cookie_changed
         )
-    wait = WebDriverWait(driver, 30)
-
-    driver.get("https://tamu.collegescheduler.com/entry")
-    # … login flow as before …
-    driver.get("https://tamu.collegescheduler.com/dashboard")
-    time.sleep(3)
-    cookies = driver.get_cookies()
-    cookie_str = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
-    cfg = load_config()
-    cfg["cookie"] = cookie_str
-    save_config(cfg)
-    COOKIE = cookie_str
-    print("Cookie refreshed!")
-    return cookie_str
+    return credentials
+
+
+def _cookie_changed(cookie, obtained_at):
+    global COOKIE
+    COOKIE = cookie
+    config_file.update(CONFIG_PATH, {"cookie": cookie, "cookie_refreshed_at": obtained_at})
+
+
+def refresh_cookie(stale=None):
+    """Blocking browser login (shared with any refresh already running); returns the new cookie."""
+    return get_credentials().refresh(stale)
 
 
-def get_token():
+TOKEN_URL           = "https://tamu.collegescheduler.com/api/oauth/student/client-credentials/token"
+SWAP_INTERVAL       = 1       # seconds between swap attempts
+SWAP_MAX_BACKOFF    = 60      # ceiling when the server keeps throttling us
+WINDOW_RETRIES      = 2       # extra frames sent after the first one at a registration window
+WINDOW_STAGGER      = 0.25    # seconds between those frames
+WINDOW_TOKEN_MARGIN = 120     # re-fetch the token before the window if it would expire this close to it
+SWAP_LATENCIES      = []      # seconds from "an add CRN seen open" to "registration frame sent", per trigger
+
+
+def _request_token(cookie):
+    resp = http_client.get(TOKEN_URL, headers={"Cookie": cookie})
+    resp.raise_for_status()
+    return resp.json()
+
+
+def fetch_token():
+    """Blocking: (access token, lifetime in seconds or None), refreshing the cookie once if needed."""
     global token
+    cookie = COOKIE
     try:
-        resp = requests.get(
-            "https://tamu.collegescheduler.com/api/oauth/student/client-credentials/token",
-            headers={"Cookie": COOKIE},
-            timeout=10
-        )
-        resp.raise_for_status()
-        token = resp.json()["accessToken"]
-    except:
-        new_ck = refresh_cookie()
-        if new_ck:
-            resp = requests.get(
-                "https://tamu.collegescheduler.com/api/oauth/student/client-credentials/token",
-                headers={"Cookie": new_ck},
-                timeout=10
-            )
-            resp.raise_for_status()
-            token = resp.json()["accessToken"]
+        data = _request_token(cookie)
+    except Exception:
+        metrics.inc("token_retries_total")
+        data = _request_token(refresh_cookie(cookie))
+    token = data["accessToken"]
+    return token, data.get("expiresIn")
+
+
+def registration_request(add, drop=""):
+    """Conditional drop/add of one candidate (a plain add when ``drop`` is empty)."""
+    requests = [{"regNumber": add}]
+    if drop:
+        requests.insert(0, {"regNumber": drop, "action": "DW"})
+    return {
+        "subdomain":         "tamu",
+        "type":              "ENROLL_CART",
+        "userId":            0,
+        "termCode":          TERM_ID,
+        "regNumberRequests": requests,
+        "additionalData":    {"altPin": ""},
+        "conditionalAddDrop": "Y" if drop else "N"
+    }
 
 
-async def send_message():
-    global MONITOR_ACTIVE
-
-    async with websockets.connect(socket_url) as ws:
-        get_token()
-        while MONITOR_ACTIVE:
-            await ws.send(f'420["authorize",{{"token":"{token}"}}]')
-            await ws.send(
-                f'421["registration-request",{{'
-                f'"subdomain":"tamu","type":"ENROLL_CART","userId":0,'
-                f'"termCode":"{TERM_ID}",'
-                f'"regNumberRequests":['
-                    f'{{"regNumber":"{SWAP_FROM}","action":"DW"}},'
-                    f'{{"regNumber":"{SWAP_TO}"}}'
-                f'],'
-                f'"additionalData":{{"altPin":""}},"conditionalAddDrop":"Y"'
-                f'}}]'
-            )
-            await asyncio.sleep(1)
-
-        print("Swap monitor ended.")
-
-
-def notify_discord(message):
-    if notifier:
-        asyncio.run_coroutine_threadsafe(notifier.send_message(message), notifier.loop)
+def swap_rules():
+    """SwapRules from SWAP_RULES, or SWAP_FROM → SWAP_TO when no rules were configured."""
+    return parse_rules({"swap_rules": SWAP_RULES, "swap_from": SWAP_FROM, "swap_to": SWAP_TO}, SWAP_INTERVAL)
 
 
-class DiscordNotifier(discord.Client):
-    def __init__(self, channel_name):
-        super().__init__(intents=discord.Intents.default())
-        self.channel_name = channel_name
+def swap_plan():
+    return SwapPlan(swap_rules())
 
-    async def on_ready(self):
-        print(f"Discord bot logged in as {self.user}")
 
-    async def send_message(self, message):
-        for guild in self.guilds:
-            chan = discord.utils.get(guild.text_channels, name=self.channel_name)
-            if chan:
-                await chan.send(message)
-                return
+def report_final(plan, candidate, result):
+    """Settle a final outcome on the plan, and tell Discord (pinging on success)."""
+    cancelled = plan.settle(candidate, result.outcome)
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    msg = f"[{now}] Swap {candidate.label}: {result.outcome}. Reply: {result.reply}"
+    if cancelled:
+        msg += f"\nNo longer trying: {', '.join(c.label for c in cancelled)}"
+    print(msg)
+    notify_discord(msg, ping=DC_PING_NAME if result.outcome == SUCCESS or plan.finished else "")
 
-    def start_bot(self, token):
-        Thread(target=lambda: asyncio.run(self.start(token)), daemon=True).start()
+
+async def drive_rule(session, plan, rule, stats, keep_going=lambda rule: True, is_open=None, observed=None, run=None):
+    """Send ``rule``'s attempts at its own pace until it is done, ``keep_going(rule)`` turns false
+    or ``run`` (the current one by default) is stopped.
+
+    Other rules' attempts share the session meanwhile; ``is_open`` and
+    ``observed`` are as for swap_until.
+    """
+    run = run or current_run
+    while run.active and rule.active and keep_going(rule):
+        try:
+            await session.wait_ready(SWAP_INTERVAL)
+        except asyncio.TimeoutError:
+            continue
+        candidate = plan.claim(rule, is_open)
+        if candidate is None:
+            # another rule has an attempt on one of these CRNs in flight, or nothing is open
+            await asyncio.sleep(SWAP_INTERVAL / 4)
+            continue
+        try:
+            result = await attempt(session, registration_request(candidate.add, candidate.drop))
+        except ConnectionError as e:
+            log(WARNING, f"Swap attempt lost: {e}")
+            metrics.inc("swap_attempts_lost_total")
+            continue
+        finally:
+            plan.release(candidate)
+        stats.record(result)
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        observed_at = observed.pop(candidate.add, None) if observed else None
+        if observed_at is not None:
+            SWAP_LATENCIES.append(result.sent_at - observed_at)
+            print(f"[{now}] seat seen open → swap frame sent in {SWAP_LATENCIES[-1] * 1000:.1f} ms")
+        print(f"[{now}] swap {candidate.label}: {result.outcome} ({stats.summary()})")
+
+        if result.outcome in FINAL:
+            report_final(plan, candidate, result)
+            continue
+        if result.outcome == AUTH:
+            await session.reauthorize()
+        if result.outcome == THROTTLED:
+            rule.slow_down(SWAP_MAX_BACKOFF)
+        else:
+            rule.reset_pace()
+        await asyncio.sleep(rule.delay)
+
+
+async def swap_until(session, stats, plan, keep_going=lambda rule: True, is_open=None, observed=None, run=None):
+    """Run every active rule of ``plan`` side by side on ``session`` until each one stops.
+
+    With ``is_open(crn)`` only candidates whose add is open are sent.
+    ``observed`` maps CRNs to the time.monotonic() of the poll that saw them
+    open; the first attempt at each prints its detection→send latency and
+    keeps it in SWAP_LATENCIES. Rules added by a config reload meanwhile
+    are picked up, removed ones stop.
+    """
+    run     = run or current_run
+    drivers = {}
+
+    def start():
+        for rule in plan.rules:
+            if rule.active and (rule not in drivers or drivers[rule].done()):
+                drivers[rule] = asyncio.ensure_future(
+                    drive_rule(session, plan, rule, stats, keep_going, is_open, observed, run))
+
+    def reconfigure():
+        added, removed = plan.update(swap_rules())
+        print(f"[config] Swap rules: {len(added)} added, {len(removed)} removed; {plan.summary()}")
+        start()
+
+    start()
+    run.swap_reconfigure = reconfigure
+    try:
+        while True:
+            running = [task for task in drivers.values() if not task.done()]
+            if not running:
+                break
+            await asyncio.wait(running, return_when=FIRST_COMPLETED)
+    finally:
+        run.swap_reconfigure = None
+        for task in drivers.values():
+            task.cancel()
+        await asyncio.gather(*drivers.values(), return_exceptions=True)
+
+
+async def send_message():
+    """Swap mode: fire every swap rule over one long-lived, authorized socket until each one
+    succeeds, is made moot by another, or the server says it never will."""
+    plan    = swap_plan()
+    session = SwapSession(socket_url, TokenCache(fetch_token))
+    stats   = OutcomeStats()
+    runner  = asyncio.ensure_future(session.run())
+    print(f"Starting SWAP mode: {'; '.join(rule.label for rule in plan.rules)}\n")
+    try:
+        await swap_until(session, stats, plan)
+    finally:
+        await session.close()
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    print(f"Swap monitor ended. {plan.summary()}. {stats.summary()}")
+
+
+async def watch_and_swap():
+    """Watch every CRN the swap rules could add and fire the rules that want it over an already
+    authorized socket the moment it opens."""
+    run      = current_run
+    plan     = swap_plan()
+    session  = SwapSession(socket_url, TokenCache(fetch_token))
+    stats    = OutcomeStats()
+    runner   = asyncio.ensure_future(session.run())
+    drivers  = {}    # rule → task sending its attempts
+    observed = {}    # crn → time.monotonic() it was seen open, until the first frame for it
+
+    def is_open(crn):
+        # the latest poll, not the debounced notification state
+        state = run.seats.get(TERM_ID, crn) if run.seats is not None else None
+        return bool(state and state[0])
+
+    def any_open(rule):
+        return any(c.active and is_open(c.add) for c in rule.candidates)
+
+    async def fire(rule):
+        await drive_rule(session, plan, rule, stats, any_open, is_open, observed, run)
+        if plan.finished:
+            run.watch_engine.stop()
+
+    def on_open(event):
+        for rule in plan.rules_adding(event.crn):
+            observed.setdefault(event.crn, event.at)
+            if rule not in drivers or drivers[rule].done():
+                drivers[rule] = asyncio.get_running_loop().create_task(fire(rule))
+
+    def reconfigure():
+        added, removed = plan.update(swap_rules())
+        print(f"[config] Swap rules: {len(added)} added, {len(removed)} removed; {plan.summary()}")
+        if run.watch_reconfigure:
+            # a newly watched CRN that is already open shows up as OPENED on its first poll
+            run.watch_reconfigure({TERM_ID: plan.watched()})
+
+    print(f"Starting WATCH+SWAP mode: {'; '.join(rule.label for rule in plan.rules)}, "
+          f"each as soon as one of its CRNs opens\n")
+    run.swap_reconfigure = reconfigure
+    try:
+        await watch_crns({TERM_ID: plan.watched()}, subscribers=[notify_seat_event], run=run, on_open=on_open)
+    finally:
+        run.swap_reconfigure = None
+        for task in drivers.values():
+            task.cancel()
+        await session.close()
+        runner.cancel()
+        await asyncio.gather(runner, *drivers.values(), return_exceptions=True)
+    if SWAP_LATENCIES:
+        ordered = sorted(SWAP_LATENCIES)
+        print(f"Detection → swap frame: {len(ordered)} triggers, "
+              f"p50 {ordered[len(ordered) // 2] * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms")
+    print(f"Watch+swap monitor ended. {plan.summary()}. {stats.summary()}")
+
+
+STOPPED = object()    # until_stopped: the run was stopped first
+
+
+async def until_stopped(run, awaitable):
+    """Await ``awaitable``, or cancel it and return STOPPED if ``run`` is stopped first."""
+    task    = asyncio.ensure_future(awaitable)
+    stopped = asyncio.ensure_future(run.wait())
+    try:
+        await asyncio.wait((task, stopped), return_when=FIRST_COMPLETED)
+    finally:
+        stopped.cancel()
+    if not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return STOPPED
+    return task.result()
+
+
+def server_date():
+    """Blocking: the Date header of a cheap request to College Scheduler."""
+    resp = http_client.head("https://tamu.collegescheduler.com/", allow_redirects=False)
+    return resp.headers.get("Date")
+
+
+async def registration_window(target):
+    """Swap at a known opening time (epoch seconds): warm everything up first, send the best
+    non-conflicting candidate of every rule on the server's clock, then keep trying at the
+    normal swap pace. Stopping the monitor at any point before T-0 sends nothing."""
+    loop    = asyncio.get_running_loop()
+    run     = current_run
+    plan    = swap_plan()
+    tokens  = TokenCache(fetch_token)
+    session = SwapSession(socket_url, tokens)
+    stats   = OutcomeStats()
+    runner  = asyncio.ensure_future(session.run())
+
+    async def warm_up():
+        await tokens.get()
+        await session.wait_ready(60)
+        clock = await loop.run_in_executor(None, estimate_offset, server_date)
+        print(f"Server clock offset {clock.offset * 1000:+.0f} ms (±{clock.error * 1000:.0f} ms, {clock.samples} samples)")
+        # the token must outlive the burst; fetch_token may drive a browser, so do it now rather than at T-0
+        if token_expires_first(tokens.expires_at, target, clock.offset, WINDOW_TOKEN_MARGIN):
+            await session.reauthorize()
+        return clock
+
+    sent = set()
+
+    async def send(frame):
+        if not run.active:
+            return    # stopped during the last few milliseconds before T-0
+        try:
+            await session.send_frame(frame)
+        except ConnectionError as e:
+            log(WARNING, f"Window frame not sent: {e}")
+            metrics.inc("swap_attempts_lost_total")
+            return
+        sent.add(frame)
+
+    try:
+        lead = target - time.time()
+        print(f"Registration window in {lead:.0f}s; warming up (cookie/token, socket, clock offset)…")
+        clock = await until_stopped(run, warm_up())
+        if clock is STOPPED:
+            print("Registration window cancelled before it opened.")
+            return
+
+        burst = plan.opening_set()
+        plan.claim_all(burst)
+        prepared = [
+            (candidate, *session.prepare("registration-request", registration_request(candidate.add, candidate.drop)))
+            for _ in range(1 + WINDOW_RETRIES)
+            for candidate in burst
+        ]
+        errors = await until_stopped(run, send_burst(target, [f for _, f, _ in prepared], send,
+                                                     clock.offset, WINDOW_STAGGER))
+        sent_at = time.monotonic()
+        if errors is STOPPED or not run.active:
+            for _, frame, fut in prepared:
+                if frame not in sent:
+                    session.drop_ack(fut)
+            print(f"Registration window stopped; {len(sent)} of {len(prepared)} frames had been sent.")
+            return
+        for i, ((_, frame, _), err) in enumerate(zip(prepared, errors)):
+            if frame in sent:
+                print(f"Window frame {i + 1}/{len(errors)} sent {err * 1000:+.1f} ms from target (server clock)")
+        if len(sent) < len(prepared):
+            log(WARNING, f"Only {len(sent)} of {len(prepared)} window frames went out; "
+                  f"carrying on at the normal swap pace once the socket is back")
+
+        for candidate, frame, fut in prepared:
+            if frame not in sent:
+                session.drop_ack(fut)
+                continue
+            try:
+                reply = await asyncio.wait_for(fut, ACK_TIMEOUT)
+                result = Attempt(classify(reply), time.monotonic() - sent_at, reply, sent_at)
+            except (asyncio.TimeoutError, ConnectionError):
+                session.drop_ack(fut)
+                result = Attempt(TIMEOUT, None, None, sent_at)
+            stats.record(result)
+            if result.outcome in FINAL:
+                # later frames of a candidate that already went through come back as "already registered"
+                if candidate.active:
+                    report_final(plan, candidate, result)
+        for candidate in burst:
+            plan.release(candidate)
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{now}] Window burst: {stats.summary()}")
+        await swap_until(session, stats, plan, run=run)
+    finally:
+        await session.close()
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    print(f"Registration window ended. {plan.summary()}. {stats.summary()}")
+
+
+def notify_discord(message, client=None, channel_name=None, ping=""):
+    """Queue a Discord post; ``ping`` (e.g. DC_PING_NAME) is put in front of the batch it lands in."""
+    client = client or notifier
+    if client:
+        client.enqueue(message, channel_name, ping)
 
 
 # ───── ENTRY POINT ─────
-def start_monitoring():
-    global notifier, SWAP_FROM, SWAP_TO, COOKIE, USERNAME, PASSWORD
-    global TERM, TERM_ID, TYPE, CRNS_TO_WATCH
+def fetch_term_map(cookie=""):
+    """{term description: term code} from howdy's term list."""
+    resp = http_client.get(f"{HOWDY_URL}/api/all-terms", headers={"Cookie": cookie})
+    resp.raise_for_status()
+    return {
+        t["STVTERM_DESC"]: t["STVTERM_CODE"]
+        for t in resp.json()
+        if "STVTERM_DESC" in t and "STVTERM_CODE" in t
+    }
+
+
+def term_map(cookie=""):
+    """fetch_term_map, answered from the on-disk cache while it is fresh."""
+    return cached_term_map(DiskCache(CACHE_DIR), lambda: fetch_term_map(cookie))
+
+
+def unknown_crns(watch_map, cache=None):
+    """{term: [crns]} of watched CRNs missing from the term's full catalog.
+
+    Catalogs come from the on-disk copy the config GUI saved while it is
+    fresh; a term without one is not checked.
+    """
+    cache   = cache or DiskCache(CACHE_DIR)
+    unknown = {}
+    for term, crns in watch_map.items():
+        catalog = catalog_for(term)
+        if not (catalog.complete or load_catalog(cache, catalog)):
+            continue
+        missing = [crn for crn in crns if crn not in catalog]
+        if missing:
+            unknown[term] = missing
+    return unknown
+
+
+# config keys that only take effect on the next start_monitoring
+RESTART_KEYS = frozenset((
+    "type", "discord_token", "username", "password", "window_time",
+    "hedge_requests", "seat_history", "howdy_url", "token_url", "socket_url"
+))
+
+
+def apply_settings(cfg):
+    """Set the module globals from a config dict (everything but TERM_ID and the notifier)."""
+    global SWAP_FROM, SWAP_TO, SWAP_RULES, COOKIE, USERNAME, PASSWORD, INTERVAL
+    global TERM, TYPE, CRNS_TO_WATCH, DEBOUNCE_SECS, RATE_BUDGET, WINDOW_TIME, HEDGE, HISTORY
     global DISCORD_TOKEN, CHANNEL_NAME, ACC_ID, DC_PING_NAME
+    global HOWDY_URL, TOKEN_URL, socket_url
 
-    cfg = load_config()
     TYPE           = cfg.get("type", "")
     DISCORD_TOKEN  = cfg.get("discord_token", "")
     CHANNEL_NAME   = cfg.get("channel_name", "")
     ACC_ID         = cfg.get("discord_account_id", "")
+    DC_PING_NAME   = f"<@{ACC_ID}>" if ACC_ID else ""
     SWAP_FROM      = cfg.get("swap_from", "")
     SWAP_TO        = cfg.get("swap_to", "")
+    SWAP_RULES     = cfg.get("swap_rules", [])
     COOKIE         = cfg.get("cookie", "")
     USERNAME       = cfg.get("username", "")
     PASSWORD       = cfg.get("password", "")
     TERM           = cfg.get("term_name", "")
     CRNS_TO_WATCH  = cfg.get("crns_to_watch", [])
-
-    # ─── Fetch all terms and build desc→code map ───
+    WINDOW_TIME    = cfg.get("window_time", "")
+    INTERVAL       = float(cfg.get("interval", 5))
+    DEBOUNCE_SECS  = float(cfg.get("debounce_seconds", DEBOUNCE))
+    RATE_BUDGET    = int(cfg.get("requests_per_minute", REQUESTS_PER_MINUTE))
+    if RATE_BUDGET < 1:
+        # the budget divides the combined cadence; 0 or less would stop polling (or crash the scheduler)
+        log(WARNING, f"[config] requests_per_minute must be at least 1, using 1 instead of {RATE_BUDGET}")
+        RATE_BUDGET = 1
+    HEDGE          = bool(cfg.get("hedge_requests", False))
+    HISTORY        = bool(cfg.get("seat_history", True))
+    json_decode.use(cfg.get("json_backend"))    # None: the fastest one installed
+    # endpoints can be pointed elsewhere, e.g. at the stand-ins in bench/harness.py
+    HOWDY_URL      = cfg.get("howdy_url", HOWDY_URL)
+    TOKEN_URL      = cfg.get("token_url", TOKEN_URL)
+    socket_url     = cfg.get("socket_url", socket_url)
+
+    # ─── Metrics: "metrics": true collects them for the Monitor tab, "metrics_port" also serves them ───
+    if cfg.get("metrics_port"):
+        metrics.serve(int(cfg["metrics_port"]))
+    elif cfg.get("metrics"):
+        metrics.enable()
+
+
+def resolve_term():
+    """Blocking: look up TERM_ID for TERM (from the on-disk term list while it is fresh)."""
+    global TERM_ID
     try:
-        resp = requests.get(
-            "https://howdy.tamu.edu/api/all-terms",
-            headers={"Cookie": COOKIE},
-            timeout=10
-        )
-        resp.raise_for_status()
-        all_terms = resp.json()
-        term_map = {
-            t["STVTERM_DESC"]: t["STVTERM_CODE"]
-            for t in all_terms
-            if "STVTERM_DESC" in t and "STVTERM_CODE" in t
-        }
-        TERM_ID = term_map.get(TERM, "")
+        TERM_ID = term_map(COOKIE).get(TERM, "")
         if not TERM_ID:
-            print(f"[start_monitoring] Warning: could not find term code for '{TERM}'")
+            log(WARNING, f"[start_monitoring] Warning: could not find term code for '{TERM}'")
         else:
             print(f"[start_monitoring] Using term code {TERM_ID} for '{TERM}'")
     except Exception as e:
         TERM_ID = ""
-        print(f"[start_monitoring] Error fetching term list: {e}")
+        log(ERROR, f"[start_monitoring] Error fetching term list: {e}")
+
+
+async def reload_config(cfg, changed, run=None):
+    """Apply an edited config.json to ``run`` (the current one by default), keeping its connections."""
+    run = run or current_run
+    apply_settings(cfg)
+    print(f"[config] config.json changed: {', '.join(sorted(changed))}")
+    later = changed & RESTART_KEYS
+    if later:
+        print(f"[config] {', '.join(sorted(later))} take effect after a restart")
+
+    if "term_name" in changed:
+        await asyncio.get_running_loop().run_in_executor(None, resolve_term)
+    if "cookie" in changed and credentials and credentials.cookie != COOKIE:
+        credentials.use(COOKIE, cfg.get("cookie_refreshed_at"))
+    if notifier and "channel_name" in changed:
+        notifier.channel_name = CHANNEL_NAME
+
+    if run.watch_reconfigure:
+        if TYPE == "watch" and changed & {"crns_to_watch", "term_name"}:
+            run.watch_reconfigure({TERM_ID: CRNS_TO_WATCH})
+        elif changed & {"interval", "requests_per_minute", "debounce_seconds"}:
+            run.watch_reconfigure()
+    if run.swap_reconfigure and changed & {"swap_rules", "swap_from", "swap_to", "term_name"}:
+        run.swap_reconfigure()
+
+
+async def with_config_reload(monitor, cfg):
+    """Run the ``monitor`` coroutine while a ConfigWatcher applies edits of config.json to it."""
+    on_change = partial(reload_config, run=current_run)
+    watcher   = asyncio.ensure_future(config_file.ConfigWatcher(CONFIG_PATH, on_change, cfg).run())
+    try:
+        return await monitor
+    finally:
+        watcher.cancel()
+        await asyncio.gather(watcher, return_exceptions=True)
+
+
+def start_monitoring():
+    global notifier, current_run
 
+    current_run = MonitorRun()
+    cfg = load_config()
+    apply_settings(cfg)
 
-    # ─── Setup Discord notifier ───
-    notifier = DiscordNotifier(CHANNEL_NAME)
+    # ─── Fetch all terms and build desc→code map ───
+    resolve_term()
+
+    # ─── Setup Discord notifier (discord.py is only imported when there is a token) ───
+    notifier = None
     if DISCORD_TOKEN:
+        from discord_notifier import DiscordNotifier
+        notifier = DiscordNotifier(CHANNEL_NAME)
         notifier.start_bot(DISCORD_TOKEN)
-    if ACC_ID:
-        DC_PING_NAME = f"<@{ACC_ID}>"
+        metrics.gauge("discord_queue_depth", lambda: notifier.queue.depth if notifier else 0)
+
+    # ─── Keep the cookie fresh in the background where swaps depend on it ───
+    if TYPE in ("swap", "watch_swap", "window"):
+        get_credentials().start()
 
-    # ─── Kick off the right monitor loop ───
+    # ─── Kick off the right monitor loop; edits to config.json are applied to it as it runs ───
     if TYPE == "watch":
-        monitor_crns()
+        asyncio.run(with_config_reload(watch_crns(), cfg))
     elif TYPE == "swap":
-        asyncio.run(send_message())
+        asyncio.run(with_config_reload(send_message(), cfg))
+    elif TYPE == "watch_swap":
+        asyncio.run(with_config_reload(watch_and_swap(), cfg))
+    elif TYPE == "window":
+        try:
+            target = datetime.fromisoformat(WINDOW_TIME).timestamp()
+        except (TypeError, ValueError):
+            log(ERROR, f"Invalid window_time in config: {WINDOW_TIME!r} (expected e.g. 2026-11-02T08:00:00-06:00)")
+            return
+        asyncio.run(with_config_reload(registration_window(target), cfg))
     else:
-        print("Invalid type in config; must be 'watch' or 'swap'.")
+        log(ERROR, "Invalid type in config; must be 'watch', 'swap', 'watch_swap' or 'window'.")
 
 
 def stop_monitoring():
-    global MONITOR_ACTIVE
-    MONITOR_ACTIVE = False
+    global credentials
+    current_run.stop()
+    if credentials:
+        credentials.close()
+        credentials = None
+    if notifier:
+        print(f"[Discord] {notifier.queue.summary()}")
     print("Monitoring stopped by user.")
 
 
+def main(argv=None):
+    """Headless entry point: run one config (any mode) until Ctrl+C or SIGTERM."""
+    import argparse
+    import signal
+    global CONFIG_DIR, CONFIG_PATH, CACHE_DIR, HISTORY_PATH
+    ap = argparse.ArgumentParser(description="Run one CheckSeats config without the GUI.")
+    ap.add_argument("--config", default=CONFIG_PATH, help=f"config.json to run (default {CONFIG_PATH})")
+    args = ap.parse_args(argv)
+    # the cache and the seat history live next to the config they belong to
+    CONFIG_PATH  = os.path.abspath(args.config)
+    CONFIG_DIR   = os.path.dirname(CONFIG_PATH)
+    CACHE_DIR    = os.path.join(CONFIG_DIR, "cache")
+    HISTORY_PATH = os.path.join(CONFIG_DIR, "seat_history.sqlite3")
+    signal.signal(signal.SIGTERM, lambda *_: stop_monitoring())
+    try:
+        start_monitoring()
+    except KeyboardInterrupt:
+        stop_monitoring()
+
+
 if __name__ == "__main__":
-    start_monitoring()
\ No newline at end of file
+    main()
\ No newline at end of file
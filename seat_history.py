@@ -0,0 +1,329 @@
+# seat_history.py
+"""Append-only history of seat transitions, in SQLite.
+
+``SeatHistory.observe`` is fed every poll of every watched CRN, like
+SeatTracker.update, and keeps its own undebounced tracker, so every
+opening, filling up, seat count change and disappearance is kept, not only
+the ones that were reported. The poll loop only pays for that comparison
+and a queue append. A writer thread inserts the queued rows in batches of
+up to BATCH_SIZE, one transaction every FLUSH_INTERVAL, into a WAL-mode
+database that readers (the query helpers, another process) can open while
+it is being written.
+
+    python seat_history.py opens CRN [--days 7]      when CRN opened
+    python seat_history.py durations [--term T]      how long sections stay open
+    python seat_history.py hours [--days 30]         transitions per hour of day
+
+``replay`` plays a stored stretch back through a PollScheduler and/or
+SeatEvent subscribers in timestamp order, see bench/bench_cadence_replay.py.
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+from log_pipeline import log, ERROR
+from seat_state import SeatTracker, SeatEvent, OPENED, CLOSED, VANISHED
+
+BATCH_SIZE      = 500        # rows per INSERT
+FLUSH_INTERVAL  = 2.0        # seconds a row may wait in memory
+RETENTION_DAYS  = 365        # older rows are pruned when the store is opened
+DAY             = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    at          REAL    NOT NULL,      -- time.time() of the poll that saw it
+    term        TEXT    NOT NULL,
+    crn         TEXT    NOT NULL,
+    kind        TEXT    NOT NULL,
+    open        INTEGER NOT NULL,
+    seats       INTEGER,
+    prev_seats  INTEGER
+);
+CREATE INDEX IF NOT EXISTS transitions_crn ON transitions (term, crn, at);
+CREATE INDEX IF NOT EXISTS transitions_at  ON transitions (at);
+CREATE TABLE IF NOT EXISTS titles (
+    term   TEXT NOT NULL,
+    crn    TEXT NOT NULL,
+    title  TEXT NOT NULL,
+    PRIMARY KEY (term, crn)
+) WITHOUT ROWID;
+"""
+
+# a span of time a section stayed open; ``closed_at`` is None while it still is
+OpenSpan = namedtuple("OpenSpan", ["term", "crn", "opened_at", "closed_at"])
+
+_Title = namedtuple("_Title", ["term", "crn", "title"])
+_STOP  = object()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")    # WAL keeps this crash-safe, only the last batch can be lost
+    return conn
+
+
+class SeatHistory:
+    """Record seat transitions to ``path`` and answer questions about them."""
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 retention_days=RETENTION_DAYS, clock=time.time):
+        self.path           = path
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval
+        self.clock          = clock
+        self.written        = 0
+        self._queue   = queue.SimpleQueue()
+        self._titles  = {}                         # (term, crn) → last title queued
+        self._tracker = SeatTracker(debounce=0, clock=clock)
+        self._tracker.subscribe(self._append)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db   = _connect(path)
+        self._lock = threading.Lock()              # one statement at a time on self._db
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+            if retention_days:
+                self._db.execute("DELETE FROM transitions WHERE at < ?", (clock() - retention_days * DAY,))
+        self._writer = threading.Thread(target=self._write_loop, name="seat-history", daemon=True)
+        self._writer.start()
+
+    # ───── recording (any thread) ─────
+    def observe(self, term, crn, section, now=None):
+        """Feed one poll of ``crn``, as for SeatTracker.update; only changes are queued."""
+        self._tracker.update(term, crn, section, now)
+
+    def forget(self, term, crn=None):
+        """Stop tracking a CRN (or a whole term) that is no longer watched."""
+        self._tracker.forget(term, crn)
+
+    def record(self, event):
+        """Queue a SeatEvent whose ``at`` is a time.time() timestamp."""
+        self._append(event)
+
+    def _append(self, event):
+        key = (event.term, event.crn)
+        if event.title and self._titles.get(key) != event.title:
+            self._titles[key] = event.title
+            self._queue.put(_Title(event.term, event.crn, event.title))
+        self._queue.put(event)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Write out what's queued and stop the writer."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._lock:
+            self._db.close()
+
+    # ───── writer thread ─────
+    def _write_loop(self):
+        while True:
+            rows, titles, waiters, stop = [], {}, [], False
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif isinstance(item, _Title):
+                    titles[item.term, item.crn] = item.title
+                else:
+                    rows.append((item.at, item.term, item.crn, item.kind, int(item.open), item.seats, item.prev_seats))
+                if stop or waiters or len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._write(rows, titles)
+            for done in waiters:
+                done.set()
+            if stop:
+                return
+
+    def _write(self, rows, titles):
+        if not rows and not titles:
+            return
+        started = time.perf_counter()
+        try:
+            with self._lock, self._db:
+                self._db.executemany("INSERT INTO transitions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO titles VALUES (?, ?, ?)",
+                    [(term, crn, title) for (term, crn), title in titles.items()]
+                )
+        except sqlite3.Error as e:
+            log(ERROR, f"[SeatHistory] dropped {len(rows)} rows: {e}")
+            metrics.inc("history_dropped_total", len(rows))
+            return
+        self.written += len(rows)
+        metrics.inc("history_rows_total", len(rows))
+        metrics.observe("history_flush_seconds", time.perf_counter() - started)
+
+    # ───── queries ─────
+    def _select(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def transitions(self, term=None, crn=None, since=None, until=None, kinds=None):
+        """Stored SeatEvents (``at`` is time.time()), oldest first, filtered by whatever is given."""
+        where, params = [], []
+        for clause, value in (("t.term = ?", term), ("t.crn = ?", None if crn is None else str(crn)),
+                              ("t.at >= ?", since), ("t.at < ?", until)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if kinds:
+            where.append(f"t.kind IN ({','.join('?' * len(kinds))})")
+            params.extend(kinds)
+        rows = self._select(
+            "SELECT t.kind, t.term, t.crn, COALESCE(n.title, ''), t.open, t.seats, t.prev_seats, t.at"
+            " FROM transitions t LEFT JOIN titles n ON n.term = t.term AND n.crn = t.crn"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY t.at",
+            params
+        )
+        return [SeatEvent(kind, term, crn, title, bool(is_open), seats, prev, at)
+                for kind, term, crn, title, is_open, seats, prev, at in rows]
+
+    def openings(self, crn, term=None, days=7):
+        """Times ``crn`` opened in the last ``days`` days."""
+        since = self.clock() - days * DAY
+        return [e.at for e in self.transitions(term, crn, since=since, kinds=(OPENED,))]
+
+    def open_spans(self, term=None, crn=None, since=None):
+        """OpenSpans from each opening to the closing (or disappearance) that followed it."""
+        spans, opened = [], {}
+        for e in self.transitions(term, crn, since=since, kinds=(OPENED, CLOSED, VANISHED)):
+            key = (e.term, e.crn)
+            if e.kind == OPENED:
+                opened.setdefault(key, e.at)
+            elif key in opened:
+                spans.append(OpenSpan(e.term, e.crn, opened.pop(key), e.at))
+        spans.extend(OpenSpan(term, crn, at, None) for (term, crn), at in opened.items())
+        return sorted(spans, key=lambda s: s.opened_at)
+
+    def open_durations(self, term=None, crn=None, since=None):
+        """{"count", "p50", "p90", "max"} in seconds over the finished OpenSpans (None values if there are none)."""
+        durations = sorted(s.closed_at - s.opened_at for s in self.open_spans(term, crn, since) if s.closed_at)
+        if not durations:
+            return {"count": 0, "p50": None, "p90": None, "max": None}
+
+        def pick(p):
+            return durations[min(len(durations) - 1, int(p / 100 * len(durations)))]
+        return {"count": len(durations), "p50": pick(50), "p90": pick(90), "max": durations[-1]}
+
+    def churn_by_hour(self, term=None, since=None):
+        """{hour 0-23 (local time): transitions seen in that hour}, busiest hours being where polling pays off."""
+        where, params = ["kind IN (?, ?)"], [OPENED, CLOSED]
+        if term is not None:
+            where.append("term = ?")
+            params.append(term)
+        if since is not None:
+            where.append("at >= ?")
+            params.append(since)
+        rows = self._select(
+            "SELECT CAST(strftime('%H', at, 'unixepoch', 'localtime') AS INTEGER), COUNT(*)"
+            " FROM transitions WHERE " + " AND ".join(where) + " GROUP BY 1",
+            params
+        )
+        return {**{hour: 0 for hour in range(24)}, **dict(rows)}
+
+
+class SeatRow:
+    """Just enough of a section_catalog.Section for PollScheduler.observe."""
+    __slots__ = ("open", "seats")
+
+    def __init__(self, open, seats):
+        self.open  = open
+        self.seats = seats
+
+
+def replay(events, scheduler=None, subscribers=(), until=None, on_time=None):
+    """Feed stored SeatEvents back through the pipeline in timestamp order.
+
+    Each event is given to ``scheduler.observe`` (at the event's own time)
+    and then to every subscriber. ``on_time(at)`` is called before each
+    event so a caller can advance a simulated clock to it.
+    """
+    for event in events:
+        if until is not None and event.at >= until:
+            break
+        if on_time:
+            on_time(event.at)
+        if scheduler is not None:
+            section = None if event.kind == VANISHED else SeatRow(event.open, event.seats)
+            scheduler.observe(event.term, event.crn, section, now=event.at)
+        for callback in subscribers:
+            callback(event)
+
+
+# ───── command line ─────
+def _when(at):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(at))
+
+
+def _duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query the seat history recorded by the watch loop.")
+    ap.add_argument("--db", help="history database (default: the one next to config.json)")
+    sub = ap.add_subparsers(dest="command", required=True)
+    opens = sub.add_parser("opens", help="when a CRN opened")
+    opens.add_argument("crn")
+    opens.add_argument("--days", type=float, default=7)
+    durations = sub.add_parser("durations", help="how long sections stayed open")
+    durations.add_argument("--crn")
+    durations.add_argument("--days", type=float, default=30)
+    hours = sub.add_parser("hours", help="openings and closings per hour of day")
+    hours.add_argument("--days", type=float, default=30)
+    for p in (opens, durations, hours):
+        p.add_argument("--term", help="term code")
+    args = ap.parse_args(argv)
+
+    if args.db is None:
+        import scheduler_bot
+        args.db = scheduler_bot.HISTORY_PATH
+    history = SeatHistory(args.db, retention_days=0)
+    try:
+        if args.command == "opens":
+            spans = history.open_spans(args.term, args.crn, history.clock() - args.days * DAY)
+            for s in spans:
+                print(f"{_when(s.opened_at)}  open for {_duration(s.closed_at - s.opened_at) if s.closed_at else 'now'}")
+            print(f"{len(spans)} openings of CRN {args.crn} in the last {args.days:g} days")
+        elif args.command == "durations":
+            stats = history.open_durations(args.term, args.crn, history.clock() - args.days * DAY)
+            print(f"{stats['count']} open spans: p50 {_duration(stats['p50'])}, "
+                  f"p90 {_duration(stats['p90'])}, longest {_duration(stats['max'])}")
+        else:
+            churn = history.churn_by_hour(args.term, history.clock() - args.days * DAY)
+            peak  = max(churn.values()) or 1
+            for hour, count in sorted(churn.items()):
+                print(f"{hour:02d}:00 {count:>6} {'█' * round(40 * count / peak)}")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
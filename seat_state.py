@@ -0,0 +1,112 @@
+# seat_state.py
+"""Per-CRN seat snapshots and edge-triggered change events.
+
+``SeatTracker.update`` compares one poll of a CRN against the last one and
+returns (and publishes to subscribers) only what changed: a section opening,
+filling up, its seat count moving, or dropping out of the catalog. A CRN
+that just reported a change is held down for ``debounce`` seconds, so a
+section flapping open and shut produces one event per window instead of a
+burst; whatever state it settles in is reported once the window is over.
+Sections are read off ``section_catalog.Section`` rows.
+"""
+import time
+from collections import namedtuple
+
+from log_pipeline import log, ERROR
+
+DEBOUNCE = 30.0    # seconds between two reports for the same CRN
+
+OPENED        = "opened"      # full → open (or first seen open)
+CLOSED        = "closed"      # open → full
+SEATS_CHANGED = "seats"       # still open/full, but the seat count moved
+VANISHED      = "vanished"    # no longer in the catalog
+
+# seats/prev_seats are None when the record carries no seat count
+SeatEvent = namedtuple("SeatEvent", ["kind", "term", "crn", "title", "open", "seats", "prev_seats", "at"])
+
+
+class _Snapshot:
+    __slots__ = ("open", "seats", "title", "reported_at")
+
+    def __init__(self, open, seats, title, reported_at):
+        self.open        = open
+        self.seats       = seats
+        self.title       = title
+        self.reported_at = reported_at
+
+
+class SeatTracker:
+    """Remember the last reported state of every (term, CRN) and emit SeatEvents on transitions."""
+
+    def __init__(self, debounce=DEBOUNCE, clock=time.monotonic):
+        self.debounce     = debounce
+        self.clock        = clock
+        self._snaps       = {}    # (term, crn) → _Snapshot of what was last reported
+        self._subscribers = []    # (callback, kinds or None)
+
+    # ───── subscribers ─────
+    def subscribe(self, callback, kinds=None):
+        """Call ``callback(event)`` for every event (or only those whose kind is in ``kinds``)."""
+        self._subscribers.append((callback, frozenset(kinds) if kinds else None))
+        return callback
+
+    def publish(self, event):
+        for callback, kinds in list(self._subscribers):
+            if kinds is not None and event.kind not in kinds:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                log(ERROR, f"[SeatTracker] subscriber {callback!r} failed on {event.kind} {event.crn}: {e}")
+
+    # ───── state ─────
+    def get(self, term, crn):
+        """Last reported (open, seats, title) of a CRN, None if it isn't tracked."""
+        snap = self._snaps.get((term, str(crn)))
+        return (snap.open, snap.seats, snap.title) if snap else None
+
+    def forget(self, term, crn=None):
+        """Stop tracking one CRN (or a whole term) without emitting anything."""
+        for key in [k for k in self._snaps if k[0] == term and (crn is None or k[1] == str(crn))]:
+            del self._snaps[key]
+
+    def update(self, term, crn, section, now=None):
+        """Feed one poll of ``crn``; ``section`` is its catalog row, or None if it wasn't returned.
+
+        Returns the events emitted for it (at most one).
+        """
+        now  = self.clock() if now is None else now
+        key  = (term, str(crn))
+        snap = self._snaps.get(key)
+
+        if section is None:
+            if snap is None:
+                return []
+            del self._snaps[key]
+            event = SeatEvent(VANISHED, term, key[1], snap.title, False, None, snap.seats, now)
+        else:
+            is_open, seats, title = section.open, section.seats, section.label
+            if snap is None:
+                # first sighting: a baseline, only worth reporting if it is already open
+                self._snaps[key] = _Snapshot(is_open, seats, title, now if is_open else float("-inf"))
+                if not is_open:
+                    return []
+                event = SeatEvent(OPENED, term, key[1], title, True, seats, None, now)
+            else:
+                snap.title = title
+                if is_open != snap.open:
+                    kind = OPENED if is_open else CLOSED
+                elif seats is not None and snap.seats is not None and seats != snap.seats:
+                    kind = SEATS_CHANGED
+                else:
+                    if snap.seats is None:
+                        snap.seats = seats
+                    return []
+                if now - snap.reported_at < self.debounce:
+                    # held down; the snapshot keeps the old state so the change is picked up later
+                    return []
+                event = SeatEvent(kind, term, key[1], title, is_open, seats, snap.seats, now)
+                snap.open, snap.seats, snap.reported_at = is_open, seats, now
+
+        self.publish(event)
+        return [event]
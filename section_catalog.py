@@ -0,0 +1,194 @@
+# section_catalog.py
+"""Compact in-memory catalog of one term's course sections.
+
+Records are slotted ``Section`` objects with interned subject/course/title
+strings, indexed by CRN, by subject and by (subject, course). A refresh from
+a new course-sections response only rewrites rows whose fields changed, so
+the watch loop and the config GUI can share one catalog per term and read
+it without rebuilding anything. Updates (and the lookups that walk an
+index) hold the catalog's lock, since the GUI's term pull, its CRN lookups
+and the watch loop each write from their own thread.
+"""
+import sys
+import threading
+import time
+
+SEATS_FIELD = "STUSEAT_SEATS_AVAIL"      # seat count, when howdy includes it
+
+
+class Section:
+    __slots__ = ("crn", "subject", "course", "section", "title", "open", "seats")
+
+    def __init__(self, crn, subject, course, section, title, open, seats):
+        self.crn     = crn
+        self.subject = subject
+        self.course  = course
+        self.section = section
+        self.title   = title
+        self.open    = open
+        self.seats   = seats
+
+    @property
+    def label(self):
+        return f"{self.subject} {self.course} – {self.title}"
+
+    def fields(self):
+        return (self.subject, self.course, self.section, self.title, self.open, self.seats)
+
+    def __repr__(self):
+        return f"Section({self.crn} {self.label}, open={self.open}, seats={self.seats})"
+
+
+def _intern(value):
+    return sys.intern(str(value)) if value is not None else ""
+
+
+def record_fields(record):
+    """(crn, subject, course, section, title, open, seats) of one course-sections record."""
+    seats = record.get(SEATS_FIELD)
+    try:
+        seats = int(seats) if seats is not None else None
+    except (TypeError, ValueError):
+        seats = None
+    crn = record.get("SWV_CLASS_SEARCH_CRN")
+    return (
+        str(crn) if crn is not None else None,
+        _intern(record.get("SWV_CLASS_SEARCH_SUBJECT")),
+        _intern(record.get("SWV_CLASS_SEARCH_COURSE")),
+        _intern(record.get("SWV_CLASS_SEARCH_SECTION")),
+        _intern(record.get("SWV_CLASS_SEARCH_TITLE")),
+        record.get("STUSEAT_OPEN") == "Y",
+        seats
+    )
+
+
+class SectionCatalog:
+    """One term's sections with CRN, subject and course indexes."""
+
+    def __init__(self, term):
+        self.term       = term
+        self.complete   = False    # True once filled from a full term pull
+        self.updated_at = None     # time.time() of the last refresh
+        self._by_crn     = {}      # crn → Section
+        self._by_subject = {}      # subject → {crn}
+        self._by_course  = {}      # (subject, course) → {crn}
+        self._lock       = threading.Lock()    # held by every update; lookups copy under it too
+
+    def __len__(self):
+        return len(self._by_crn)
+
+    def __contains__(self, crn):
+        return str(crn) in self._by_crn
+
+    # ───── lookups ─────
+    def get(self, crn):
+        return self._by_crn.get(str(crn))
+
+    def by_subject(self, subject):
+        with self._lock:
+            return [self._by_crn[c] for c in sorted(self._by_subject.get(subject.upper(), ()))]
+
+    def by_course(self, subject, course):
+        with self._lock:
+            return [self._by_crn[c] for c in sorted(self._by_course.get((subject.upper(), str(course)), ()))]
+
+    def subjects(self):
+        with self._lock:
+            return sorted(self._by_subject)
+
+    # ───── updates ─────
+    def refresh(self, records, complete=True):
+        """Apply a course-sections response and return the CRNs whose rows changed.
+
+        With ``complete`` the response is taken as the whole term, so rows
+        missing from it are dropped; otherwise it only upserts what it has.
+        """
+        parsed  = [record_fields(record) for record in records]    # outside the lock, it's the slow part
+        changed = []
+        seen    = set()
+        with self._lock:
+            for crn, *fields in parsed:
+                if crn is None:
+                    continue
+                seen.add(crn)
+                row = self._by_crn.get(crn)
+                if row is None:
+                    self._add(Section(crn, *fields))
+                elif row.fields() != tuple(fields):
+                    self._rewrite(row, fields)
+                else:
+                    continue
+                changed.append(crn)
+            if complete:
+                for crn in [c for c in self._by_crn if c not in seen]:
+                    self._discard(crn)
+                    changed.append(crn)
+                self.complete = True
+            self.updated_at = time.time()
+        return changed
+
+    def upsert(self, records):
+        return self.refresh(records, complete=False)
+
+    def rows(self):
+        """Every section as a plain (crn, subject, course, section, title, open, seats) list."""
+        with self._lock:
+            return [[row.crn, *row.fields()] for row in self._by_crn.values()]
+
+    def restore(self, rows, updated_at):
+        """Load ``rows()`` saved from a complete catalog, unless this one already has data."""
+        sections = [Section(str(crn), *(_intern(f) for f in fields[:4]), bool(fields[4]), fields[5])
+                    for crn, *fields in rows]
+        with self._lock:
+            if self._by_crn:
+                return
+            for section in sections:
+                self._add(section)
+            self.complete   = True
+            self.updated_at = updated_at
+
+    def discard(self, crn):
+        with self._lock:
+            return self._discard(crn)
+
+    def _discard(self, crn):
+        row = self._by_crn.pop(str(crn), None)
+        if row is not None:
+            self._unindex(row)
+        return row
+
+    def _add(self, row):
+        self._by_crn[row.crn] = row
+        self._by_subject.setdefault(row.subject, set()).add(row.crn)
+        self._by_course.setdefault((row.subject, row.course), set()).add(row.crn)
+
+    def _unindex(self, row):
+        for index, key in ((self._by_subject, row.subject), (self._by_course, (row.subject, row.course))):
+            crns = index.get(key)
+            if crns is not None:
+                crns.discard(row.crn)
+                if not crns:
+                    del index[key]
+
+    def _rewrite(self, row, fields):
+        subject, course = fields[0], fields[1]
+        if (subject, course) != (row.subject, row.course):
+            self._unindex(row)
+            row.subject, row.course = subject, course
+            self._by_subject.setdefault(subject, set()).add(row.crn)
+            self._by_course.setdefault((subject, course), set()).add(row.crn)
+        row.section, row.title, row.open, row.seats = fields[2:]
+
+
+# ───── shared per-term catalogs ─────
+_catalogs = {}
+_lock     = threading.Lock()
+
+
+def catalog_for(term):
+    """The process-wide catalog of ``term``, created empty on first use."""
+    with _lock:
+        catalog = _catalogs.get(term)
+        if catalog is None:
+            catalog = _catalogs[term] = SectionCatalog(term)
+        return catalog
@@ -0,0 +1,144 @@
+# section_parser.py
+"""Incremental scanner for /api/course-sections bodies.
+
+The body is a JSON array of flat section objects (optionally wrapped as
+``{"courseSections": [...]}``); nested data such as meeting times arrives
+as JSON encoded *strings*. Instead of decoding the whole body, the scanner
+finds the ``SWV_CLASS_SEARCH_CRN`` keys with a regex, cuts the surrounding
+record out as raw bytes and only hands the records we care about to
+the JSON decoder (see json_decode).
+"""
+import itertools
+import json
+import re
+
+from json_decode import decode_record
+
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD = 64 * 1024    # how far back from its CRN key a record may start
+
+_groups = itertools.count(1)
+
+
+def _run(chars):
+    """``chars+`` that never gives characters back, like ``chars++`` (which needs Python 3.11)."""
+    group = next(_groups)
+    return b"(?=(%s+))\\%d" % (chars, group)
+
+
+def _string():
+    return rb'"(?:' + _run(rb'[^"\\]') + rb'|\\.)*"'
+
+
+# a section object, allowing one level of nested objects/arrays in its values; every
+# alternative starts with a different character, so a failed match can't backtrack badly
+RECORD_RE = re.compile(rb'\{(?:' + _run(rb'[^{}"]') + rb'|' + _string()
+                       + rb'|\{(?:' + _run(rb'[^{}"]') + rb'|' + _string() + rb')*\})*\}')
+CRN_KEY   = b'"SWV_CLASS_SEARCH_CRN"'
+CRN_RE    = re.compile(CRN_KEY + rb'\s*:\s*"?(\d+)')
+OPEN_RE   = re.compile(rb'\{\s*"(?:[^"\\]|\\.)*"\s*:')    # '{' opening an object: a key and its colon follow
+_decoder  = json.JSONDecoder()
+
+
+def _watched_re(crns):
+    alts = b"|".join(re.escape(c) for c in sorted(crns))
+    return re.compile(CRN_KEY + rb'\s*:\s*"?(' + alts + rb')(?!\d)')
+
+
+def _record_end(buf, start):
+    """End offset of the object at ``start``, None while it is still incomplete."""
+    m = RECORD_RE.match(buf, start)
+    if m:
+        return m.end()
+    # more deeply nested than RECORD_RE handles (or cut off): let json find the end
+    try:
+        text = buf[start:].decode("utf-8")
+        _, end = _decoder.raw_decode(text)
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return start + len(text[:end].encode("utf-8"))
+
+
+def _record_start(buf, key_pos, floor):
+    """Offset of the '{' opening the record whose CRN key sits at ``key_pos``."""
+    start = buf.rfind(b"{", floor, key_pos)
+    # a '{' inside a JSON encoded string is followed by \" rather than ", and one at the end of a
+    # string value is followed by its closing quote and a comma or '}', never by a key and ':'
+    while start >= 0 and not OPEN_RE.match(buf, start):
+        start = buf.rfind(b"{", floor, start)
+    return start
+
+
+def iter_record_slices(chunks, crns=None):
+    """Yield ``(crn, raw_record_bytes)`` from an iterable of body chunks.
+
+    With ``crns`` given, only those records are cut out and the scan stops as
+    soon as all of them have been seen; everything else is never copied.
+    """
+    wanted = {str(c).encode() for c in crns} if crns is not None else None
+    if wanted is not None and not wanted:
+        return
+    key_re  = CRN_RE if wanted is None else _watched_re(wanted)
+    buf     = bytearray()
+    scan    = 0        # where the next key search starts
+    pending = None     # (crn, start) of the last record seen when yielding everything
+    chunks  = iter(chunks)
+    eof     = False
+    while not eof:
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+        else:
+            buf += chunk
+
+        waiting = False
+        for m in key_re.finditer(buf, scan):
+            if m.end() >= len(buf) and not eof:
+                waiting = True    # the CRN digits may continue in the next chunk
+                break
+            floor = max(0, m.start() - MAX_RECORD)
+            start = _record_start(buf, m.start(), floor)
+            if wanted is None:
+                scan = m.end()
+                if start < 0:
+                    continue
+                if pending:
+                    crn, prev = pending
+                    yield crn.decode(), bytes(buf[prev:buf.rfind(b"}", prev, start) + 1])
+                pending = (m.group(1), start)
+                continue
+
+            end = _record_end(buf, start) if start >= 0 else None
+            if end is None and not eof:
+                waiting = True
+                break
+            scan = m.end()
+            if end is None:
+                continue
+            yield m.group(1).decode(), bytes(buf[start:end])
+            wanted.discard(m.group(1))
+            if not wanted:
+                return
+        m = None
+        if not waiting:
+            # a key may be split across chunks, re-scan its possible prefix next time
+            scan = max(scan, len(buf) - len(CRN_KEY) - 8)
+
+        cut = scan - MAX_RECORD if pending is None else min(scan - MAX_RECORD, pending[1])
+        if cut > CHUNK_SIZE:
+            del buf[:cut]
+            scan -= cut
+            if pending:
+                pending = (pending[0], pending[1] - cut)
+
+    if pending:
+        crn, start = pending
+        end = _record_end(buf, start)
+        if end is not None:
+            yield crn.decode(), bytes(buf[start:end])
+
+
+def iter_watched_sections(chunks, crns):
+    """Decode and yield only the section dicts whose CRN is in ``crns``."""
+    for _, raw in iter_record_slices(chunks, crns):
+        yield decode_record(raw)
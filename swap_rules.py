@@ -0,0 +1,226 @@
+# swap_rules.py
+"""Prioritized swap rules, tried side by side over one SwapSession.
+
+A rule drops at most one CRN for the first of several alternatives that
+goes through ("drop 11111 for any of 22222, 33333"), or just adds one of
+them when ``drop`` is empty. In config.json:
+
+    "swap_rules": [
+        {"drop": "11111", "add": ["22222", "33333"]},
+        {"add": ["44444"]}
+    ]
+
+Without ``swap_rules`` the old ``swap_from``/``swap_to`` pair is one rule,
+and ``swap_to`` may list several alternatives separated by commas.
+
+Every (drop, add) pair of a rule is a Candidate. A SwapPlan hands out
+candidates to the per-rule senders, never two at once that touch the same
+CRN, so attempts of different rules are pipelined on the socket while
+conflicting ones wait their turn. When a candidate succeeds, every other
+candidate that can no longer make sense is cancelled: the rest of its own
+rule, any that would drop the CRN just dropped, and any that would add the
+CRN just added. A conflict or invalid-CRN reply retires only that
+candidate.
+"""
+from registration import SUCCESS
+from log_pipeline import log, WARNING
+
+ACTIVE    = "active"
+DONE      = "done"          # went through
+FAILED    = "failed"        # the server said it never will (conflict, invalid)
+CANCELLED = "cancelled"     # made moot by another candidate succeeding
+
+
+class Candidate:
+    __slots__ = ("rule", "drop", "add", "state", "attempts", "outcome")
+
+    def __init__(self, rule, drop, add):
+        self.rule     = rule
+        self.drop     = drop
+        self.add      = add
+        self.state    = ACTIVE
+        self.attempts = 0
+        self.outcome  = None
+
+    @property
+    def active(self):
+        return self.state == ACTIVE
+
+    @property
+    def label(self):
+        return f"{self.drop} → {self.add}" if self.drop else f"add {self.add}"
+
+    def __repr__(self):
+        return f"Candidate({self.label}, {self.state})"
+
+
+class SwapRule:
+    """Drop ``drop`` (or nothing) for the first of ``adds`` that works; ``priority`` 0 is the most wanted."""
+
+    def __init__(self, drop, adds, priority, interval):
+        self.drop       = str(drop or "").strip()
+        self.priority   = priority
+        self.interval   = interval
+        self.delay      = interval    # seconds until this rule's next attempt; grows while throttled
+        self.candidates = [Candidate(self, self.drop, str(a).strip()) for a in adds if str(a).strip()]
+        self._turn      = 0
+
+    @property
+    def active(self):
+        return any(c.active for c in self.candidates)
+
+    @property
+    def label(self):
+        adds = " | ".join(c.add for c in self.candidates)
+        return f"#{self.priority + 1} {self.drop + ' → ' if self.drop else 'add '}{adds}"
+
+    def slow_down(self, ceiling):
+        self.delay = min(ceiling, self.delay * 2)
+
+    def reset_pace(self):
+        self.delay = self.interval
+
+
+def parse_rules(cfg, interval):
+    """SwapRules from ``swap_rules`` in a config dict, else from ``swap_from``/``swap_to``."""
+    specs = cfg.get("swap_rules") or []
+    if not specs and cfg.get("swap_to"):
+        specs = [{"drop": cfg.get("swap_from", ""), "add": str(cfg["swap_to"]).split(",")}]
+    rules = []
+    for spec in specs:
+        adds = spec.get("add", [])
+        rule = SwapRule(spec.get("drop", ""), [adds] if isinstance(adds, (str, int)) else adds, len(rules), interval)
+        if rule.candidates:
+            rules.append(rule)
+        else:
+            log(WARNING, f"[swap_rules] Ignoring a rule with nothing to add: {spec!r}")
+    return rules
+
+
+class SwapPlan:
+    """Which candidates are still worth sending, and which CRNs have an attempt in flight."""
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda r: r.priority)
+        self._busy = set()    # CRNs (drop or add) of attempts awaiting their ack
+
+    @property
+    def finished(self):
+        return not any(rule.active for rule in self.rules)
+
+    @property
+    def candidates(self):
+        return [c for rule in self.rules for c in rule.candidates]
+
+    def watched(self):
+        """CRNs worth watching for seats: the adds of every active candidate."""
+        return list(dict.fromkeys(c.add for c in self.candidates if c.active))
+
+    def rules_adding(self, crn):
+        return [rule for rule in self.rules if any(c.active and c.add == crn for c in rule.candidates)]
+
+    def update(self, rules):
+        """Switch to a new rule list (after a config edit); returns (added, removed) rules.
+
+        A rule that is still there, same drop and same adds, keeps its
+        progress and pace and only takes its new priority. The candidates of
+        removed rules are cancelled, which stops their senders.
+        """
+        def shape(rule):
+            return rule.drop, tuple(c.add for c in rule.candidates)
+        kept, added, merged = {shape(r): r for r in self.rules}, [], []
+        for rule in rules:
+            old = kept.pop(shape(rule), None)
+            if old is None:
+                added.append(rule)
+                merged.append(rule)
+            else:
+                old.priority = rule.priority
+                merged.append(old)
+        for rule in kept.values():
+            for c in rule.candidates:
+                if c.active:
+                    c.state = CANCELLED
+        self.rules = sorted(merged, key=lambda r: r.priority)
+        return added, list(kept.values())
+
+    # ───── handing out attempts ─────
+    def claim(self, rule, is_open=None):
+        """The candidate ``rule`` should send next, marked in flight; None if there is none right now.
+
+        With ``is_open(crn)`` only candidates whose add is open qualify, best
+        first; without it the rule's candidates take turns.
+        """
+        active = [c for c in rule.candidates if c.active and not self._conflicts(c)]
+        if is_open is not None:
+            active = [c for c in active if is_open(c.add)]
+        elif active:
+            start = rule._turn % len(active)
+            rule._turn += 1
+            active = active[start:] + active[:start]
+        if not active:
+            return None
+        candidate = active[0]
+        self._busy.update(self._crns(candidate))
+        candidate.attempts += 1
+        return candidate
+
+    def opening_set(self):
+        """The best candidate of each rule that shares no CRN with a better one (for a window burst)."""
+        chosen, used = [], set()
+        for rule in self.rules:
+            for c in rule.candidates:
+                if c.active and not (self._crns(c) & used):
+                    chosen.append(c)
+                    used |= self._crns(c)
+                    break
+        return chosen
+
+    def claim_all(self, candidates):
+        for c in candidates:
+            self._busy.update(self._crns(c))
+            c.attempts += 1
+
+    def release(self, candidate):
+        self._busy.difference_update(self._crns(candidate))
+
+    # ───── outcomes ─────
+    def settle(self, candidate, outcome):
+        """Record a final outcome for ``candidate``; returns the candidates cancelled because of it."""
+        if not candidate.active:
+            return []
+        candidate.outcome = outcome
+        if outcome != SUCCESS:
+            candidate.state = FAILED
+            return []
+        candidate.state = DONE
+        cancelled = []
+        for other in self.candidates:
+            if not other.active:
+                continue
+            if (other.rule is candidate.rule
+                    or (candidate.drop and other.drop == candidate.drop)
+                    or other.add == candidate.add):
+                other.state = CANCELLED
+                cancelled.append(other)
+        return cancelled
+
+    def summary(self):
+        parts = []
+        for rule in self.rules:
+            done = [c for c in rule.candidates if c.state == DONE]
+            if done:
+                parts.append(f"{rule.label}: {done[0].label} done")
+            elif rule.active:
+                parts.append(f"{rule.label}: still trying")
+            else:
+                parts.append(f"{rule.label}: " + ", ".join(f"{c.add} {c.outcome or c.state}" for c in rule.candidates))
+        return "; ".join(parts)
+
+    # ───── helpers ─────
+    @staticmethod
+    def _crns(candidate):
+        return {candidate.drop, candidate.add} - {""}
+
+    def _conflicts(self, candidate):
+        return bool(self._crns(candidate) & self._busy)
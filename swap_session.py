@@ -0,0 +1,337 @@
+# swap_session.py
+"""Long-lived socket.io (Engine.IO v3) session to College Scheduler for swap mode.
+
+One SwapSession owns one websocket at a time: it completes the Engine.IO
+handshake, answers and sends pings, authorizes once per connection (and
+again only when the token changes), and reconnects with backoff when the
+socket drops or stops answering pings. Callers just ``emit`` events, so a
+swap attempt costs one frame.
+
+Access tokens come from a TokenCache, which runs the blocking fetch (it may
+start a browser to refresh the cookie) on a worker thread and refreshes in
+the background before the token expires.
+"""
+import asyncio
+import base64
+import itertools
+import json
+import random
+import time
+
+import metrics
+from log_pipeline import log, WARNING, ERROR
+
+TOKEN_TTL         = 1800    # seconds, when neither the response nor the JWT says
+REFRESH_AT        = 0.8     # refresh once this fraction of the lifetime has passed
+PING_INTERVAL     = 25.0    # Engine.IO defaults, replaced by the server's handshake
+PING_TIMEOUT      = 20.0
+RECONNECT_MIN     = 1.0
+RECONNECT_MAX     = 60.0
+HANDSHAKE_TIMEOUT = 10.0
+
+# Engine.IO packet types
+EIO_OPEN, EIO_CLOSE, EIO_PING, EIO_PONG, EIO_MESSAGE = "0", "1", "2", "3", "4"
+# socket.io packet types, inside an Engine.IO message
+SIO_CONNECT, SIO_DISCONNECT, SIO_EVENT, SIO_ACK, SIO_ERROR = "0", "1", "2", "3", "4"
+
+
+def jwt_expiry(token):
+    """The ``exp`` claim of a JWT, None if ``token`` isn't one."""
+    try:
+        part = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def encode_event(event, data, ack_id=None):
+    return f"{EIO_MESSAGE}{SIO_EVENT}{'' if ack_id is None else ack_id}{json.dumps([event, data], separators=(',', ':'))}"
+
+
+def parse_packet(frame):
+    """Split a text frame into (eio_type, sio_type, ack_id, payload); the last three may be None."""
+    if not frame:
+        return None, None, None, None
+    eio = frame[0]
+    if eio != EIO_MESSAGE or len(frame) < 2:
+        return eio, None, None, frame[1:]
+    sio, rest = frame[1], frame[2:]
+    i = 0
+    while i < len(rest) and rest[i].isdigit():
+        i += 1
+    ack_id = int(rest[:i]) if i else None
+    try:
+        payload = json.loads(rest[i:]) if rest[i:] else None
+    except ValueError:
+        payload = rest[i:]
+    return eio, sio, ack_id, payload
+
+
+class TokenCache:
+    """Access token with its expiry; ``fetch()`` is blocking and returns (token, expires_in or None)."""
+
+    def __init__(self, fetch, ttl=TOKEN_TTL, refresh_at=REFRESH_AT, clock=time.time):
+        self.fetch      = fetch
+        self.ttl        = ttl
+        self.refresh_at = refresh_at
+        self.clock      = clock
+        self.token      = None
+        self.fetched_at = None
+        self.expires_at = None
+        self._inflight  = None
+
+    @property
+    def valid(self):
+        return self.token is not None and self.clock() < self.expires_at
+
+    def due_at(self):
+        """When the background refresh should run."""
+        return self.fetched_at + (self.expires_at - self.fetched_at) * self.refresh_at
+
+    async def get(self):
+        if not self.valid:
+            await self.refresh()
+        return self.token
+
+    async def refresh(self):
+        """Fetch a new token off the event loop; concurrent callers share one fetch."""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+        inflight = self._inflight
+        try:
+            return await asyncio.shield(inflight)
+        finally:
+            if inflight.done() and self._inflight is inflight:
+                self._inflight = None
+
+    async def _fetch(self):
+        loop = asyncio.get_running_loop()
+        with metrics.timed("token_refresh_seconds"):
+            token, expires_in = await loop.run_in_executor(None, self.fetch)
+        metrics.inc("token_refreshes_total")
+        now = self.clock()
+        expires_at = now + float(expires_in) if expires_in else jwt_expiry(token)
+        if expires_at is None or expires_at <= now:
+            expires_at = now + self.ttl
+        self.token, self.fetched_at, self.expires_at = token, now, expires_at
+        return token
+
+    async def keep_fresh(self, on_token=None):
+        """Refresh ahead of expiry forever, calling ``on_token(token)`` after each refresh."""
+        while True:
+            if self.token is None:
+                delay = 0
+            else:
+                delay = max(0.0, self.due_at() - self.clock())
+            await asyncio.sleep(delay)
+            try:
+                token = await self.refresh()
+            except Exception as e:
+                log(ERROR, f"[TokenCache] refresh failed: {e}")
+                await asyncio.sleep(RECONNECT_MIN * 5)
+                continue
+            if on_token:
+                await on_token(token)
+
+
+class SwapSession:
+    """Keep one authorized socket.io connection to ``url`` open until close()."""
+
+    def __init__(self, url, tokens, on_event=None, connect=None):
+        self.url           = url
+        self.tokens        = tokens
+        self.on_event      = on_event        # on_event(name, data) for server-sent events
+        self.connect       = connect         # websockets.connect unless given; imported on first run()
+        self.ws            = None
+        self.connects      = 0
+        self.auth_sent     = 0
+        self.frames_sent   = 0
+        self.unmatched     = 0               # acks nobody was waiting for (late or unknown ids)
+        self.ping_interval = PING_INTERVAL
+        self.ping_timeout  = PING_TIMEOUT
+        self._ready        = asyncio.Event()
+        self._closed       = False
+        self._ack_ids      = itertools.count(1)
+        self._acks         = {}              # ack id → Future resolved with the ack payload
+        self._unsent       = {}              # prepared frame → its ack id, until send_frame sends it
+        self._authed       = None            # token this connection is authorized with
+        self._last_pong    = 0.0
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    async def wait_ready(self, timeout=None):
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    # ───── lifecycle ─────
+    async def run(self):
+        """Connect, and reconnect with backoff, until close() is called."""
+        if self.connect is None:
+            import websockets
+            self.connect = websockets.connect
+        refresher = asyncio.ensure_future(self.tokens.keep_fresh(self._reauthorize))
+        backoff   = RECONNECT_MIN
+        try:
+            while not self._closed:
+                try:
+                    async with self.connect(self.url) as ws:
+                        self.ws = ws
+                        self.connects += 1
+                        await self._handshake(ws)
+                        await self._authorize(await self.tokens.get())
+                        self._ready.set()
+                        backoff = RECONNECT_MIN
+                        await self._serve(ws)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log(WARNING, f"[SwapSession] connection lost: {e!r}")
+                finally:
+                    self._disconnected()
+                if not self._closed:
+                    await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+                    backoff = min(RECONNECT_MAX, backoff * 2)
+        finally:
+            refresher.cancel()
+
+    async def close(self):
+        self._closed = True
+        if self.ws is not None:
+            await self.ws.close()
+
+    def _disconnected(self):
+        self.ws      = None
+        self._authed = None
+        self._ready.clear()
+        # prepared frames haven't been sent yet, so their acks can still come on the next connection
+        unsent = set(self._unsent.values())
+        for ack_id, fut in list(self._acks.items()):
+            if ack_id in unsent:
+                continue
+            if not fut.done():
+                fut.set_exception(ConnectionError("socket closed before the ack arrived"))
+            del self._acks[ack_id]
+
+    # ───── protocol ─────
+    async def _handshake(self, ws):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + HANDSHAKE_TIMEOUT
+        opened = connected = False
+        while not (opened and connected):
+            frame = await asyncio.wait_for(ws.recv(), max(0.0, deadline - loop.time()))
+            eio, sio, _, payload = parse_packet(frame)
+            if eio == EIO_OPEN:
+                info = json.loads(payload or "{}")
+                self.ping_interval = info.get("pingInterval", self.ping_interval * 1000) / 1000
+                self.ping_timeout  = info.get("pingTimeout",  self.ping_timeout * 1000) / 1000
+                opened = True
+            elif eio == EIO_MESSAGE and sio == SIO_CONNECT:
+                connected = True
+            elif eio == EIO_PING:
+                await ws.send(EIO_PONG)
+        self._last_pong = loop.time()
+
+    async def _authorize(self, token):
+        if token == self._authed or self.ws is None:
+            return
+        await self._send(encode_event("authorize", {"token": token}))
+        self._authed = token
+        self.auth_sent += 1
+
+    async def _reauthorize(self, token):
+        if self.ready:
+            await self._authorize(token)
+
+    async def reauthorize(self):
+        """Fetch a fresh token and authorize the live connection with it (after an auth rejection)."""
+        token = await self.tokens.refresh()
+        self._authed = None    # the server rejected us, re-send even if the token came back the same
+        await self._reauthorize(token)
+
+    async def _serve(self, ws):
+        pinger = asyncio.ensure_future(self._ping(ws))
+        try:
+            async for frame in ws:
+                self._dispatch(ws, frame)
+        finally:
+            pinger.cancel()
+
+    def _dispatch(self, ws, frame):
+        eio, sio, ack_id, payload = parse_packet(frame)
+        if eio == EIO_PING:
+            asyncio.ensure_future(ws.send(EIO_PONG))
+        elif eio == EIO_PONG:
+            self._last_pong = asyncio.get_running_loop().time()
+        elif eio == EIO_CLOSE or (eio == EIO_MESSAGE and sio == SIO_DISCONNECT):
+            asyncio.ensure_future(ws.close())
+        elif eio == EIO_MESSAGE and sio == SIO_ACK:
+            fut = self._acks.pop(ack_id, None)
+            if fut and not fut.done():
+                fut.set_result(payload)
+            else:
+                self.unmatched += 1
+        elif eio == EIO_MESSAGE and sio in (SIO_EVENT, SIO_ERROR) and self.on_event:
+            if sio == SIO_EVENT and isinstance(payload, list) and payload:
+                self.on_event(payload[0], payload[1] if len(payload) > 1 else None)
+            else:
+                self.on_event("error", payload)
+
+    async def _ping(self, ws):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            if loop.time() - self._last_pong > self.ping_interval + self.ping_timeout:
+                log(WARNING, "[SwapSession] no pong from server, reconnecting")
+                await ws.close()
+                return
+            await ws.send(EIO_PING)
+
+    async def _send(self, frame):
+        await self.ws.send(frame)
+        self.frames_sent += 1
+        metrics.inc("swap_frames_sent_total")
+
+    async def emit(self, event, data, ack=False):
+        """Send one event on the live connection; with ``ack`` return a Future for the server's ack."""
+        if not self.ready:
+            raise ConnectionError("swap session is not connected")
+        fut = None
+        ack_id = None
+        if ack:
+            ack_id = next(self._ack_ids)
+            fut = self._acks[ack_id] = asyncio.get_running_loop().create_future()
+        await self._send(encode_event(event, data, ack_id))
+        return fut
+
+    def prepare(self, event, data):
+        """Encode an event with a fresh ack id ahead of time; returns (frame, ack Future) for send_frame.
+
+        The Future survives reconnects until the frame is sent, so frames can
+        be prepared long before they go out.
+        """
+        ack_id = next(self._ack_ids)
+        fut = self._acks[ack_id] = asyncio.get_running_loop().create_future()
+        frame = encode_event(event, data, ack_id)
+        self._unsent[frame] = ack_id
+        return frame, fut
+
+    async def send_frame(self, frame):
+        if not self.ready:
+            raise ConnectionError("swap session is not connected")
+        try:
+            await self._send(frame)
+        except ConnectionError:
+            raise
+        except Exception as e:    # the websocket closed under us (websockets.ConnectionClosed)
+            raise ConnectionError(f"swap session lost while sending: {e!r}") from e
+        self._unsent.pop(frame, None)
+
+    def drop_ack(self, fut):
+        """Stop waiting for an ack (e.g. after a timeout); a late reply then counts as unmatched."""
+        for ack_id, pending in list(self._acks.items()):
+            if pending is fut:
+                del self._acks[ack_id]
+                self._unsent = {f: i for f, i in self._unsent.items() if i != ack_id}
+        fut.cancel()
@@ -0,0 +1,20 @@
+# tests/test_daemon.py
+from daemon import Profile, ProfileFanout
+from seat_state import CLOSED, OPENED, SEATS_CHANGED, SeatEvent
+
+
+class _Client:
+    def __init__(self):
+        self.posts = []
+
+    def enqueue(self, message, channel_name=None, ping=""):
+        self.posts.append((channel_name, ping))
+
+
+def test_profiles_are_pinged_on_openings_only():
+    profile = Profile("p", "Fall 2025", ["10001"], "", "token", "seats", "<@42>")
+    client  = _Client()
+    fanout  = ProfileFanout({("202531", "10001"): [profile]}, {"token": client})
+    for kind in (OPENED, SEATS_CHANGED, CLOSED):
+        fanout(SeatEvent(kind, "202531", "10001", "CSCE 121 – INTRO", kind != CLOSED, 2, 3, 0.0))
+    assert client.posts == [("seats", "<@42>"), ("seats", ""), ("seats", "")]
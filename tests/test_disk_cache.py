@@ -0,0 +1,15 @@
+# tests/test_disk_cache.py
+from disk_cache import DiskCache, cached_term_map
+
+
+def test_a_term_list_that_cannot_be_saved_is_still_used(tmp_path):
+    (tmp_path / "cache").write_text("a file where the folder should be")
+    cache = DiskCache(str(tmp_path / "cache"))
+    assert cached_term_map(cache, lambda: {"Fall 2025": "202531"}) == {"Fall 2025": "202531"}
+
+
+def test_store_then_load_round_trips(tmp_path):
+    cache = DiskCache(str(tmp_path), clock=lambda: 100.0)
+    cache.store("catalog-202531", [["10001", "CSCE"]])
+    assert cache.load("catalog-202531") == ([["10001", "CSCE"]], 100.0)
+    assert [p.name for p in tmp_path.iterdir()] == ["catalog-202531.json"]    # no temporary files left
@@ -0,0 +1,20 @@
+# tests/test_log_pipeline.py
+import sys
+
+from log_pipeline import DEBUG, ERROR, INFO, LogQueue, StreamTap, log
+
+
+def test_levels_come_from_the_call_site_not_the_text(monkeypatch):
+    queue = LogQueue()
+    monkeypatch.setattr(sys, "stdout", StreamTap(queue))
+    print("[config] applying seat_history failed over to the default")
+    log(ERROR, "[SeatHistory] dropped 3 rows:", OSError("disk full"))
+    log(DEBUG, "[12:00:00] DEBUG: howdy fetched 3 sections")
+    lines = queue.drain()
+    assert [line.level for line in lines] == [INFO, ERROR, DEBUG]
+    assert lines[1].text == "[SeatHistory] dropped 3 rows: disk full"
+
+
+def test_log_prints_when_stdout_is_not_tapped(capsys):
+    log(ERROR, "[daemon] worker 0 exited")
+    assert capsys.readouterr().out == "[daemon] worker 0 exited\n"
@@ -0,0 +1,83 @@
+# tests/test_poll_scheduler.py
+import random
+
+from poll_scheduler import COLD_AFTER, HOT_WINDOW, PollScheduler
+from section_catalog import Section
+from watch_engine import PollJob
+
+TERM = "202531"
+
+
+def _row(crn, seats):
+    return Section(crn, "CSCE", "121", "500", "INTRO", seats > 0, seats)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(clock, targets=None, rpm=60):
+    return PollScheduler(targets, base=5, hot=2, cold=30, rpm=rpm, jitter=0, clock=clock, rng=random.Random(0))
+
+
+def test_cadence_follows_churn_seats_and_time_full():
+    clock     = _Clock()
+    scheduler = _scheduler(clock)
+    assert scheduler.cadence(TERM, "10001") == 5                    # never seen
+
+    scheduler.observe(TERM, "10001", _row("10001", 0))
+    scheduler.observe(TERM, "10002", _row("10002", 2))
+    scheduler.observe(TERM, "10003", _row("10003", 40))
+    assert scheduler.cadence(TERM, "10001") == 5
+    assert scheduler.cadence(TERM, "10002") == 2                    # open and nearly full
+    assert scheduler.cadence(TERM, "10003") == 5
+
+    clock.now = 100
+    scheduler.observe(TERM, "10003", _row("10003", 39))
+    assert scheduler.cadence(TERM, "10003") == 2                    # just churned
+    clock.now = 100 + HOT_WINDOW
+    assert scheduler.cadence(TERM, "10003") == 5
+
+    clock.now = COLD_AFTER + 1
+    assert scheduler.cadence(TERM, "10001") == 30                   # full for long enough
+    scheduler.observe(TERM, "10001", None)
+    assert scheduler.cadence(TERM, "10001") == 5
+
+
+def test_a_job_runs_at_the_pace_of_its_hottest_crn():
+    clock     = _Clock()
+    covers    = {"A": [(TERM, "10001"), (TERM, "10002")]}
+    scheduler = _scheduler(clock, targets=covers.get)
+    scheduler.observe(TERM, "10001", _row("10001", 40))
+    scheduler.observe(TERM, "10002", _row("10002", 1))
+    assert scheduler.next_delay(PollJob("A", 5, None)) == 2
+
+
+def test_intervals_stretch_together_when_demand_exceeds_the_budget():
+    scheduler = _scheduler(_Clock(), rpm=60)
+    fast, slow = PollJob("fast", 1, None), PollJob("slow", 2, None)
+    assert scheduler.interval(fast) == 1                            # 60/min, inside the budget
+    assert scheduler.interval(slow) == 3                            # 60 + 30 asked for → ×1.5
+    assert scheduler.interval(fast) == 1.5                          # the hot job keeps its lead
+    scheduler.forget("slow")
+    assert scheduler.interval(fast) == 1
+
+
+def test_errors_back_off_and_a_429_pauses_the_bucket():
+    clock     = _Clock()
+    scheduler = _scheduler(clock)
+    job       = PollJob("A", 5, None)
+
+    class _TooMany(Exception):
+        response = type("Response", (), {"status_code": 429, "headers": {"Retry-After": "40"}})()
+
+    assert scheduler.next_delay(job, RuntimeError()) == 10
+    assert scheduler.next_delay(job, _TooMany()) == 40
+    assert scheduler.try_acquire() == 40
+    clock.now = 40
+    assert scheduler.try_acquire() == 0
+    assert scheduler.next_delay(job) == 5
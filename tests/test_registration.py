@@ -0,0 +1,23 @@
+# tests/test_registration.py
+from registration import AUTH, CONFLICT, FULL, SUCCESS, THROTTLED, UNKNOWN, classify
+
+
+def test_success_flag():
+    assert classify([{"success": True}]) == SUCCESS
+
+
+def test_crn_digits_are_not_status_codes():
+    assert classify([{"message": "Class is closed", "crn": "14290"}]) == FULL
+    assert classify([{"status": "registered", "regNumber": "54012"}]) == SUCCESS
+    assert classify([{"message": "Time conflict", "crn": "40129"}]) == CONFLICT
+    assert classify([{"crn": "14290", "regNumber": "40129"}]) == UNKNOWN
+
+
+def test_status_codes_from_structured_fields():
+    assert classify([{"status": 429}]) == THROTTLED
+    assert classify([{"code": "401", "crn": "14290"}]) == AUTH
+
+
+def test_phrases_in_message_text():
+    assert classify([{"errors": [{"message": "Too many requests"}]}]) == THROTTLED
+    assert classify("Unauthorized") == AUTH
@@ -0,0 +1,62 @@
+# tests/test_registration_window.py
+import asyncio
+import time
+
+import pytest
+
+import scheduler_bot as bot
+from registration_window import ClockOffset, local_time, token_expires_first
+
+
+def test_local_time_subtracts_the_server_offset():
+    # the server runs 5 s ahead, so its 12:00:00 is our 11:59:55
+    assert local_time(1000.0, 5.0) == 995.0
+
+
+def test_token_margin_uses_the_local_deadline():
+    target, margin = 1000.0, 120.0
+    # the window opens at local 995; a token good until local 1117 lasts the margin past it
+    assert not token_expires_first(1117.0, target, 5.0, margin)
+    assert token_expires_first(1114.0, target, 5.0, margin)
+    # with the server behind, the window opens later on our clock and needs a longer-lived token
+    assert token_expires_first(1117.0, target, -5.0, margin)
+
+
+def test_stopping_before_the_window_sends_nothing(monkeypatch):
+    fake_socketio = pytest.importorskip("bench.fake_socketio")
+    with fake_socketio.FakeSocketIO() as sio:
+        monkeypatch.setattr(bot, "socket_url", sio.url)
+        monkeypatch.setattr(bot, "fetch_token", lambda: ("token", 3600))
+        monkeypatch.setattr(bot, "estimate_offset", lambda fetch_date: ClockOffset(0.5, 0.01, 1))
+        monkeypatch.setattr(bot, "SWAP_RULES", [{"drop": "11111", "add": ["22222"]}])
+        monkeypatch.setattr(bot, "current_run", bot.MonitorRun())
+        run = bot.current_run
+
+        async def main():
+            asyncio.get_running_loop().call_later(1.0, run.stop)
+            await asyncio.wait_for(bot.registration_window(time.time() + 3), 10)
+
+        asyncio.run(main())
+        assert sio.count("registration-request") == 0
+
+
+def test_a_reconnect_before_the_window_keeps_the_prepared_acks(monkeypatch, capsys):
+    fake_socketio = pytest.importorskip("bench.fake_socketio")
+    with fake_socketio.FakeSocketIO() as sio:
+        monkeypatch.setattr(bot, "socket_url", sio.url)
+        monkeypatch.setattr(bot, "fetch_token", lambda: ("token", 3600))
+        monkeypatch.setattr(bot, "estimate_offset", lambda fetch_date: ClockOffset(0.0, 0.01, 1))
+        monkeypatch.setattr(bot, "SWAP_RULES", [{"drop": "11111", "add": ["22222"]}])
+        monkeypatch.setattr(bot, "WINDOW_RETRIES", 0)
+        monkeypatch.setattr(bot, "current_run", bot.MonitorRun())
+
+        async def main():
+            # warm-up is done well within a second; the socket drops before T-0
+            asyncio.get_running_loop().call_later(1.0, sio.kick)
+            await asyncio.wait_for(bot.registration_window(time.time() + 3), 15)
+
+        asyncio.run(main())
+        out = capsys.readouterr().out
+        assert sio.connections >= 2
+        assert sio.count("registration-request") == 1
+        assert "Window burst: success 1" in out
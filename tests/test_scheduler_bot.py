@@ -0,0 +1,43 @@
+# tests/test_scheduler_bot.py
+import asyncio
+
+import scheduler_bot as bot
+
+
+def test_stopping_a_run_leaves_the_next_one_running():
+    old, new = bot.MonitorRun(), bot.MonitorRun()
+
+    async def main():
+        waiter = asyncio.ensure_future(old.wait())
+        await asyncio.sleep(0)
+        old.stop()
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(main())
+    assert not old.active
+    assert new.active
+
+
+def test_a_zero_request_budget_is_clamped(monkeypatch):
+    monkeypatch.setattr(bot, "RATE_BUDGET", bot.RATE_BUDGET)
+    bot.apply_settings({"requests_per_minute": 0})
+    assert bot.RATE_BUDGET == 1
+
+
+def test_config_flag_moves_the_cache_and_history_next_to_it(monkeypatch, tmp_path):
+    for name in ("CONFIG_DIR", "CONFIG_PATH", "CACHE_DIR", "HISTORY_PATH"):
+        monkeypatch.setattr(bot, name, getattr(bot, name))
+    monkeypatch.setattr(bot, "start_monitoring", lambda: None)
+    monkeypatch.setattr("signal.signal", lambda *args: None)
+    bot.main(["--config", str(tmp_path / "config.json")])
+    assert bot.CACHE_DIR == str(tmp_path / "cache")
+    assert bot.HISTORY_PATH == str(tmp_path / "seat_history.sqlite3")
+
+
+def test_watched_crns_are_checked_against_the_cached_catalog(tmp_path):
+    from disk_cache import DiskCache, catalog_key
+
+    cache = DiskCache(str(tmp_path))
+    cache.store(catalog_key("199931"), [["10001", "CSCE", "121", "500", "INTRO", True, 3]])
+    assert bot.unknown_crns({"199931": ["10001", "10002"]}, cache) == {"199931": ["10002"]}
+    assert bot.unknown_crns({"199932": ["10002"]}, cache) == {}
@@ -0,0 +1,51 @@
+# tests/test_seat_state.py
+from section_catalog import Section
+from seat_state import CLOSED, OPENED, SEATS_CHANGED, VANISHED, SeatTracker
+
+
+def _row(seats):
+    return Section("10001", "CSCE", "121", "500", "INTRO", seats > 0, seats)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_changes_inside_the_debounce_window_are_held_down():
+    clock   = _Clock()
+    tracker = SeatTracker(debounce=30, clock=clock)
+    seen    = []
+    tracker.subscribe(seen.append)
+
+    def poll(at, seats):
+        clock.now = at
+        return [e.kind for e in tracker.update("202531", "10001", _row(seats))]
+
+    assert poll(0, 0) == []                         # a full first sighting is only a baseline
+    assert poll(5, 2) == [OPENED]                   # nothing was reported yet, so it goes out at once
+    assert poll(10, 0) == []                        # flaps back inside the window
+    assert poll(20, 3) == []
+    assert tracker.get("202531", "10001")[:2] == (True, 2)
+    assert poll(40, 3) == [SEATS_CHANGED]           # the window is over; the held-down change is reported
+    assert (seen[-1].seats, seen[-1].prev_seats) == (3, 2)
+    assert poll(50, 0) == []
+    assert poll(75, 0) == [CLOSED]
+    assert [e.kind for e in seen] == [OPENED, SEATS_CHANGED, CLOSED]
+
+
+def test_a_first_sighting_that_is_open_is_reported_and_starts_the_window():
+    tracker = SeatTracker(debounce=30, clock=lambda: 0.0)
+    assert [e.kind for e in tracker.update("202531", "10001", _row(1), now=100)] == [OPENED]
+    assert tracker.update("202531", "10001", _row(0), now=110) == []
+    assert [e.kind for e in tracker.update("202531", "10001", _row(0), now=130)] == [CLOSED]
+
+
+def test_a_vanished_section_is_reported_even_inside_the_window():
+    tracker = SeatTracker(debounce=30)
+    tracker.update("202531", "10001", _row(1), now=0)
+    assert [e.kind for e in tracker.update("202531", "10001", None, now=1)] == [VANISHED]
+    assert tracker.get("202531", "10001") is None
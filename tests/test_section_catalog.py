@@ -0,0 +1,40 @@
+# tests/test_section_catalog.py
+import threading
+
+from section_catalog import SectionCatalog
+
+
+def _record(crn, open=True):
+    return {"SWV_CLASS_SEARCH_CRN": str(crn), "SWV_CLASS_SEARCH_SUBJECT": "CSCE", "SWV_CLASS_SEARCH_COURSE": "121",
+            "SWV_CLASS_SEARCH_SECTION": "500", "SWV_CLASS_SEARCH_TITLE": "INTRO", "STUSEAT_OPEN": "Y" if open else "N"}
+
+
+def test_concurrent_refresh_and_narrow_updates():
+    catalog = SectionCatalog("202531")
+    term    = [_record(10000 + i) for i in range(2000)]
+    errors  = []
+
+    def pull():
+        try:
+            for _ in range(20):
+                catalog.refresh(term)
+                catalog.rows()
+        except Exception as e:
+            errors.append(e)
+
+    def poll():
+        try:
+            for i in range(4000):
+                crn = 10000 + i % 2000
+                catalog.discard(crn)
+                catalog.upsert([_record(crn, open=i % 2 == 0)])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=pull), threading.Thread(target=poll)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(catalog) == 2000 and len(catalog.by_course("CSCE", "121")) == 2000
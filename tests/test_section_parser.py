@@ -0,0 +1,56 @@
+# tests/test_section_parser.py
+import json
+import random
+
+from section_parser import RECORD_RE, iter_record_slices, iter_watched_sections
+
+NASTY = ['plain', 'a "quoted" word', 'back\\slash', '{not an object}', '}{', 'ünïcødé ✓', '\\"{', '']
+
+
+def _catalog(rng):
+    sections = []
+    for i in range(rng.randint(0, 40)):
+        section = {
+            "SWV_CLASS_SEARCH_TITLE": rng.choice(NASTY) + rng.choice(NASTY),
+            "SWV_CLASS_SEARCH_CRN":   str(10000 + i) if rng.random() < 0.5 else 10000 + i,
+            "SWV_CLASS_SEARCH_JSON_CLOB": json.dumps([{"ROOM": rng.choice(NASTY)}]),
+            "STUSEAT_OPEN":           rng.choice("YN"),
+        }
+        if rng.random() < 0.5:
+            section = dict(reversed(list(section.items())))    # the CRN key first or last
+        if rng.random() < 0.3:
+            # howdy sends nested data as strings; an object after the CRN key still has to be cut out whole,
+            # even one nested deeper than RECORD_RE handles
+            section["MEETING"] = {"DAYS": [rng.choice(NASTY)], "AT": {"HOUR": 9}}
+        sections.append(section)
+    return sections
+
+
+def _chunks(body, rng):
+    size = rng.choice([1, 7, 64, 1000, len(body) or 1])
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def test_streamed_records_match_a_full_json_decode():
+    rng = random.Random(0)
+    for _ in range(200):
+        sections = _catalog(rng)
+        data     = {"courseSections": sections} if rng.random() < 0.3 else sections
+        body     = json.dumps(data, ensure_ascii=rng.random() < 0.5, indent=rng.choice([None, 1])).encode()
+        expected = {str(s["SWV_CLASS_SEARCH_CRN"]): s for s in sections}
+
+        everything = {crn: json.loads(raw) for crn, raw in iter_record_slices(_chunks(body, rng))}
+        assert everything == expected
+
+        watched = rng.sample(sorted(expected), min(len(expected), rng.randint(0, 5))) + ["99999"]
+        found   = {crn: json.loads(raw) for crn, raw in iter_record_slices(_chunks(body, rng), watched)}
+        assert found == {crn: expected[crn] for crn in watched if crn in expected}
+        decoded = iter_watched_sections(_chunks(body, rng), watched)
+        assert sorted(str(r.get("SWV_CLASS_SEARCH_CRN")) for r in decoded) == sorted(found)
+
+
+def test_record_pattern_does_not_need_possessive_quantifiers():
+    # RECORD_RE has to compile on Python 3.10, which has no "++" or "*+"
+    assert b"++" not in RECORD_RE.pattern and b"*+" not in RECORD_RE.pattern
+    record = json.dumps({"A": 'say "hi" {', "B": {"C": [1]}}).encode()
+    assert RECORD_RE.match(record + b",").end() == len(record)
@@ -0,0 +1,71 @@
+# tests/test_swap_rules.py
+from registration import CONFLICT, SUCCESS
+from swap_rules import ACTIVE, CANCELLED, DONE, FAILED, SwapPlan, parse_rules
+
+
+def _plan(*specs):
+    return SwapPlan(parse_rules({"swap_rules": list(specs)}, interval=5))
+
+
+def _states(plan):
+    return {(c.rule.priority, c.drop, c.add): c.state for c in plan.candidates}
+
+
+def test_a_success_cancels_its_rule_and_anything_sharing_its_crns():
+    plan = _plan({"drop": "11111", "add": ["22222", "33333"]},
+                 {"drop": "11111", "add": ["44444"]},        # drops the CRN that is gone now
+                 {"drop": "55555", "add": ["22222"]},        # adds the CRN we now have
+                 {"drop": "55555", "add": ["66666"]})        # unrelated
+    first = plan.claim(plan.rules[0])
+    assert (first.drop, first.add) == ("11111", "22222")
+    cancelled = plan.settle(first, SUCCESS)
+    assert {(c.drop, c.add) for c in cancelled} == {("11111", "33333"), ("11111", "44444"), ("55555", "22222")}
+    assert _states(plan) == {
+        (0, "11111", "22222"): DONE,
+        (0, "11111", "33333"): CANCELLED,
+        (1, "11111", "44444"): CANCELLED,
+        (2, "55555", "22222"): CANCELLED,
+        (3, "55555", "66666"): ACTIVE,
+    }
+    assert plan.rules[3].active and not plan.finished
+
+
+def test_a_final_failure_retires_only_that_candidate():
+    plan = _plan({"drop": "11111", "add": ["22222", "33333"]})
+    candidate = plan.claim(plan.rules[0])
+    assert plan.settle(candidate, CONFLICT) == []
+    assert candidate.state == FAILED
+    assert [c.add for c in plan.candidates if c.active] == ["33333"]
+
+
+def test_claim_skips_crns_with_an_attempt_in_flight():
+    plan = _plan({"drop": "11111", "add": ["22222"]},
+                 {"drop": "11111", "add": ["33333"]},
+                 {"add": ["22222", "44444"]})
+    busy = plan.claim(plan.rules[0])
+    assert plan.claim(plan.rules[1]) is None                    # same drop
+    assert plan.claim(plan.rules[2]).add == "44444"             # 22222 is busy, so its other alternative
+    plan.release(busy)
+    assert plan.claim(plan.rules[1]).add == "33333"
+
+
+def test_claim_with_is_open_takes_the_best_open_candidate():
+    plan = _plan({"drop": "11111", "add": ["22222", "33333", "44444"]})
+    assert plan.claim(plan.rules[0], is_open=lambda crn: crn in {"33333", "44444"}).add == "33333"
+
+
+def test_update_keeps_the_progress_of_unchanged_rules():
+    plan = _plan({"drop": "11111", "add": ["22222", "33333"]}, {"add": ["44444"]})
+    kept = plan.rules[0]
+    plan.settle(plan.claim(kept), CONFLICT)
+    kept.slow_down(60)
+
+    added, removed = plan.update(parse_rules({"swap_rules": [
+        {"add": ["77777"]},
+        {"drop": "11111", "add": ["22222", "33333"]},
+    ]}, interval=5))
+    assert [r.label for r in added] == ["#1 add 77777"]
+    assert [c.add for r in removed for c in r.candidates] == ["44444"]
+    assert all(c.state == CANCELLED for r in removed for c in r.candidates)
+    assert plan.rules[1] is kept and kept.priority == 1
+    assert [c.state for c in kept.candidates] == [FAILED, ACTIVE] and kept.delay == 10
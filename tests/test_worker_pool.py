@@ -0,0 +1,38 @@
+# tests/test_worker_pool.py
+import queue
+import threading
+
+from section_catalog import Section
+from seat_history import SeatHistory
+from seat_state import OPENED, CLOSED
+from worker_pool import HistoryRelay, Transition, WorkerPool
+
+
+def _row(open):
+    return Section("10001", "CSCE", "121", "500", "INTRO", open, 1 if open else 0)
+
+
+def test_worker_transitions_are_written_by_the_supervisor(tmp_path):
+    path   = str(tmp_path / "history.sqlite3")
+    pool   = WorkerPool({"202531": ["10001"]}, 1, on_event=lambda event: None,
+                        settings={"HISTORY": True}, history_path=path)
+    events = pool.events = queue.Queue()
+    relay  = HistoryRelay(events)
+    for open in (False, True, False):
+        relay.observe("202531", "10001", _row(open))
+    assert all(isinstance(item, Transition) for item in list(events.queue))
+
+    history   = SeatHistory(path)
+    deliverer = threading.Thread(target=pool._deliver, args=(history,))
+    deliverer.start()
+    pool.stop()
+    deliverer.join(5)
+    history.close()
+
+    kinds = [e.kind for e in SeatHistory(path).transitions(crn="10001")]
+    assert kinds[-2:] == [OPENED, CLOSED]
+
+
+def test_workers_do_not_record_without_a_history_path():
+    pool = WorkerPool({"202531": ["10001"]}, 1, on_event=print, settings={"HISTORY": True})
+    assert pool.settings["HISTORY"] is False
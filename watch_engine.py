@@ -0,0 +1,116 @@
+# watch_engine.py
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_CONNECTIONS = 8    # upper bound on requests in flight at once
+
+# key      – anything hashable identifying the job (a SectionQuery in watch mode)
+# interval – seconds between the *starts* of two polls
+# fetch    – blocking callable doing the request, run on the engine's pool
+PollJob = namedtuple("PollJob", ["key", "interval", "fetch"])
+
+
+class WatchEngine:
+    """Poll many jobs concurrently on one asyncio loop.
+
+    Each job gets its own task and its own schedule, so a slow response only
+    delays the job that is waiting on it. Blocking fetches run on a bounded
+    thread pool that should match the HTTP session's connection pool size.
+    ``stop()`` may be called from any thread and takes effect immediately.
+
+    With a ``scheduler`` (see poll_scheduler.PollScheduler) every request
+    waits for a budget token and the gap to the next poll comes from the
+    scheduler instead of the job's fixed interval.
+    """
+
+    def __init__(self, on_result, on_error=None, max_connections=MAX_CONNECTIONS, scheduler=None):
+        self.on_result       = on_result
+        self.on_error        = on_error
+        self.max_connections = max_connections
+        self.scheduler       = scheduler
+        self.loop            = None
+        self._executor       = None
+        self._stop           = None
+        self._stopped        = False
+        self._tasks          = {}    # key → (job, task)
+
+    # ───── lifecycle ─────
+    async def run(self, jobs):
+        self.loop      = asyncio.get_running_loop()
+        self._stop     = asyncio.Event()
+        self._executor = ThreadPoolExecutor(self.max_connections, thread_name_prefix="watch")
+        if self._stopped:
+            self._stop.set()
+        try:
+            self.set_jobs(jobs)
+            await self._stop.wait()
+        finally:
+            tasks = [task for _, task in self._tasks.values()]
+            self._tasks.clear()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # requests already on the wire finish in the background, nobody waits on them
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        self._stopped = True
+        if self.loop and self._stop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    @property
+    def jobs(self):
+        return [job for job, _ in self._tasks.values()]
+
+    def set_jobs(self, jobs):
+        """Replace the running job set, only touching jobs that actually changed. Loop thread only."""
+        wanted = {job.key: job for job in jobs}
+        for key in list(self._tasks):
+            job, task = self._tasks[key]
+            if wanted.get(key) != job:
+                task.cancel()
+                del self._tasks[key]
+                if self.scheduler and key not in wanted:
+                    self.scheduler.forget(key)
+        for key, job in wanted.items():
+            if key not in self._tasks:
+                self._tasks[key] = (job, self.loop.create_task(self._poll(job)))
+
+    # ───── per‑job loop ─────
+    async def _poll(self, job):
+        next_due = self.loop.time()
+        while not self._stop.is_set():
+            if self.scheduler:
+                await self.scheduler.acquire()
+            started = self.loop.time()
+            error   = None
+            try:
+                result = await self.loop.run_in_executor(self._executor, job.fetch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = e
+                if self.on_error:
+                    self.on_error(job, e)
+            else:
+                self.on_result(job, result)
+
+            if self.scheduler:
+                # back off from when the failure came back, not from when the request went out
+                base     = started if error is None else self.loop.time()
+                next_due = base + self.scheduler.next_delay(job, error)
+            else:
+                next_due += job.interval
+            now = self.loop.time()
+            if next_due < now:
+                # the poll overran its slot; skip the missed ticks instead of bursting
+                next_due = now
+            await self.sleep_until(next_due)
+
+    async def sleep_until(self, when):
+        """Sleep until loop time ``when`` or until stop() is called, whichever comes first."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), max(0.0, when - self.loop.time()))
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,198 @@
+# worker_pool.py
+"""Spread a large watch set over worker processes, each with its own GIL.
+
+``shard_watch_map`` cuts a ``{term: [crns]}`` map into contiguous CRN
+ranges of about the same size (a term only spans several shards when it
+has more CRNs than one shard holds). Each shard runs ``monitor_crns`` in
+its own process with its share of the request budget. Every SeatEvent a
+worker emits comes back over one queue and is handed to ``on_event`` on a
+single thread of the supervising process, so notifications keep one
+Discord login per bot token and arrive as one stream. Seat history comes
+back the same way: workers relay their undebounced transitions and the
+supervisor is the only writer of the SQLite file, which would otherwise
+see N processes contending for its write lock.
+
+A worker that dies is started again with exponential backoff; the backoff
+resets once it has stayed up for STABLE_AFTER seconds.
+"""
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+from log_pipeline import log, WARNING, ERROR
+from seat_history import SeatHistory
+from seat_state import SeatTracker
+
+RESTART_MIN  = 1.0      # seconds before restarting a crashed worker, doubling up to RESTART_MAX
+RESTART_MAX  = 60.0
+STABLE_AFTER = 60.0     # a worker up this long is healthy again
+CHECK_EVERY  = 0.5      # seconds between liveness checks
+STOP_TIMEOUT = 10.0     # how long a worker gets to shut down before it is killed
+
+# what a worker copies from the supervisor's scheduler_bot before it starts polling
+SETTINGS = ("COOKIE", "HOWDY_URL", "INTERVAL", "RATE_BUDGET", "DEBOUNCE_SECS", "HEDGE", "HISTORY")
+
+# a seat transition on its way to the supervisor's SeatHistory, as opposed to a SeatEvent to notify
+Transition = namedtuple("Transition", ["event"])
+
+
+def shard_watch_map(watch_map, shards):
+    """``shards`` watch maps covering every (term, crn) once, in contiguous CRN ranges."""
+    pairs = [(term, str(crn)) for term in sorted(watch_map)
+             for crn in sorted({str(c) for c in watch_map[term]}, key=lambda c: (len(c), c))]
+    shards = max(1, min(shards, len(pairs)))
+    size, extra = divmod(len(pairs), shards)
+    maps, start = [], 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        shard = {}
+        for term, crn in pairs[start:end]:
+            shard.setdefault(term, []).append(crn)
+        maps.append(shard)
+        start = end
+    return maps
+
+
+class HistoryRelay:
+    """Stands in for SeatHistory in a worker: transitions go to ``events`` as Transitions."""
+
+    def __init__(self, events):
+        self._tracker = SeatTracker(debounce=0, clock=time.time)    # SeatHistory.record wants wall-clock times
+        self._tracker.subscribe(lambda event: events.put(Transition(event)))
+
+    def observe(self, term, crn, section, now=None):
+        self._tracker.update(term, crn, section, now)
+
+    def forget(self, term, crn=None):
+        self._tracker.forget(term, crn)
+
+
+def run_worker(index, watch_map, settings, events):
+    """Worker process: poll ``watch_map`` and put every SeatEvent on ``events`` until SIGTERM."""
+    import scheduler_bot
+    for name, value in settings.items():
+        setattr(scheduler_bot, name, value)
+    signal.signal(signal.SIGTERM, lambda *_: scheduler_bot.stop_monitoring())
+    print(f"[worker {index}] watching {sum(len(c) for c in watch_map.values())} CRNs")
+    history = HistoryRelay(events) if scheduler_bot.HISTORY else None
+    scheduler_bot.HISTORY = False    # the supervisor writes the file
+    try:
+        scheduler_bot.monitor_crns(watch_map, subscribers=[events.put], history=history)
+    except KeyboardInterrupt:
+        pass
+
+
+class _Worker:
+    __slots__ = ("index", "watch_map", "process", "started_at", "backoff", "restart_at", "restarts")
+
+    def __init__(self, index, watch_map):
+        self.index      = index
+        self.watch_map  = watch_map
+        self.process    = None
+        self.started_at = None
+        self.backoff    = RESTART_MIN
+        self.restart_at = None
+        self.restarts   = 0
+
+
+class WorkerPool:
+    """Run one process per shard of ``watch_map``, restart the ones that die, merge their events."""
+
+    def __init__(self, watch_map, workers, on_event, settings=None, history_path=None):
+        """With ``settings["HISTORY"]`` set, transitions are recorded to ``history_path``."""
+        shards            = shard_watch_map(watch_map, workers)
+        self.on_event     = on_event
+        self.settings     = dict(settings or {})
+        self.history_path = history_path if self.settings.get("HISTORY") else None
+        self.workers      = [_Worker(i, shard) for i, shard in enumerate(shards)]
+        self._ctx         = multiprocessing.get_context("spawn")    # the same on Linux and Windows
+        self.events       = self._ctx.Queue()
+        self._stop        = threading.Event()
+        self.settings["HISTORY"] = bool(self.history_path)    # workers relay, see HistoryRelay
+        # the request budget is shared, so each worker gets its slice of it
+        if "RATE_BUDGET" in self.settings:
+            self.settings["RATE_BUDGET"] = max(1, self.settings["RATE_BUDGET"] // len(self.workers))
+
+    @property
+    def alive(self):
+        return sum(1 for w in self.workers if w.process is not None and w.process.is_alive())
+
+    def _start(self, worker):
+        worker.process = self._ctx.Process(
+            target=run_worker, name=f"watch-worker-{worker.index}",
+            args=(worker.index, worker.watch_map, self.settings, self.events), daemon=True
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+
+    def _deliver(self, history):
+        while not self._stop.is_set() or not self.events.empty():
+            try:
+                event = self.events.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            if isinstance(event, Transition):
+                history.record(event.event)
+                continue
+            try:
+                self.on_event(event)
+            except Exception as e:
+                log(ERROR, f"[daemon] handling {event.kind} {event.crn} failed: {e}")
+
+    def _supervise(self, worker, now):
+        proc = worker.process
+        if proc.is_alive():
+            if now - worker.started_at > STABLE_AFTER:
+                worker.backoff = RESTART_MIN
+            return
+        if worker.restart_at is None:
+            worker.restart_at = now + worker.backoff
+            log(WARNING, f"[daemon] worker {worker.index} exited with code {proc.exitcode}, "
+                  f"restarting in {worker.backoff:.0f}s")
+            worker.backoff = min(RESTART_MAX, worker.backoff * 2)
+        elif now >= worker.restart_at:
+            worker.restarts += 1
+            metrics.inc("worker_restarts_total")
+            self._start(worker)
+
+    def run(self):
+        """Blocking: start the workers and keep them running until stop() is called."""
+        print(f"[daemon] {len(self.workers)} workers: "
+              + ", ".join(str(sum(len(c) for c in w.watch_map.values())) for w in self.workers) + " CRNs each")
+        metrics.gauge("workers_alive", lambda: self.alive)
+        history   = SeatHistory(self.history_path) if self.history_path else None
+        deliverer = threading.Thread(target=self._deliver, args=(history,), name="worker-events", daemon=True)
+        deliverer.start()
+        for worker in self.workers:
+            self._start(worker)
+        try:
+            while not self._stop.wait(CHECK_EVERY):
+                now = time.monotonic()
+                for worker in self.workers:
+                    self._supervise(worker, now)
+        finally:
+            self._shutdown()
+            deliverer.join(STOP_TIMEOUT)
+            if history:
+                history.close()
+                print(f"[daemon] Recorded {history.written} seat transitions to {self.history_path}")
+
+    def stop(self):
+        self._stop.set()
+
+    def _shutdown(self):
+        self._stop.set()
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()    # SIGTERM on Linux: the worker stops its loop and sends what it has
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(max(0.0, deadline - time.monotonic()))
+                if worker.process.is_alive():
+                    worker.process.kill()